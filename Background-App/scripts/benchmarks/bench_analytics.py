@@ -0,0 +1,136 @@
+"""Daily/weekly analytics over 90 days of synthetic app sessions.
+
+Usage:
+    python scripts/benchmarks/bench_analytics.py [--days N] [--mean-session S]
+
+Generates working days of back-to-back sessions (exponential lengths,
+short idle gaps, breaks), stores them in a temporary SQLite database the
+way the sessionizer does, then times the aggregates three ways: a Python
+loop per session (datetime bucketing, as get_activity_summary does), the
+vectorized ActivityAnalytics on in-memory columns, and the full
+ActivityAnalytics.summary() including the SQLite load.
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.utils.analytics import ActivityAnalytics  # noqa: E402
+from src.utils.sqlite_manager import SQLiteManager  # noqa: E402
+
+APPS = ["chrome.exe", "code", "slack", "zoom", "winword.exe", "spotify", "explorer.exe", "firefox",
+        "figma", "outlook", "teams", "terminal"]
+CATEGORIES = {"chrome.exe": "uncategorized", "code": "development", "slack": "communication",
+              "zoom": "meetings", "winword.exe": "documents", "spotify": "entertainment",
+              "explorer.exe": "uncategorized", "firefox": "uncategorized", "figma": "design",
+              "outlook": "communication", "teams": "meetings", "terminal": "development"}
+
+def make_sessions(days, mean_session, rng, end):
+    """(app, start, end) epoch triples for `days` days of 9-to-6 desk time."""
+    sessions = []
+    for day in range(days):
+        t = end - (days - day) * 86400 + 9 * 3600 + rng.uniform(-1800, 1800)
+        stop = t + 9 * 3600
+        while t < stop:
+            length = rng.exponential(mean_session)
+            sessions.append((APPS[min(int(rng.zipf(1.6)) - 1, len(APPS) - 1)], t, t + length))
+            # Mostly back to back, sometimes a short idle gap, rarely a long break
+            t += length + (rng.exponential(20) if rng.random() < 0.3 else 0)
+            if rng.random() < 0.002:
+                t += rng.uniform(1800, 4 * 3600)
+    return sessions
+
+def python_loop(sessions, start, end, max_gap):
+    """The per-session loop analytics would otherwise be."""
+    apps, categories, daily, heatmap = {}, {}, {}, [[0.0] * 24 for _ in range(7)]
+    previous_end = None
+    for app, s, e in sorted(sessions, key=lambda row: row[1]):
+        if previous_end is not None and 0 < s - previous_end <= max_gap:
+            gap = (max(previous_end, start), min(s, end))
+            if gap[1] > gap[0]:
+                day = datetime.fromtimestamp(gap[0]).date()
+                daily.setdefault(day, [0.0, 0.0])[1] += gap[1] - gap[0]
+        previous_end = e if previous_end is None else max(previous_end, e)
+        s, e = max(s, start), min(e, end)
+        if e <= s:
+            continue
+        apps[app] = apps.get(app, 0.0) + e - s
+        categories[CATEGORIES[app]] = categories.get(CATEGORIES[app], 0.0) + e - s
+        cursor = datetime.fromtimestamp(s)
+        stop = datetime.fromtimestamp(e)
+        while cursor < stop:
+            boundary = min(cursor.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1), stop)
+            seconds = (boundary - cursor).total_seconds()
+            heatmap[cursor.weekday()][cursor.hour] += seconds
+            daily.setdefault(cursor.date(), [0.0, 0.0])[0] += seconds
+            cursor = boundary
+    return apps, categories, daily, heatmap
+
+def store(sqlite, sessions):
+    with sqlite.get_connection() as conn:
+        app_ids = {app: sqlite.strings.intern(conn, app) for app in APPS}
+        conn.executemany("""
+            INSERT INTO local_app_sessions
+            (id, user_id, app_id, start_time, end_time, duration, category, is_open)
+            VALUES (?, 'bench', ?, ?, ?, ?, ?, 0)
+        """, [(str(uuid.uuid4()), app_ids[app], datetime.fromtimestamp(s).isoformat(),
+               datetime.fromtimestamp(e).isoformat(), int(e - s), CATEGORIES[app]) for app, s, e in sessions])
+    return app_ids
+
+def best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--mean-session', type=float, default=45.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=50)
+    args = parser.parse_args()
+
+    end = float(int(time.time()) // 86400 * 86400)
+    start = end - args.days * 86400
+    sessions = make_sessions(args.days, args.mean_session, np.random.default_rng(args.seed), end)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = SQLiteManager(os.path.join(tmp, 'bench.db'))
+        app_ids = store(sqlite, sessions)
+        analytics = ActivityAnalytics(sqlite, 'bench')
+        columns = ActivityAnalytics.from_columns([app_ids[app] for app, _, _ in sessions],
+                                                 [s for _, s, _ in sessions], [e for _, _, e in sessions],
+                                                 [CATEGORIES[app] for app, _, _ in sessions])
+
+        loop, (apps, _, daily, heatmap) = best_of(
+            lambda: python_loop(sessions, start, end, analytics.max_gap), args.repeat)
+
+        def vectorized():
+            return (analytics.app_totals(columns, start, end), analytics.category_totals(columns, start, end),
+                    analytics.daily(columns, start, end), analytics.heatmap(columns, start, end))
+        vector, (app_totals, _, vector_daily, vector_heatmap) = best_of(vectorized, args.repeat)
+        full, summary = best_of(lambda: analytics.summary(start, end), args.repeat)
+        load, _ = best_of(lambda: analytics.load(start, end), args.repeat)
+
+    by_name = {app: seconds for app, seconds in summary["apps"]}
+    assert all(abs(by_name[app] - seconds) < 1e-3 for app, seconds in apps.items())
+    assert abs(sum(idle for _, idle in daily.values()) - sum(day["idle"] for day in vector_daily)) < 1e-3
+    assert np.allclose(np.array(heatmap), vector_heatmap, atol=1e-2)
+    assert len(app_totals) == len(apps)
+
+    print(f"{len(sessions):,} sessions over {args.days} days "
+          f"({summary['active'] / 3600:,.0f} h active, {summary['idle'] / 3600:,.1f} h idle)")
+    print(f"python loop:             {loop * 1e3:>9.1f} ms")
+    print(f"vectorized (in memory):  {vector * 1e3:>9.1f} ms  ({loop / vector:.0f}x)")
+    print(f"summary() incl. SQLite:  {full * 1e3:>9.1f} ms  (load {load * 1e3:.1f} ms)")
+
+if __name__ == '__main__':
+    main()
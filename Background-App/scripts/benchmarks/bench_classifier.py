@@ -0,0 +1,68 @@
+"""Classifications per second of the rule-based app/title classifier.
+
+Usage:
+    python scripts/benchmarks/bench_classifier.py [--calls N] [--distinct N]
+
+Replays a Zipf-like stream of (app, title) pairs drawn from `--distinct`
+distinct windows, as focus observations arrive, through Classifier.classify
+(LRU memoized), and separately times the uncached rule match alone.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.utils.classifier import Classifier  # noqa: E402
+from src.utils.title_normalizer import app_key  # noqa: E402
+
+SITES = ["github.com", "stackoverflow.com", "youtube.com", "reddit.com", "mail.google.com",
+         "docs.google.com", "news.example.org", "intranet.corp.local", "jira.example.com", "x.com"]
+APPS = ["chrome.exe", "firefox", "code", "slack", "winword.exe", "explorer.exe", "spotify", "zoom", "teams"]
+
+def make_windows(n, rng):
+    windows = []
+    for i in range(n):
+        app = rng.choice(APPS)
+        if app in ("chrome.exe", "firefox"):
+            title = f"Page {i} - {rng.choice(SITES)} - {'Google Chrome' if app == 'chrome.exe' else 'Mozilla Firefox'}"
+        else:
+            title = f"project_{i % 40}/module_{i}.py - {app.split('.')[0].title()}"
+        windows.append((app, title))
+    return windows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=1_000_000)
+    parser.add_argument('--distinct', type=int, default=2_000)
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    windows = make_windows(args.distinct, rng)
+    stream = [windows[min(int(rng.paretovariate(1.1)) - 1, len(windows) - 1)] for _ in range(args.calls)]
+
+    classifier = Classifier()
+    t0 = time.perf_counter()
+    for app, title in stream:
+        classifier.classify(app, title)
+    cached = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for app, title in windows:
+        classifier._classify(app_key(app), title)
+    uncached = time.perf_counter() - t0
+
+    counts = {}
+    for app, title in windows:
+        category = classifier.classify(app, title)
+        counts[category] = counts.get(category, 0) + 1
+
+    print(f"{args.calls} classifications over {args.distinct} distinct windows")
+    print(f"memoized:  {args.calls / cached:>12,.0f} /s  (hit rate {classifier.hits / (classifier.hits + classifier.misses):.1%})")
+    print(f"rules only:{len(windows) / uncached:>12,.0f} /s")
+    print("categories:", ", ".join(f"{k} {v}" for k, v in sorted(counts.items(), key=lambda kv: -kv[1])))
+
+if __name__ == '__main__':
+    main()
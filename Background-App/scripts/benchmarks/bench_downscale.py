@@ -0,0 +1,80 @@
+"""Benchmark the capture resolution cap: CPU time and encoded bytes per frame.
+
+Usage:
+    python scripts/benchmarks/bench_downscale.py [--live] [--frames N]
+
+Without --live a synthetic desktop-like BGRA frame (text on flat panels) is
+used at 4K and 5K; with --live the primary monitor is grabbed through mss.
+For each cap the frame is reduced from the raw BGRA buffer and encoded as
+JPEG (ResourceManager path) and PNG (ScreenshotCollector path).
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import mss
+import mss.tools
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.utils.frame_ops import reduction_factor, downscale_bgra  # noqa: E402
+
+CAPS = [None, 2560, 1920, 1280]
+
+def synthetic_bgra(width: int, height: int) -> bytes:
+    """A desktop-like frame: window panels with rows of text."""
+    img = Image.new('RGB', (width, height), (236, 239, 244))
+    draw = ImageDraw.Draw(img)
+    panel_w = width // 3
+    for i, colour in enumerate([(255, 255, 255), (250, 250, 250), (40, 44, 52)]):
+        x0 = i * panel_w
+        draw.rectangle([x0 + 8, 48, x0 + panel_w - 8, height - 8], fill=colour)
+        ink = (30, 30, 30) if i < 2 else (200, 200, 200)
+        for y in range(64, height - 24, 22):
+            draw.text((x0 + 20, y), f"def handler_{y}(event): return process(event, {i}) # line {y}", fill=ink)
+    r, g, b = img.split()
+    return Image.merge('RGBA', (b, g, r, Image.new('L', img.size, 255))).tobytes()
+
+def run(raw: bytes, width: int, height: int, frames: int):
+    print(f"\n{width}x{height} ({width * height / 1e6:.1f} MP), {frames} frames per cap")
+    print(f"{'cap':>6} {'out':>11} {'reduce ms':>10} {'jpeg ms':>8} {'jpeg KB':>8} {'png ms':>8} {'png KB':>8}")
+    for cap in CAPS:
+        factor = reduction_factor(width, height, cap)
+        reduce_t = jpeg_t = png_t = 0.0
+        jpeg_bytes = png_bytes = 0
+        for _ in range(frames):
+            t0 = time.process_time()
+            frame = downscale_bgra(raw, width, height, factor)
+            t1 = time.process_time()
+            buffer = io.BytesIO()
+            frame.save(buffer, 'JPEG', quality=60, optimize=True)
+            t2 = time.process_time()
+            png = mss.tools.to_png(frame.tobytes(), frame.size)
+            t3 = time.process_time()
+            reduce_t += t1 - t0
+            jpeg_t += t2 - t1
+            png_t += t3 - t2
+            jpeg_bytes += buffer.tell()
+            png_bytes += len(png)
+        size = f"{frame.size[0]}x{frame.size[1]}"
+        print(f"{cap or 'none':>6} {size:>11} {reduce_t / frames * 1000:>10.1f} "
+              f"{jpeg_t / frames * 1000:>8.1f} {jpeg_bytes / frames / 1024:>8.0f} "
+              f"{png_t / frames * 1000:>8.1f} {png_bytes / frames / 1024:>8.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--live', action='store_true', help='grab the primary monitor instead of a synthetic frame')
+    parser.add_argument('--frames', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.live:
+        with mss.mss() as sct:
+            shot = sct.grab(sct.monitors[1])
+        run(shot.bgra, shot.size[0], shot.size[1], args.frames)
+    else:
+        for width, height in ((3840, 2160), (5120, 2880)):
+            run(synthetic_bgra(width, height), width, height, args.frames)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark per-frame allocations and peak RSS of the recording conversion path.
+
+Usage:
+    python scripts/benchmarks/bench_frame_convert.py [--frames N] [--size WxH] [--live]
+
+Each mode runs in its own subprocess so peak RSS is not shared between
+modes. Allocations are measured with tracemalloc (NumPy and OpenCV output
+arrays are traced) and reported as the number of allocations of at least
+one output frame's size per frame, plus total bytes allocated per frame.
+Without --live the source is a synthetic BGRA frame; with --live frames
+come from mss, whose own capture buffer is counted in every mode.
+
+Modes:
+    pil        PIL image -> np.array -> cv2.cvtColor (the old path)
+    alloc      np.asarray view of the capture -> cv2.cvtColor (new array per frame)
+    reuse      FrameConverter into preallocated buffers (BGR)
+    gray       FrameConverter, grayscale output
+    half       FrameConverter, downscaled to half resolution
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tracemalloc
+import numpy as np
+import cv2
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.collectors.recording_collector import FrameConverter  # noqa: E402
+
+MODES = ['pil', 'alloc', 'reuse', 'gray', 'half']
+
+def make_source(size, live):
+    if live:
+        import mss
+        sct = mss.mss()
+        monitor = sct.monitors[1]
+        return (lambda: np.asarray(sct.grab(monitor))), (monitor['width'], monitor['height'])
+    width, height = size
+    raw = np.random.default_rng(0).integers(0, 255, (height, width, 4), dtype=np.uint8)
+    return (lambda: raw), size
+
+def make_convert(mode, size):
+    if mode == 'pil':
+        def convert(raw):
+            image = Image.frombuffer('RGBA', size, raw, 'raw', 'RGBA', 0, 1)
+            return cv2.cvtColor(np.array(image), cv2.COLOR_RGBA2BGR)
+        return convert, size[0] * size[1] * 3
+    if mode == 'alloc':
+        return (lambda raw: cv2.cvtColor(raw, cv2.COLOR_BGRA2BGR)), size[0] * size[1] * 3
+    out_size = FrameConverter.output_size(size, scale=0.5) if mode == 'half' else size
+    converter = FrameConverter(size, out_size, grayscale=mode == 'gray')
+    return converter.convert, converter.buffers[0].nbytes
+
+def run_mode(mode, frames, size, live):
+    grab, size = make_source(size, live)
+    convert, frame_bytes = make_convert(mode, size)
+    for _ in range(3):  # warm up OpenCV and the buffers
+        convert(grab())
+
+    tracemalloc.start()
+    large = 0
+    total = 0
+    elapsed = 0.0
+    for _ in range(frames):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        convert(grab())
+        elapsed += time.perf_counter() - t0
+        transient = tracemalloc.get_traced_memory()[1] - base
+        total += transient
+        large += transient // frame_bytes
+    tracemalloc.stop()
+
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux
+    return {
+        'mode': mode,
+        'size': f"{size[0]}x{size[1]}",
+        'frame_allocs_per_frame': large / frames,
+        'kb_allocated_per_frame': total / frames / 1024,
+        'ms_per_frame': elapsed / frames * 1000,
+        'peak_rss_mb': rss_kb / 1024
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--size', default='1920x1080')
+    parser.add_argument('--live', action='store_true')
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.split('x'))
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.frames, size, args.live)))
+        return
+
+    print(f"{'mode':<6} {'size':>10} {'frame allocs/f':>15} {'KB alloc/f':>11} "
+          f"{'ms/f':>6} {'peak RSS MB':>12}")
+    for mode in MODES:
+        cmd = [sys.executable, __file__, '--mode', mode, '--frames', str(args.frames), '--size', args.size]
+        if args.live:
+            cmd.append('--live')
+        result = json.loads(subprocess.check_output(cmd).decode().strip().splitlines()[-1])
+        print(f"{result['mode']:<6} {result['size']:>10} {result['frame_allocs_per_frame']:>15.2f} "
+              f"{result['kb_allocated_per_frame']:>11.0f} {result['ms_per_frame']:>6.2f} "
+              f"{result['peak_rss_mb']:>12.1f}")
+
+if __name__ == '__main__':
+    main()
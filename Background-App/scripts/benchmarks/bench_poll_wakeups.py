@@ -0,0 +1,142 @@
+"""Wakeups per hour of the window poll and collector ticks: fixed vs idle backoff.
+
+Usage:
+    python scripts/benchmarks/bench_poll_wakeups.py [--seed N]
+
+Replays a synthetic 24 h day (three active blocks with reading pauses,
+lunch, a meeting away from the desk and the night) against the real
+IdleBackoff and CollectorScheduler on a simulated clock. The window poll
+is the ActiveWindowService thread (1 s, backing off to WINDOW_POLL_MAX);
+the collector ticks are the monitor's activity (60 s) and capture signal
+(5 s) jobs plus hourly cleanup, backing off to COLLECTOR_POLL_MAX. Input
+events reset the backoff exactly as the monitor's handlers do. Reports
+wakeups per hour over the day and over the idle stretches alone, and how
+late window switches are noticed while the user is active.
+"""
+import os
+import sys
+import random
+import asyncio
+import argparse
+from bisect import bisect_left
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.utils.idle_time import IdleBackoff, InputEventIdleProvider  # noqa: E402
+from src.utils.collector_scheduler import CollectorScheduler, FunctionCollector, CATCH_UP_DELAY  # noqa: E402
+from src.utils.config import (  # noqa: E402
+    WINDOW_POLL_MIN, WINDOW_POLL_MAX, COLLECTOR_POLL_MAX, POLL_BACKOFF_FACTOR, POLL_IDLE_AFTER
+)
+
+HOUR = 3600.0
+# (start, end) of active blocks, in hours from midnight
+ACTIVE = [(9.0, 12.0), (13.0, 15.0), (15.75, 18.0)]
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_trace(rng):
+    """Input event times and window switch times for one day."""
+    inputs, switches = [], []
+    for start, end in ACTIVE:
+        t, end = start * HOUR, end * HOUR
+        next_switch = t
+        while t < end:
+            if rng.random() < 0.01:
+                t += rng.uniform(20, 120)  # reading: no input for a while
+            else:
+                t += rng.uniform(0.5, 3.0)
+            inputs.append(t)
+            if t >= next_switch:
+                switches.append(t)
+                next_switch = t + rng.uniform(60, 240)
+    return inputs, switches
+
+def idle_seconds_in(times):
+    """How many of `times` fall outside the active blocks."""
+    return sum(1 for t in times if not any(s * HOUR <= t < e * HOUR for s, e in ACTIVE))
+
+def simulate_window_poll(inputs, adaptive):
+    clock = _Clock()
+    idle = InputEventIdleProvider(clock=clock)
+    backoff = IdleBackoff(idle, WINDOW_POLL_MIN, WINDOW_POLL_MAX if adaptive else WINDOW_POLL_MIN,
+                          factor=POLL_BACKOFF_FACTOR, idle_after=POLL_IDLE_AFTER)
+    polls, next_poll = [], 0.0
+    for t in inputs + [24 * HOUR]:
+        while next_poll <= t:
+            clock.now = next_poll
+            polls.append(next_poll)
+            next_poll += backoff.next_interval()
+        clock.now = t
+        idle.touch()
+        if adaptive and backoff.backed_off:
+            # ActiveWindowService.wake(): read now, back to the fast interval
+            backoff.reset()
+            next_poll = t
+    return polls
+
+def simulate_collectors(inputs, adaptive):
+    clock = _Clock()
+    idle = InputEventIdleProvider(clock=clock)
+    scheduler = CollectorScheduler(clock=clock)
+
+    def backoff(min_interval):
+        if not adaptive:
+            return None
+        return IdleBackoff(idle, min_interval, COLLECTOR_POLL_MAX,
+                           factor=POLL_BACKOFF_FACTOR, idle_after=POLL_IDLE_AFTER)
+
+    scheduler.add(FunctionCollector('activity', lambda now: None), 60, backoff=backoff(60))
+    scheduler.add(FunctionCollector('screenshots', lambda now: None), 5, policy=CATCH_UP_DELAY,
+                  backoff=backoff(5))
+    scheduler.add(FunctionCollector('cleanup', lambda now: None), HOUR, policy=CATCH_UP_DELAY)
+    wakeups = []
+
+    async def drive():
+        for t in inputs + [24 * HOUR]:
+            while scheduler.next_due() <= t:
+                clock.now = scheduler.next_due()
+                if await scheduler.run_pending():
+                    wakeups.append(clock.now)
+            clock.now = t
+            idle.touch()
+            if scheduler.backed_off:
+                scheduler.wake()
+
+    asyncio.run(drive())
+    return wakeups
+
+def detection_delays(polls, switches):
+    delays = []
+    for t in switches:
+        i = bisect_left(polls, t)
+        if i < len(polls):
+            delays.append(polls[i] - t)
+    return sorted(delays)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    inputs, switches = make_trace(random.Random(args.seed))
+    idle_hours = 24 - sum(e - s for s, e in ACTIVE)
+    print(f"24 h day: {sum(e - s for s, e in ACTIVE):.2f} h active, {idle_hours:.2f} h idle, "
+          f"{len(inputs)} input events, {len(switches)} window switches")
+    print(f"{'':<26} {'per hour':>9} {'idle per hour':>14} {'switch delay p50/max s':>23}")
+    for adaptive in (False, True):
+        label = "backoff" if adaptive else "fixed"
+        polls = simulate_window_poll(inputs, adaptive)
+        delays = detection_delays(polls, switches)
+        print(f"{'window poll, ' + label:<26} {len(polls) / 24:>9.0f} "
+              f"{idle_seconds_in(polls) / idle_hours:>14.0f} "
+              f"{delays[len(delays) // 2]:>11.2f} / {delays[-1]:.2f}")
+        wakeups = simulate_collectors(inputs, adaptive)
+        print(f"{'collector ticks, ' + label:<26} {len(wakeups) / 24:>9.0f} "
+              f"{idle_seconds_in(wakeups) / idle_hours:>14.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""CPU overhead of ResourceSampler at its configured cadence.
+
+Usage:
+    python scripts/benchmarks/bench_resource_sampler.py [--samples N]
+
+Takes N samples back to back (every RESOURCE_TOP_EVERY-th one walks the
+process table, as in production), measures the process CPU time per
+sample and per window() aggregate, and reports the overhead as a share of
+one core at RESOURCE_SAMPLE_INTERVAL, plus the ring's fixed memory.
+"""
+import os
+import sys
+import time
+import argparse
+import psutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.utils.resource_sampler import ResourceSampler  # noqa: E402
+from src.utils.config import RESOURCE_SAMPLE_INTERVAL, RESOURCE_TOP_EVERY  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=600)
+    args = parser.parse_args()
+
+    sampler = ResourceSampler()
+    sampler.sample()  # prime the CPU counters and psutil's process cache
+
+    t0 = time.process_time()
+    for i in range(args.samples):
+        sampler.sample(1_000.0 + i * RESOURCE_SAMPLE_INTERVAL)
+    per_sample = (time.process_time() - t0) / args.samples
+
+    t0 = time.process_time()
+    for _ in range(100):
+        sampler.window(1_000.0, 1_000.0 + 60 * RESOURCE_SAMPLE_INTERVAL)
+    per_window = (time.process_time() - t0) / 100
+
+    ring_bytes = sum(a.nbytes for a in (sampler.timestamps, sampler.cpu, sampler.memory,
+                                        sampler.top_pids, sampler.top_cpu, sampler.top_memory))
+    print(f"{args.samples} samples, process table walked every {RESOURCE_TOP_EVERY}th, "
+          f"{len(psutil.pids())} processes")
+    print(f"CPU per sample (amortized):  {per_sample * 1e3:.3f} ms")
+    print(f"CPU per window() aggregate:  {per_window * 1e3:.3f} ms")
+    print(f"overhead at {RESOURCE_SAMPLE_INTERVAL} s cadence:  "
+          f"{100 * per_sample / RESOURCE_SAMPLE_INTERVAL:.4f}% of one core")
+    print(f"ring memory:                 {ring_bytes / 1024:.1f} KiB (fixed)")
+    sampler.close()
+
+if __name__ == '__main__':
+    main()
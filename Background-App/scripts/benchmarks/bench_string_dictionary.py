@@ -0,0 +1,112 @@
+"""Compare database size and GROUP BY app speed: text columns vs interned ids.
+
+Usage:
+    python scripts/benchmarks/bench_string_dictionary.py [--rows N]
+
+Writes the same synthetic activity rows (a few dozen apps, a few hundred
+long window titles, Zipf-like reuse) into a database with the old TEXT
+schema and into one created by SQLiteManager, then reports file sizes and
+the time of a per-app GROUP BY on each. Both databases carry the same
+indexes, so the size difference is only the text vs id columns.
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.utils.sqlite_manager import SQLiteManager  # noqa: E402
+
+OLD_SCHEMA = """
+    CREATE TABLE local_activity_logs (
+        id TEXT PRIMARY KEY, user_id TEXT NOT NULL, time_entry_id TEXT,
+        app_name TEXT NOT NULL, window_title TEXT, activity_type TEXT NOT NULL,
+        keystroke_count INTEGER DEFAULT 0, mouse_events INTEGER DEFAULT 0,
+        idle_time INTEGER DEFAULT 0, is_synced INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_activity_logs_user_id ON local_activity_logs(user_id);
+    CREATE INDEX idx_activity_logs_sync ON local_activity_logs(is_synced);
+"""
+
+def make_rows(n, rng):
+    apps = [f"{name}.exe" for name in ("chrome", "code", "slack", "outlook", "excel", "teams", "figma",
+                                        "postman", "explorer", "notion", "zoom", "winword")] + \
+           [f"tool{i}.exe" for i in range(28)]
+    titles = {app: [f"{app[:-4].title()} - project-{j} / src/module_{j}/handler_{j * 7}.py — Workspace {j % 5}"
+                    for j in range(15)] for app in apps}
+    for i in range(n):
+        app = apps[min(int(rng.paretovariate(1.2)) - 1, len(apps) - 1)]
+        yield (f"al_{i}", "8c6f2b1e-6b0a-4b7e-9a61-2f4c3d9e1a77", None, app,
+               rng.choice(titles[app]), "window_focus")
+
+def group_by_time(path, query, repeat=5):
+    conn = sqlite3.connect(path)
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        conn.execute(query).fetchall()
+        best = min(best, time.perf_counter() - t0)
+    conn.close()
+    return best * 1000
+
+def table_bytes(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = 'local_activity_logs'").fetchone()[0]
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = list(make_rows(args.rows, random.Random(args.seed)))
+
+        text_path = os.path.join(tmp, 'text.db')
+        conn = sqlite3.connect(text_path)
+        conn.executescript(OLD_SCHEMA)
+        conn.executemany("""INSERT INTO local_activity_logs
+            (id, user_id, time_entry_id, app_name, window_title, activity_type) VALUES (?, ?, ?, ?, ?, ?)""", rows)
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.close()
+
+        interned_path = os.path.join(tmp, 'interned.db')
+        manager = SQLiteManager(interned_path)
+        with manager.get_connection() as conn:
+            encoded = [(r[0], r[1], r[2], manager.strings.intern(conn, r[3]),
+                        manager.strings.intern(conn, r[4]), r[5]) for r in rows]
+            conn.executemany("""INSERT INTO local_activity_logs
+                (id, user_id, time_entry_id, app_id, title_id, activity_type) VALUES (?, ?, ?, ?, ?, ?)""",
+                             encoded)
+        with manager.get_connection() as conn:
+            conn.execute("VACUUM")
+
+        text_size = os.path.getsize(text_path)
+        interned_size = os.path.getsize(interned_path)
+        text_ms = group_by_time(text_path, "SELECT app_name, COUNT(*) FROM local_activity_logs GROUP BY app_name")
+        interned_ms = group_by_time(interned_path, """
+            SELECT s.value, g.n FROM (SELECT app_id, COUNT(*) AS n FROM local_activity_logs GROUP BY app_id) g
+            JOIN local_strings s ON s.id = g.app_id""")
+
+        print(f"{args.rows} activity rows")
+        print(f"{'schema':<10} {'size MB':>9} {'GROUP BY app ms':>16}")
+        print(f"{'text':<10} {text_size / 1e6:>9.2f} {text_ms:>16.1f}")
+        print(f"{'interned':<10} {interned_size / 1e6:>9.2f} {interned_ms:>16.1f}")
+        print(f"size ratio {text_size / interned_size:.1f}x, GROUP BY speedup {text_ms / interned_ms:.1f}x")
+        try:
+            old_table, table = (table_bytes(path) for path in (text_path, interned_path))
+            print(f"activity table alone: {old_table / 1e6:.2f} MB -> {table / 1e6:.2f} MB "
+                  f"({old_table / table:.1f}x)")
+        except sqlite3.OperationalError:
+            pass  # SQLite built without the dbstat table
+
+if __name__ == '__main__':
+    main()
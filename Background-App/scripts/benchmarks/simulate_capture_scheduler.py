@@ -0,0 +1,82 @@
+"""Replay activity traces through the adaptive capture scheduler.
+
+Usage:
+    python scripts/benchmarks/simulate_capture_scheduler.py [trace.jsonl ...] [--budget N]
+
+Each JSONL line is {"t": seconds, "type": "focus"|"input"|"idle"|"change", "value": ...}.
+Without trace files a set of synthetic 8-hour traces is replayed. For each
+trace the fixed 300 s timer is compared with the adaptive scheduler.
+"""
+import os
+import sys
+import json
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from src.utils.capture_scheduler import AdaptiveCaptureScheduler, simulate  # noqa: E402
+
+HOURS = 8
+
+def static_reading(rng):
+    """Long stretches of reading one document: few inputs, almost no screen change."""
+    trace = []
+    for t in range(0, HOURS * 3600, 60):
+        trace.append({'t': t, 'type': 'input', 'value': rng.randint(0, 5)})
+        trace.append({'t': t, 'type': 'change', 'value': 0.002})
+    return trace
+
+def bursty_coding(rng):
+    """Typing bursts with frequent window switches between editor, terminal and browser."""
+    trace = []
+    t = 0
+    while t < HOURS * 3600:
+        burst = rng.randint(120, 900)
+        for s in range(t, t + burst, 10):
+            trace.append({'t': s, 'type': 'input', 'value': rng.randint(20, 60)})
+        trace.append({'t': t, 'type': 'focus', 'value': True})
+        trace.append({'t': t + burst // 2, 'type': 'change', 'value': rng.uniform(0.05, 0.4)})
+        t += burst + rng.randint(30, 300)
+    return trace
+
+def meetings_and_breaks(rng):
+    """Idle lunch break and a video meeting (constant screen change, little input)."""
+    trace = bursty_coding(rng)[:400]
+    trace.append({'t': 3 * 3600, 'type': 'idle', 'value': True})
+    trace.append({'t': 4 * 3600, 'type': 'idle', 'value': False})
+    for t in range(5 * 3600, 6 * 3600, 30):
+        trace.append({'t': t, 'type': 'change', 'value': 0.3})
+    return trace
+
+def fixed_timer(duration, interval=300):
+    return int(duration // interval) + 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('traces', nargs='*')
+    parser.add_argument('--budget', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.traces:
+        traces = {}
+        for path in args.traces:
+            with open(path) as f:
+                traces[os.path.basename(path)] = [json.loads(line) for line in f if line.strip()]
+    else:
+        traces = {fn.__name__: fn(rng) for fn in (static_reading, bursty_coding, meetings_and_breaks)}
+
+    print(f"{'trace':<22} {'fixed':>6} {'adaptive':>9} {'max/h':>6} {'min gap s':>10} {'per hour'}")
+    for name, trace in traces.items():
+        duration = max(e['t'] for e in trace) if trace else 0
+        if not args.traces:
+            duration = HOURS * 3600
+        scheduler = AdaptiveCaptureScheduler(hourly_budget=args.budget, rng=random.Random(args.seed))
+        report = simulate(trace, scheduler, duration=duration)
+        min_gap = f"{report['min_spacing']:.0f}" if report['min_spacing'] is not None else '-'
+        print(f"{name:<22} {fixed_timer(duration):>6} {report['captures']:>9} "
+              f"{report['max_in_any_hour']:>6} {min_gap:>10} {report['captures_per_hour']}")
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,16 @@
 import os
 import time
 import logging
-import psutil
-import sys
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
 from ..utils.database import LocalDatabase
-
-# Only import these on Windows
-if sys.platform == "win32":
-    import win32gui
-    import win32process
-else:
-    win32gui = None
-    win32process = None
+from ..utils.process_cache import get_process_cache
+from ..utils.active_window import get_active_window_service
+from ..utils.sessionizer import SessionBuilder
+from ..utils.idle_time import get_idle_provider
+from ..utils.resource_sampler import get_resource_sampler
+from ..utils.config import TITLE_MIN_DWELL
+from ..utils.collector_scheduler import Collector
 
 # Configure logging
 logging.basicConfig(
@@ -26,7 +23,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class ActivityCollector:
+class ActivityCollector(Collector):
+    name = "activity"
+
     def __init__(self, user_id: str, idle_threshold: int = 300):
         self.user_id = user_id
         self.db = LocalDatabase()
@@ -38,36 +37,27 @@ class ActivityCollector:
         self.idle_start_time = None
         self.total_idle_time = 0
         self.total_active_time = 0
+        self.processes = get_process_cache()
+        self.window_service = get_active_window_service()
+        self.idle = get_idle_provider()
+        self.resources = get_resource_sampler()
+        # Decides what counts as a window change: titles are normalized by the
+        # service and a new title must hold for TITLE_MIN_DWELL seconds
+        self.sessions = SessionBuilder(min_title_dwell=TITLE_MIN_DWELL)
         logger.info(f"Activity collector initialized for user {user_id}")
 
     def get_active_window_info(self) -> Dict[str, Optional[object]]:
-        """Get information about the currently active window (Windows only)."""
-        if sys.platform != "win32" or win32gui is None or win32process is None:
-            return {
-                "app_name": None,
-                "window_title": None,
-                "process_id": None,
-                "cpu_usage": 0.0,
-                "memory_usage": 0,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-
+        """Get information about the currently active window."""
         try:
-            window_handle = win32gui.GetForegroundWindow()
-            _, pid = win32process.GetWindowThreadProcessId(window_handle)
-            process = psutil.Process(pid)
-            app_name = process.name()
-            window_title = win32gui.GetWindowText(window_handle)
-
-            cpu_percent = process.cpu_percent(interval=None)
-            memory_info = process.memory_info()
-
+            window = self.window_service.get()
+            pid = window["pid"]
             return {
-                "app_name": app_name,
-                "window_title": window_title,
+                "app_name": window["app_name"],
+                "window_title": window["window_title"],
                 "process_id": pid,
-                "cpu_usage": cpu_percent,
-                "memory_usage": memory_info.rss,
+                # The cached Process object keeps cpu_percent's previous sample
+                "cpu_usage": self.processes.cpu_percent(pid) if pid else 0.0,
+                "memory_usage": self.processes.memory_rss(pid) if pid else 0,
                 "timestamp": datetime.utcnow().isoformat()
             }
 
@@ -82,44 +72,53 @@ class ActivityCollector:
                 "timestamp": datetime.utcnow().isoformat()
             }
 
-    def check_idle_state(self) -> bool:
-        """Check if the system is idle based on time since last activity."""
-        current_time = time.time()
-        idle_duration = current_time - self.last_activity_time
+    def check_idle_state(self, current_time: Optional[float] = None) -> bool:
+        """Check if the system is idle based on the OS time since last input."""
+        current_time = time.time() if current_time is None else current_time
+        idle_duration = self.idle.seconds()
 
         if idle_duration >= self.idle_threshold and not self.is_idle:
             self.is_idle = True
-            self.idle_start_time = current_time
+            # Idle started at the last input, not when the threshold was crossed
+            self.idle_start_time = current_time - idle_duration
             logger.info("System entered idle state")
             return True
 
         if idle_duration < self.idle_threshold and self.is_idle:
             self.is_idle = False
             if self.idle_start_time is not None:
-                self.total_idle_time += current_time - self.idle_start_time
+                self.total_idle_time += current_time - idle_duration - self.idle_start_time
                 self.idle_start_time = None
             logger.info("System returned from idle state")
             return False
 
         return self.is_idle
 
-    def collect_activity(self) -> Optional[Dict]:
+    def tick(self, now: float) -> Optional[Dict]:
+        return self.collect_activity(now)
+
+    def collect_activity(self, now: Optional[float] = None) -> Optional[Dict]:
         """Collect and log activity whenever something changes."""
         try:
-            now = time.time()
+            now = time.time() if now is None else now
             info = self.get_active_window_info()
-            is_idle = self.check_idle_state()
+            was_idle = self.is_idle
+            is_idle = self.check_idle_state(now)
             delta = now - self.last_activity_time
 
             if not is_idle:
                 self.total_active_time += delta
 
+            previous = self.sessions.current
+            self.sessions.observe(info["app_name"], info["window_title"], now)
+            window_changed = self.sessions.current is not previous
+            if window_changed:
+                self.idle.touch()  # a focus change is input, for the input-event fallback
+
             # Only log on state or window/app change
-            if (
-                info["window_title"] != self.last_window_title or
-                info["app_name"]     != self.last_app_name or
-                is_idle              != self.is_idle
-            ):
+            if window_changed or is_idle != was_idle:
+                # System load over the stretch this record closes
+                resources = self.resources.window(self.last_activity_time, now)
                 record = {
                     "user_id":         self.user_id,
                     "app_name":        info["app_name"],
@@ -127,6 +126,9 @@ class ActivityCollector:
                     "activity_type":   "idle" if is_idle else "window_focus",
                     "cpu_usage":       info["cpu_usage"],
                     "memory_usage":    info["memory_usage"],
+                    "cpu_percent":     resources["cpu_percent"],
+                    "memory_percent":  resources["memory_percent"],
+                    "resources":       resources,
                     "is_idle":         is_idle,
                     "idle_duration":   delta if is_idle else 0,
                     "total_idle_time": self.total_idle_time,
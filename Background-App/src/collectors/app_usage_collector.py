@@ -1,122 +1,87 @@
-import sys
 import time
-import platform
-from datetime import datetime
 from typing import Optional, Dict
 from loguru import logger
+from ..utils.active_window import get_active_window_service
+from ..utils.sessionizer import SessionBuilder
+from ..utils.classifier import get_classifier
+from ..utils.idle_time import IdleProvider, get_idle_provider
+from ..utils.sqlite_manager import SQLiteManager
+from ..utils.config import (
+    TITLE_MIN_DWELL,
+    IDLE_THRESHOLD,
+    APP_SESSION_CHECKPOINT,
+    APP_SESSION_MIN_SECONDS
+)
+from ..utils.collector_scheduler import Collector
 
-if platform.system() == "Windows":
-    import psutil
-    import win32gui
-    import win32process
-elif platform.system() == "Darwin":
-    import psutil
-    from AppKit import NSWorkspace
-elif platform.system() == "Linux":
-    import psutil
-    import subprocess
+class AppUsageCollector(Collector):
+    name = "app_usage"
 
-class AppUsageCollector:
-    def __init__(self, user_id: str):
+    def __init__(self, user_id: str, idle_threshold: int = IDLE_THRESHOLD,
+                 sqlite_db: Optional[SQLiteManager] = None, idle: Optional[IdleProvider] = None):
         self.user_id = user_id
-        self.last_app: Optional[str] = None
-        self.last_title: Optional[str] = None
-        self.last_time: float = time.time()
-        self.usage_log = []  # List of (app_name, window_title, start_time, duration)
+        self.sqlite_db = sqlite_db or SQLiteManager()
+        # Seconds since the last input; past idle_threshold the open session is closed
+        self.idle = idle or get_idle_provider()
+        self.idle_threshold = idle_threshold
+        # Focus observations are merged into sessions; one usage per context switch
+        # Titles come normalized from the window service; a changed title must
+        # also hold for TITLE_MIN_DWELL seconds before it counts as a new session.
+        # Closed sessions and checkpoints of the open one are written locally
+        self.sessions = SessionBuilder(
+            on_close=self._persist_session,
+            on_checkpoint=lambda session: self._persist_session(session, is_open=True),
+            checkpoint_interval=APP_SESSION_CHECKPOINT,
+            min_duration=APP_SESSION_MIN_SECONDS,
+            min_title_dwell=TITLE_MIN_DWELL,
+            classify=get_classifier().classify
+        )
+        self.window_service = get_active_window_service()
 
     def get_active_window(self) -> Dict[str, Optional[str]]:
-        system = platform.system()
-        if system == "Windows":
-            try:
-                hwnd = win32gui.GetForegroundWindow()
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                process = psutil.Process(pid)
-                app_name = process.name()
-                window_title = win32gui.GetWindowText(hwnd)
-                return {"app_name": app_name, "window_title": window_title}
-            except Exception as e:
-                logger.error(f"Error getting active window (Windows): {e}")
-                return {"app_name": None, "window_title": None}
-        elif system == "Darwin":
-            try:
-                active_app = NSWorkspace.sharedWorkspace().frontmostApplication()
-                app_name = active_app.localizedName()
-                window_title = app_name  # macOS does not provide window title easily
-                return {"app_name": app_name, "window_title": window_title}
-            except Exception as e:
-                logger.error(f"Error getting active window (macOS): {e}")
-                return {"app_name": None, "window_title": None}
-        elif system == "Linux":
-            try:
-                # Try to get the active window using xprop and wmctrl
-                win_id = subprocess.check_output([
-                    'xprop', '-root', '_NET_ACTIVE_WINDOW'
-                ]).decode().strip().split()[-1]
-                win_id = win_id if win_id != '0x0' else None
-                if win_id:
-                    win_name = subprocess.check_output([
-                        'xprop', '-id', win_id, 'WM_NAME'
-                    ]).decode()
-                    window_title = win_name.split('=')[-1].strip().strip('"')
-                    # Try to get the PID
-                    pid_line = subprocess.check_output([
-                        'xprop', '-id', win_id, '_NET_WM_PID'
-                    ]).decode()
-                    pid = int(pid_line.split()[-1])
-                    app_name = psutil.Process(pid).name()
-                    return {"app_name": app_name, "window_title": window_title}
-                else:
-                    return {"app_name": None, "window_title": None}
-            except Exception as e:
-                logger.error(f"Error getting active window (Linux): {e}")
-                return {"app_name": None, "window_title": None}
-        else:
-            return {"app_name": None, "window_title": None}
+        window = self.window_service.get()
+        return {"app_name": window["app_name"], "window_title": window["window_title"]}
+
+    def _persist_session(self, session: Dict, is_open: bool = False):
+        self.sqlite_db.upsert_app_session(self.user_id, None, session, is_open=is_open)
+
+    def _usage(self, session: Dict) -> Dict:
+        return {
+            "user_id": self.user_id,
+            "timestamp": session["end_time"],
+            "start_time": session["start_time"],
+            "app_name": session["app_name"],
+            "window_title": session["window_title"],
+            "category": session["category"],
+            "duration": session["duration"]
+        }
 
-    def collect(self) -> Optional[Dict]:
-        now = time.time()
-        window_info = self.get_active_window()
-        app_name = window_info["app_name"]
-        window_title = window_info["window_title"]
-        if app_name is None:
+    def tick(self, now: float) -> Optional[Dict]:
+        return self.collect(now)
+
+    def collect(self, now: Optional[float] = None) -> Optional[Dict]:
+        now = time.time() if now is None else now
+        idle_time = self.idle.seconds()
+        if idle_time >= self.idle_threshold:
+            # The session ends when input stopped, not when the idle poll noticed
+            closed = self.sessions.observe_idle(now - idle_time)
+        else:
+            window_info = self.get_active_window()
+            if window_info["app_name"] is None:
+                return None
+            # Returns the previous session once the focused window changes
+            closed = self.sessions.observe(window_info["app_name"], window_info["window_title"], now)
+        if closed is None:
             return None
-        if (app_name != self.last_app) or (window_title != self.last_title):
-            # Log the previous app usage
-            if self.last_app is not None:
-                duration = int(now - self.last_time)
-                usage = {
-                    "user_id": self.user_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "app_name": self.last_app,
-                    "window_title": self.last_title,
-                    "duration": duration
-                }
-                self.usage_log.append(usage)
-                logger.info(f"App usage: {usage}")
-            # Update last seen
-            self.last_app = app_name
-            self.last_title = window_title
-            self.last_time = now
-        # Return the most recent usage if available
-        if self.usage_log:
-            return self.usage_log.pop(0)
-        return None
+        usage = self._usage(closed)
+        logger.info(f"App usage: {usage}")
+        return usage
 
     def flush(self) -> Optional[Dict]:
         # Call this on shutdown to log the last app usage
-        now = time.time()
-        if self.last_app is not None:
-            duration = int(now - self.last_time)
-            usage = {
-                "user_id": self.user_id,
-                "timestamp": datetime.now().isoformat(),
-                "app_name": self.last_app,
-                "window_title": self.last_title,
-                "duration": duration
-            }
-            self.last_app = None
-            self.last_title = None
-            self.last_time = now
-            logger.info(f"App usage (flush): {usage}")
-            return usage
-        return None 
\ No newline at end of file
+        closed = self.sessions.close(time.time())
+        if closed is None:
+            return None
+        usage = self._usage(closed)
+        logger.info(f"App usage (flush): {usage}")
+        return usage
@@ -1,62 +1,569 @@
 import uuid
 import os
-from datetime import datetime
+import time
+import queue
+import logging
+import threading
+from datetime import datetime, timedelta
 import platform
 import cv2
 import numpy as np
-import pyautogui
-from utils.sqlite_manager import SQLiteManager
+import mss
+from ..utils.sqlite_manager import SQLiteManager
+from ..utils.config import (
+    RECORDING_FPS,
+    RECORDING_MODE,
+    RECORDING_SEGMENT_SECONDS,
+    RECORDING_MAX_LONG_EDGE,
+    RECORDING_GRAYSCALE,
+    CLIP_BUFFER_SECONDS,
+    CLIP_FPS,
+    CLIP_MAX_LONG_EDGE,
+    CLIP_TITLE_PATTERNS,
+    CLIP_COOLDOWN
+)
+from ..utils.clip_buffer import FrameRing, TitleTrigger, InputRateAnomaly, Cooldown
+from ..utils.process_cache import get_process_cache, foreground_pid
+from ..utils.frame_ops import reduction_factor
+
+logger = logging.getLogger(__name__)
 
 TERMINAL_APPS = [
-    "cmd.exe", "powershell.exe", "conhost.exe", # Windows
-    "gnome-terminal", "xterm", "konsole", "bash", "zsh" # Linux
+    "cmd.exe", "powershell.exe", "pwsh.exe", "conhost.exe", "windowsterminal.exe", # Windows
+    "gnome-terminal", "gnome-terminal-server", "xterm", "konsole", "bash", "zsh", # Linux
+    "terminal", "iterm2" # macOS
 ]
 
-def is_terminal_active():
-    try:
-        import psutil
-        for proc in psutil.process_iter(['name']):
-            name = proc.info['name']
-            if name and name.lower() in TERMINAL_APPS:
-                if proc.status() == psutil.STATUS_RUNNING:
-                    return True
-    except Exception:
-        pass
-    return False
+def is_terminal_active(processes=None):
+    """Whether the focused window belongs to a terminal."""
+    pid = foreground_pid()
+    if pid is None:
+        return False
+    name = (processes or get_process_cache()).name(pid)
+    return bool(name) and name.lower() in TERMINAL_APPS
+
+class FrameConverter:
+    """Converts raw captures into preallocated output frames.
+
+    mss hands out BGRA; the encoder wants BGR (or single-channel gray),
+    possibly smaller. Every conversion writes into a buffer allocated once
+    up front: the optional area resize goes into a reused scratch frame and
+    `cv2.cvtColor(dst=...)` into either a caller-supplied array or the next
+    of `buffers` rotating outputs. A returned frame stays valid until
+    `buffers` further conversions, so with two buffers the encoder can hold
+    on to the previous frame for gap filling while converting the next.
+    """
+
+    def __init__(self, in_size, out_size=None, grayscale=False, buffers=2):
+        self.in_size = in_size
+        self.out_size = out_size or in_size
+        self.grayscale = grayscale
+        width, height = self.out_size
+        shape = (height, width) if grayscale else (height, width, 3)
+        self.buffers = [np.empty(shape, dtype=np.uint8) for _ in range(buffers)]
+        self._next = 0
+        self._scaled = None
+
+    @property
+    def is_color(self):
+        return not self.grayscale
+
+    def _resize(self, frame):
+        if self.out_size == self.in_size:
+            return frame
+        if self._scaled is None or self._scaled.shape[2:] != frame.shape[2:]:
+            width, height = self.out_size
+            self._scaled = np.empty((height, width) + frame.shape[2:], dtype=np.uint8)
+        cv2.resize(frame, self.out_size, dst=self._scaled, interpolation=cv2.INTER_AREA)
+        return self._scaled
+
+    def convert(self, frame, dst=None):
+        if dst is None:
+            dst = self.buffers[self._next]
+            self._next = (self._next + 1) % len(self.buffers)
+        frame = self._resize(frame)
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        if channels == 4:
+            cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY if self.grayscale else cv2.COLOR_BGRA2BGR, dst=dst)
+        elif channels == 3 and self.grayscale:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=dst)
+        else:
+            np.copyto(dst, frame)
+        return dst
+
+    @staticmethod
+    def output_size(size, max_long_edge=None, scale=None):
+        """Frame size after the resolution cap, rounded down to even dimensions."""
+        factor = reduction_factor(size[0], size[1], max_long_edge, scale)
+        if factor <= 1:
+            return size
+        return (max(2, size[0] // factor) & ~1, max(2, size[1] // factor) & ~1)
+
+class SegmentWriter:
+    """Writes a recording as fixed-length, independently playable MP4 segments.
+
+    Frames are routed by their slot index, so slot `i` always lands in
+    segment `i // segment_slots`. Each segment is closed (and `on_segment`
+    called with its details) as soon as the first frame of the next one
+    arrives, so it can be uploaded while recording continues. Without
+    `segment_slots` everything goes to `base_path`.
+    """
+
+    def __init__(self, base_path, fps, size, segment_slots=None, vfr=False, on_segment=None, is_color=True):
+        self.base_path = base_path
+        self.fps = fps
+        self.size = size
+        self.is_color = is_color
+        self.segment_slots = segment_slots
+        self.vfr = vfr
+        self.on_segment = on_segment
+        self.segments = []
+        self._writer = None
+        self._timestamps = None
+        self._current = None
+
+    def _path(self, index):
+        if not self.segment_slots:
+            return self.base_path
+        stem, ext = os.path.splitext(self.base_path)
+        return f"{stem}_{index:04d}{ext}"
+
+    def write(self, frame, slot):
+        index = slot // self.segment_slots if self.segment_slots else 0
+        if self._current is None or index != self._current["index"]:
+            self._close_current()
+            self._open(index)
+        self._writer.write(frame)
+        self._current["frames"] += 1
+        self._current["end_slot"] = slot + 1
+        if self._timestamps:
+            self._timestamps.write(f"{(slot - self._current['start_slot']) * 1000.0 / self.fps:.3f}\n")
+
+    def _open(self, index):
+        path = self._path(index)
+        self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, self.size,
+                                       self.is_color)
+        timestamps_path = f"{path}.timestamps.txt" if self.vfr else None
+        if timestamps_path:
+            self._timestamps = open(timestamps_path, "w")
+            self._timestamps.write("# timestamp format v2\n")
+        start_slot = index * self.segment_slots if self.segment_slots else 0
+        self._current = {"index": index, "path": path, "timestamps_path": timestamps_path,
+                         "start_slot": start_slot, "end_slot": start_slot,
+                         "start_offset": start_slot / self.fps, "frames": 0}
+
+    def _close_current(self, end_slot=None):
+        if self._current is None:
+            return
+        self._writer.release()
+        if self._timestamps:
+            self._timestamps.close()
+        segment = self._current
+        if self.segment_slots:
+            # A segment spans its whole slot range, even if VFR skipped its tail
+            end_slot = min(end_slot or segment["start_slot"] + self.segment_slots,
+                           segment["start_slot"] + self.segment_slots)
+        segment["duration"] = ((end_slot or segment["end_slot"]) - segment["start_slot"]) / self.fps
+        self.segments.append(segment)
+        self._writer = self._timestamps = self._current = None
+        if self.on_segment:
+            try:
+                self.on_segment(segment)
+            except Exception as e:
+                logger.error(f"Error handing off segment {segment['path']}: {e}")
+
+    def close(self, total_slots=None):
+        """Close the last segment; `total_slots` is where the recording actually ended."""
+        self._close_current(total_slots)
+
+class PacedRecorder:
+    """Screen recorder with a paced capture thread and a separate encoder thread.
+
+    The capture thread wakes on a fixed wall-clock grid (`start + i / fps`)
+    and hands frames to the encoder through a bounded queue. Slot `i` of the
+    output is always written at position `i`: if capture falls behind and
+    misses slots, or a frame is dropped because the encoder is behind and
+    the queue is full, the encoder repeats the previous frame. The file
+    therefore always holds `fps * duration` frames whose timing matches real
+    time, and neither thread ever spins.
+
+    In "vfr" mode the capture thread compares each frame with the last kept
+    one on a strided 1/16 sample and skips it when the mean difference is
+    below `change_threshold` (0-255 scale), still keeping one frame every
+    `max_gap` seconds. Only changed frames are encoded, and their real
+    timestamps go to a `<file>.timestamps.txt` sidecar in mkvmerge
+    "timestamp format v2", so the file can be remuxed to a VFR container
+    (`mkvmerge --timestamps 0:<sidecar> -o out.mkv <file>`).
+
+    With `segment_seconds` the output is split into `<file>_NNNN.mp4`
+    segments by SegmentWriter, each handed to `on_segment` as it closes.
+
+    Captured frames are views of mss's own buffer; the encoder converts
+    them through a FrameConverter into two preallocated frames, optionally
+    downscaled (`max_long_edge` / `scale`) and/or grayscale.
+    """
+
+    def __init__(self, file_path, fps=20.0, monitor_index=1, queue_size=None, grab=None, size=None,
+                 mode="cfr", change_threshold=0.5, max_gap=2.0, segment_seconds=None, on_segment=None,
+                 grayscale=False, max_long_edge=None, scale=None, clock=time.perf_counter, wait=None):
+        self.file_path = file_path
+        self.fps = fps
+        self.mode = mode
+        self.grayscale = grayscale
+        self.max_long_edge = max_long_edge
+        self.scale = scale
+        self.segment_seconds = segment_seconds
+        self.on_segment = on_segment
+        self.change_threshold = change_threshold
+        self.max_gap = max_gap
+        self.timestamps_path = (f"{file_path}.timestamps.txt"
+                                if mode == "vfr" and not segment_seconds else None)
+        self.monitor_index = monitor_index
+        self.queue_size = queue_size or max(2, int(fps * 2))
+        self._grab = grab  # injectable frame source: () -> BGRA/BGR ndarray
+        self._size = size
+        self._stop = threading.Event()
+        # Like `grab`, the pacing clock and the interruptible sleep can be swapped out
+        self._clock = clock
+        self._wait = wait or self._stop.wait
+        self.stats = {"captured": 0, "written": 0, "dropped": 0, "duplicated": 0, "skipped": 0}
+        self._end_slot = None
+
+    def stop(self):
+        self._stop.set()
+
+    def record(self, duration):
+        """Record for `duration` seconds, returning frame statistics."""
+        frames = queue.Queue(maxsize=self.queue_size)
+        total_slots = int(round(duration * self.fps))
+        ready = threading.Event()
+        errors = []
+
+        capture = threading.Thread(
+            target=self._capture_loop, args=(frames, total_slots, ready, errors),
+            name="recording-capture", daemon=True
+        )
+        capture.start()
+        ready.wait()
+        if errors:
+            capture.join()
+            raise errors[0]
+
+        segment_slots = int(round(self.segment_seconds * self.fps)) if self.segment_seconds else None
+        converter = FrameConverter(self._size,
+                                   FrameConverter.output_size(self._size, self.max_long_edge, self.scale),
+                                   grayscale=self.grayscale)
+        writer = SegmentWriter(self.file_path, self.fps, converter.out_size, segment_slots,
+                               vfr=self.mode == "vfr", on_segment=self.on_segment,
+                               is_color=converter.is_color)
+        encode_loop = self._encode_vfr_loop if self.mode == "vfr" else self._encode_loop
+        encoder = threading.Thread(
+            target=encode_loop, args=(frames, writer, converter, total_slots),
+            name="recording-encoder", daemon=True
+        )
+        encoder.start()
+        capture.join()
+        encoder.join()
+        writer.close(self._end_slot)
+        if self.stats["dropped"] or self.stats["duplicated"]:
+            logger.info(f"Recording {self.file_path}: {self.stats}")
+        return dict(self.stats, slots=total_slots, fps=self.fps, segments=writer.segments)
+
+    def _capture_loop(self, frames, total_slots, ready, errors):
+        sct = None
+        try:
+            if self._grab is None:
+                # mss handles are per-thread, so it is opened here
+                sct = mss.mss()
+                monitor = sct.monitors[self.monitor_index]
+                self._size = (monitor["width"], monitor["height"])
+                grab = lambda: np.asarray(sct.grab(monitor))  # noqa: E731
+            else:
+                grab = self._grab
+                if self._size is None:
+                    first = grab()
+                    self._size = (first.shape[1], first.shape[0])
+        except Exception as e:
+            errors.append(e)
+            ready.set()
+            return
+        ready.set()
+
+        period = 1.0 / self.fps
+        start = self._clock()
+        next_slot = 0
+        vfr = self.mode == "vfr"
+        max_gap_slots = max(1, int(self.max_gap * self.fps))
+        last_sample = None
+        last_kept = -max_gap_slots
+        try:
+            while next_slot < total_slots and not self._stop.is_set():
+                delay = start + next_slot * period - self._clock()
+                if delay > 0 and self._wait(delay):
+                    break
+                # If capture overran, skip to the slot wall-clock time is in now
+                slot = max(next_slot, int((self._clock() - start) / period))
+                if slot >= total_slots:
+                    break
+                frame = grab()
+                self.stats["captured"] += 1
+                if vfr:
+                    sample = frame[::16, ::16, :3].astype(np.int16)
+                    if (last_sample is not None and slot - last_kept < max_gap_slots
+                            and np.abs(sample - last_sample).mean() < self.change_threshold):
+                        self.stats["skipped"] += 1
+                        next_slot = slot + 1
+                        continue
+                    last_sample = sample
+                    last_kept = slot
+                try:
+                    frames.put_nowait((slot, frame))
+                except queue.Full:
+                    self.stats["dropped"] += 1
+                next_slot = slot + 1
+        except Exception as e:
+            logger.error(f"Error capturing recording frame: {e}")
+        finally:
+            # Stopping early ends the recording at the last slot reached
+            self._end_slot = min(next_slot, total_slots) if self._stop.is_set() else total_slots
+            frames.put(None)
+            if sct is not None:
+                sct.close()
+
+    def _encode_loop(self, frames, writer, converter, total_slots):
+        last = None
+        written = 0
+        while True:
+            item = frames.get()
+            if item is None:
+                break
+            slot, frame = item
+            # Alternates between two buffers, so `last` is still intact
+            frame = converter.convert(frame)
+            # Fill missed slots so output time stays locked to wall-clock time
+            filler = last if last is not None else frame
+            while written < slot:
+                writer.write(filler, written)
+                written += 1
+                self.stats["duplicated"] += 1
+            writer.write(frame, slot)
+            written += 1
+            last = frame
+        while last is not None and written < self._end_slot:
+            writer.write(last, written)
+            written += 1
+            self.stats["duplicated"] += 1
+        self.stats["written"] = written
+
+    def _encode_vfr_loop(self, frames, writer, converter, total_slots):
+        """Write only the frames that changed and log their real timestamps."""
+        written = 0
+        while True:
+            item = frames.get()
+            if item is None:
+                break
+            slot, frame = item
+            frame = converter.convert(frame)
+            writer.write(frame, slot)  # the segment writer logs the timestamp
+            written += 1
+        self.stats["written"] = written
+
+class RollingClipRecorder:
+    """Keeps the last few seconds of low-resolution frames and writes a clip on trigger.
+
+    A capture thread paced at `fps` downscales each frame straight into the
+    next slot of a preallocated FrameRing, so memory is fixed at
+    `ring.nbytes` from the start. Nothing touches the disk until `trigger()`
+    is called: by a window title matching a policy pattern, an input-rate
+    anomaly, or an explicit request (e.g. an admin over the WebSocket).
+    While a clip is being encoded the ring is frozen and new frames are
+    skipped rather than buffered elsewhere.
+    """
+
+    def __init__(self, output_dir, seconds=CLIP_BUFFER_SECONDS, fps=CLIP_FPS,
+                 max_long_edge=CLIP_MAX_LONG_EDGE, title_patterns=CLIP_TITLE_PATTERNS,
+                 cooldown=CLIP_COOLDOWN, monitor_index=1, on_clip=None, grab=None, screen_size=None):
+        self.output_dir = output_dir
+        self.fps = fps
+        self.monitor_index = monitor_index
+        self.on_clip = on_clip
+        self._grab = grab
+        self.title_trigger = TitleTrigger(title_patterns)
+        self.input_anomaly = InputRateAnomaly()
+        self.cooldown = Cooldown(cooldown)
+        os.makedirs(output_dir, exist_ok=True)
+
+        if screen_size is None:
+            with mss.mss() as sct:
+                monitor = sct.monitors[monitor_index]
+                screen_size = (monitor["width"], monitor["height"])
+        self.screen_size = screen_size
+        scale = min(1.0, max_long_edge / max(screen_size))
+        size = (max(2, int(screen_size[0] * scale)) & ~1, max(2, int(screen_size[1] * scale)) & ~1)
+        self.ring = FrameRing(max(1, int(seconds * fps)), size)
+        self.converter = FrameConverter(screen_size, size, buffers=0)  # converts into ring slots
+        self._freeze = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._pending = []
+        self._threads = []
+        self.stats = {"captured": 0, "skipped": 0, "clips": 0}
+        logger.info(f"Clip buffer: {len(self.ring.frames)} frames of {size[0]}x{size[1]}, "
+                    f"{self.ring.nbytes / 1024 / 1024:.1f}MB preallocated")
+
+    def start(self):
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="clip-capture", daemon=True),
+            threading.Thread(target=self._persist_loop, name="clip-persist", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def trigger(self, reason):
+        """Ask for the buffered clip to be written; rate-limited by the cooldown."""
+        if not self.cooldown.ready():
+            return False
+        self._pending.append((reason, time.time()))
+        self._wake.set()
+        return True
+
+    def observe_window(self, title):
+        if self.title_trigger.matches(title):
+            return self.trigger(f"title:{title}")
+        return False
+
+    def observe_input(self, now, event_total):
+        if self.input_anomaly.observe(now, event_total):
+            return self.trigger("input-anomaly")
+        return False
+
+    def _capture_loop(self):
+        sct = None
+        try:
+            if self._grab is None:
+                sct = mss.mss()
+                monitor = sct.monitors[self.monitor_index]
+                grab = lambda: np.asarray(sct.grab(monitor))  # noqa: E731
+            else:
+                grab = self._grab
+            period = 1.0 / self.fps
+            start = time.perf_counter()
+            tick = 0
+            while not self._stop.is_set():
+                delay = start + tick * period - time.perf_counter()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+                tick = max(tick + 1, int((time.perf_counter() - start) / period))
+                frame = grab()
+                self.stats["captured"] += 1
+                if not self._freeze.acquire(blocking=False):
+                    self.stats["skipped"] += 1  # a clip is being written from the ring
+                    continue
+                try:
+                    self.converter.convert(frame, dst=self.ring.slot())
+                    self.ring.commit(time.time())
+                finally:
+                    self._freeze.release()
+        except Exception as e:
+            logger.error(f"Error in clip capture loop: {e}")
+        finally:
+            if sct is not None:
+                sct.close()
+
+    def _persist_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            while self._pending:
+                reason, requested_at = self._pending.pop(0)
+                try:
+                    clip = self._write_clip(reason, requested_at)
+                except Exception as e:
+                    logger.error(f"Error writing clip ({reason}): {e}")
+                    continue
+                if clip and self.on_clip:
+                    self.on_clip(clip)
+
+    def _write_clip(self, reason, requested_at):
+        with self._freeze:
+            order = self.ring.order()
+            if not len(order):
+                return None
+            file_id = str(uuid.uuid4())
+            file_path = os.path.join(self.output_dir, f"{file_id}.mp4")
+            writer = cv2.VideoWriter(file_path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, self.ring.size)
+            for index in order:
+                writer.write(self.ring.frames[index])
+            writer.release()
+            started, ended = self.ring.timestamps[order[0]], self.ring.timestamps[order[-1]]
+        self.stats["clips"] += 1
+        logger.info(f"Persisted {len(order)}-frame clip for trigger {reason}: {file_path}")
+        return {
+            "id": file_id,
+            "file_path": file_path,
+            "file_size": os.path.getsize(file_path),
+            "duration": float(ended - started) + 1.0 / self.fps,
+            "started_at": datetime.utcfromtimestamp(started).isoformat(),
+            "trigger": reason,
+            "requested_at": datetime.utcfromtimestamp(requested_at).isoformat()
+        }
 
 class RecordingCollector:
-    def __init__(self, user_id, output_dir="data/recordings"):
+    def __init__(self, user_id, output_dir="data/recordings", fps=RECORDING_FPS, mode=RECORDING_MODE,
+                 segment_seconds=RECORDING_SEGMENT_SECONDS, uploader=None, sqlite_db=None):
         self.user_id = user_id
         self.output_dir = output_dir
-        self.sqlite_db = SQLiteManager()
+        self.fps = fps
+        self.mode = mode  # "cfr" writes every slot, "vfr" only changed frames
+        self.segment_seconds = segment_seconds
+        # Segments are queued for upload as they close; without an uploader they stay on disk
+        self.uploader = uploader
+        self.clip_recorder = None
+        self.sqlite_db = sqlite_db or SQLiteManager()
         os.makedirs(output_dir, exist_ok=True)
 
+    def start_clip_buffer(self, **kwargs):
+        """Switch to on-trigger clips: keep a rolling in-memory buffer instead of fixed recordings."""
+        self.clip_recorder = RollingClipRecorder(self.output_dir, on_clip=self._record_clip, **kwargs)
+        self.clip_recorder.start()
+        return self.clip_recorder
+
+    def _queue_segment(self, recording_id, started_at, segment):
+        if self.uploader is None:
+            return
+        captured_at = (started_at + timedelta(seconds=segment["start_offset"])).isoformat()
+        self.uploader.enqueue_segment(segment, recording_id, captured_at)
+
+    def _record_clip(self, clip):
+        # A clip is uploaded like a single-segment recording
+        self._queue_segment(clip["id"], datetime.fromisoformat(clip["started_at"]), {
+            "index": 0,
+            "path": clip["file_path"],
+            "start_offset": 0.0,
+            "duration": clip["duration"]
+        })
+
     def capture_recording(self, duration=10):
         if is_terminal_active():
             return None
-        file_id = str(uuid.uuid4())
-        file_path = os.path.join(self.output_dir, f"{file_id}.mp4")
-        timestamp = datetime.utcnow().isoformat()
-        screen = pyautogui.size()
-        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        out = cv2.VideoWriter(file_path, fourcc, 20.0, (screen.width, screen.height))
-        start_time = datetime.now()
-        while (datetime.now() - start_time).seconds < duration:
-            img = pyautogui.screenshot()
-            frame = np.array(img)
-            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            out.write(frame)
-        out.release()
-        file_size = os.path.getsize(file_path)
-        data = {
-            "id": file_id,
-            "user_id": self.user_id,
-            "timestamp": timestamp,
-            "file_path": file_path,
-            "file_size": file_size,
-            "duration": duration,
-            "created_at": timestamp
-        }
-        self.sqlite_db.insert_record("recordings", data)
-        self.sqlite_db.cleanup_old_media("recordings", self.output_dir)
-        return {"id": file_id, "count": self.sqlite_db.get_count("recordings", self.user_id)} 
\ No newline at end of file
+        recording_id = str(uuid.uuid4())
+        file_path = os.path.join(self.output_dir, f"{recording_id}.mp4")
+        started_at = datetime.utcnow()
+        recorder = PacedRecorder(
+            file_path, fps=self.fps, mode=self.mode, segment_seconds=self.segment_seconds,
+            grayscale=RECORDING_GRAYSCALE, max_long_edge=RECORDING_MAX_LONG_EDGE,
+            on_segment=lambda segment: self._queue_segment(recording_id, started_at, segment)
+        )
+        stats = recorder.record(duration)
+        segments = stats.pop("segments")
+        return {"id": recording_id, "timestamp": started_at.isoformat(),
+                "segments": [segment["path"] for segment in segments],
+                "frames": stats, "timestamps_path": recorder.timestamps_path}
@@ -5,8 +5,29 @@ import mss
 import mss.tools
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 from ..utils.database import LocalDatabase
+from ..utils.config import (
+    THUMBNAIL_SIZES,
+    THUMBNAIL_QUALITY,
+    CAPTURE_MAX_LONG_EDGE,
+    CAPTURE_SCALE,
+    CAPTURE_MODE,
+    SCREENSHOT_MIN_INTERVAL,
+    SCREENSHOT_MAX_INTERVAL,
+    SCREENSHOT_HOURLY_BUDGET,
+    SCREENSHOT_JITTER,
+    SCREENSHOT_BACKEND,
+    PACK_SEGMENT_MB,
+    STORAGE_CATALOG_DB
+)
+from ..utils.frame_ops import capture_frame
+from ..utils.capture_scheduler import AdaptiveCaptureScheduler, frame_signature, frame_change
+from ..utils.window_region import capture_region
+from ..utils.thumbnails import encode_thumbnails, thumbnail_path
+from ..utils.storage_catalog import StorageCatalog
+from ..utils.content_store import open_screenshot_store
+from ..utils.collector_scheduler import Collector
 
 # Configure logging
 logging.basicConfig(
@@ -19,49 +40,88 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class ScreenshotCollector:
+class ScreenshotCollector(Collector):
+    name = "screenshots"
+
     def __init__(self, user_id: str):
         self.user_id = user_id
         self.db = LocalDatabase()
         self.screenshot_dir = Path('data/screenshots') / user_id
         self.screenshot_dir.mkdir(parents=True, exist_ok=True)
+        self.store = open_screenshot_store(str(self.screenshot_dir), SCREENSHOT_BACKEND,
+                                           segment_bytes=PACK_SEGMENT_MB * 1024 * 1024)
+        self.catalog = StorageCatalog(str(STORAGE_CATALOG_DB))
+        # Pick up anything written while the catalog wasn't watching
+        self.store.reconcile(self.catalog, owner=user_id)
         self.last_screenshot_time = 0
         self.screenshot_interval = 300  # 5 minutes
+        self.scheduler = AdaptiveCaptureScheduler(
+            base_interval=self.screenshot_interval,
+            min_interval=SCREENSHOT_MIN_INTERVAL,
+            max_interval=SCREENSHOT_MAX_INTERVAL,
+            hourly_budget=SCREENSHOT_HOURLY_BUDGET,
+            jitter=SCREENSHOT_JITTER
+        )
+        self._last_signature = None
         logger.info(f"Screenshot collector initialized for user {user_id}")
 
-    def capture_screenshot(self) -> Optional[Dict]:
-        """Capture a screenshot if enough time has passed since the last one."""
-        current_time = time.time()
+    def observe_activity(self, activity: Optional[Dict]) -> None:
+        """Feed an ActivityCollector record (window switch / idle change) to the scheduler."""
+        if not activity:
+            return
+        self.scheduler.observe_idle(bool(activity.get('is_idle')))
+        if activity.get('activity_type') == 'window_focus':
+            self.scheduler.observe_focus_change()
+
+    def tick(self, now: float) -> Optional[Dict]:
+        return self.capture_screenshot(now=now)
+
+    def next_delay(self, now: float) -> Optional[float]:
+        # Woken when the adaptive schedule says the next capture is due
+        return self.scheduler.seconds_until_next(now)
+
+    def capture_screenshot(self, activity: Optional[Dict] = None,
+                           now: Optional[float] = None) -> Optional[Dict]:
+        """Capture a screenshot if the adaptive scheduler says one is due."""
+        current_time = time.time() if now is None else now
+        self.observe_activity(activity)
         
-        # Check if enough time has passed
-        if current_time - self.last_screenshot_time < self.screenshot_interval:
+        # Check if a capture is due
+        if not self.scheduler.should_capture(current_time):
             return None
 
         try:
-            # Create timestamp for filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"screenshot_{timestamp}.png"
-            filepath = self.screenshot_dir / filename
-
             # Capture screenshot
             with mss.mss() as sct:
-                # Capture the main monitor
-                monitor = sct.monitors[1]  # Primary monitor
+                # Capture the focused window in 'window' mode, else the main monitor
+                monitor = capture_region(CAPTURE_MODE, sct.monitors[0]) or sct.monitors[1]
                 screenshot = sct.grab(monitor)
-                mss.tools.to_png(screenshot.rgb, screenshot.size, output=str(filepath))
+            # Reduce straight from the BGRA buffer; only the capped frame is encoded
+            frame = capture_frame(screenshot, CAPTURE_MAX_LONG_EDGE, CAPTURE_SCALE)
+            signature = frame_signature(frame)
+            if self._last_signature is not None:
+                self.scheduler.observe_frame_change(frame_change(self._last_signature, signature))
+            self._last_signature = signature
+            self.scheduler.record_capture(current_time)
+            path_str, content_hash, duplicate, thumbnails = self.save_frame(frame, current_time)
+            # Not a Path: with the pack backend this is a pack:// locator
+            filename = os.path.basename(path_str)
 
             # Create screenshot data
             screenshot_data = {
                 "user_id": self.user_id,
                 "filename": filename,
-                "filepath": str(filepath),
+                "filepath": path_str,
                 "timestamp": datetime.now().isoformat(),
-                "monitor": monitor,
-                "size": screenshot.size
+                "monitor": dict(monitor),
+                "size": frame.size,
+                "thumbnails": thumbnails,
+                "content_hash": content_hash,
+                "duplicate": duplicate
             }
 
             # Store in local database
-            self.db.insert_screenshot(self.user_id, str(filepath))
+            self.db.insert_screenshot(self.user_id, path_str, thumbnails)
             
             # Update last screenshot time
             self.last_screenshot_time = current_time
@@ -73,15 +133,50 @@ class ScreenshotCollector:
             logger.error(f"Error capturing screenshot: {str(e)}")
             return None
 
+    def save_frame(self, frame, current_time: float) -> Tuple[str, str, bool, Dict[int, str]]:
+        """Store a captured frame and its thumbnails, returning (path, hash, duplicate, thumbnails)."""
+        png_bytes = mss.tools.to_png(frame.tobytes(), frame.size)
+
+        # Stored under the hash of its bytes; an identical frame is not written again
+        path_str, content_hash, duplicate = self.store.put(png_bytes, '.png')
+
+        if duplicate:
+            thumbnails = {size: thumbnail_path(path_str, size) for size in THUMBNAIL_SIZES
+                          if self.store.exists(thumbnail_path(path_str, size))}
+            entry = self.catalog.get(path_str)
+            if entry is None:
+                self.catalog.add(path_str, len(png_bytes), current_time, file_hash=content_hash,
+                                 owner=self.user_id)
+            elif entry['downscaled']:
+                # Eviction re-encoded the stored object; put this frame's bytes back
+                self.catalog.restore(path_str, self.store.put_at(path_str, png_bytes),
+                                     content_hash, current_time)
+                duplicate = False
+            else:
+                self.catalog.touch(path_str, current_time)
+        else:
+            self.catalog.add(path_str, len(png_bytes), current_time, file_hash=content_hash,
+                             owner=self.user_id)
+            # Thumbnails come from the frame already in memory, not a re-read of the PNG
+            thumbnails = {}
+            for size, thumb_data in encode_thumbnails(frame, THUMBNAIL_SIZES,
+                                                      quality=THUMBNAIL_QUALITY).items():
+                thumb_path = thumbnail_path(path_str, size)
+                self.store.put_at(thumb_path, thumb_data)
+                self.catalog.add(thumb_path, len(thumb_data), current_time, parent_path=path_str,
+                                 owner=self.user_id)
+                thumbnails[size] = thumb_path
+        return path_str, content_hash, duplicate, thumbnails
+
     def get_recent_screenshots(self, limit: int = 10) -> list:
         """Get list of recent screenshots."""
         try:
             screenshots = []
-            for file in sorted(self.screenshot_dir.glob("*.png"), reverse=True)[:limit]:
+            for entry in self.catalog.recent(limit, owner=self.user_id):
                 screenshots.append({
-                    "filename": file.name,
-                    "filepath": str(file),
-                    "timestamp": datetime.fromtimestamp(file.stat().st_mtime).isoformat()
+                    "filename": os.path.basename(entry['path']),
+                    "filepath": entry['path'],
+                    "timestamp": datetime.fromtimestamp(entry['captured_at']).isoformat()
                 })
             return screenshots
         except Exception as e:
@@ -92,9 +187,11 @@ class ScreenshotCollector:
         """Clean up screenshots older than specified days."""
         try:
             cutoff_time = time.time() - (days * 24 * 60 * 60)
-            for file in self.screenshot_dir.glob("*.png"):
-                if file.stat().st_mtime < cutoff_time:
-                    file.unlink()
+            for entry in self.catalog.older_than(cutoff_time, owner=self.user_id):
+                # Removes the full-size PNG together with its thumbnails
+                for path in self.catalog.remove(entry['path']):
+                    if self.store.exists(path):
+                        self.store.delete(path)
             logger.info(f"Cleaned up screenshots older than {days} days")
         except Exception as e:
             logger.error(f"Error cleaning up screenshots: {str(e)}")
@@ -103,6 +200,7 @@ class ScreenshotCollector:
         """Close the database connection."""
         try:
             self.db.close()
+            self.catalog.close()
             logger.info("Screenshot collector closed")
         except Exception as e:
             logger.error(f"Error closing screenshot collector: {str(e)}") 
\ No newline at end of file
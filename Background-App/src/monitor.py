@@ -1,32 +1,68 @@
 import asyncio
 import logging
 import os
+import time
 from datetime import datetime
-import pygetwindow as gw
 import keyboard
 import mouse
 from PIL import ImageGrab
+from supabase import create_client
 from .utils.sqlite_manager import SQLiteManager
 from .utils.sync_manager import SyncManager
 from .utils.event_manager import EventManager
 from .utils.resource_manager import ResourceManager
+from .utils.config import (
+    VIDEOS_DIR,
+    CLIP_BUFFER_ENABLED,
+    SCREENSHOT_BACKEND,
+    PACK_SEGMENT_MB,
+    CAPTURE_MAX_LONG_EDGE,
+    CAPTURE_SCALE,
+    CAPTURE_MODE,
+    SCREENSHOT_MIN_INTERVAL,
+    SCREENSHOT_MAX_INTERVAL,
+    SCREENSHOT_HOURLY_BUDGET,
+    SCREENSHOT_JITTER,
+    APP_SESSION_CHECKPOINT,
+    APP_SESSION_MIN_SECONDS,
+    TITLE_MIN_DWELL,
+    COLLECTOR_POLL_MAX,
+    POLL_BACKOFF_FACTOR,
+    POLL_IDLE_AFTER,
+    CLASSIFIER_SETTINGS_KEY
+)
+from .utils.frame_ops import downscale_image
+from .utils.window_region import capture_region
+from .utils.capture_scheduler import AdaptiveCaptureScheduler, frame_signature, frame_change
+from .utils.active_window import get_active_window_service
+from .utils.sessionizer import SessionBuilder
+from .utils.classifier import Classifier
+from .utils.idle_time import get_idle_provider, IdleBackoff
+from .utils.collector_scheduler import CollectorScheduler, FunctionCollector, CATCH_UP_DELAY
+from .collectors.recording_collector import RecordingCollector
+from .services.recording_uploader import RecordingUploader, TusClient
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ActivityMonitor:
-    def __init__(self, supabase_url: str, supabase_key: str, user_id: str):
+    def __init__(self, supabase_url: str, supabase_key: str, user_id: str, websocket_server=None):
         self.user_id = user_id
+        # Admins reach this user's clip buffer through the server's 'request_clip'
+        self.websocket_server = websocket_server
         
         # Initialize managers
         self.sqlite = SQLiteManager()
         self.event_manager = EventManager()
+        self.window_service = get_active_window_service()
         self.resource_manager = ResourceManager(
             base_dir=os.path.join(os.path.dirname(__file__), '..', 'data'),
             max_storage_mb=500,  # 500MB limit for screenshots
             max_file_age_days=7,
-            compression_quality=60
+            compression_quality=60,
+            backend=SCREENSHOT_BACKEND,
+            pack_segment_mb=PACK_SEGMENT_MB
         )
         self.sync_manager = SyncManager(
             supabase_url=supabase_url,
@@ -35,35 +71,100 @@ class ActivityMonitor:
             max_batch_size=50,
             sync_interval=300  # 5 minutes
         )
+        # Recording segments and clips are queued as they close and sent by
+        # a background worker with resumable uploads
+        self.recording_uploader = RecordingUploader(
+            user_id,
+            self.sqlite,
+            supabase=create_client(supabase_url, supabase_key),
+            tus=TusClient(supabase_url, supabase_key)
+        )
+        self.recording = RecordingCollector(user_id, output_dir=str(VIDEOS_DIR),
+                                            uploader=self.recording_uploader, sqlite_db=self.sqlite)
+        self.clip_recorder = None
         
         # Monitoring state
         self.current_time_entry = None
-        self.last_activity = datetime.now()
+        # Seconds since the last input, read from the OS idle counter
+        self.idle = get_idle_provider()
         self._running = False
         
         # Performance settings
         self.screenshot_interval = 300  # 5 minutes
         self.activity_log_interval = 60  # 1 minute
         self.idle_threshold = 300  # 5 minutes
+        self.capture_poll_interval = 5  # How often capture signals are re-read
+        self.cleanup_interval = 3600  # 1 hour
+
+        # One scheduler drives activity logging, screenshots and cleanup
+        # from a single task on one clock
+        self.scheduler = CollectorScheduler()
+
+        # screenshot_interval is the base; focus changes, input rate, idle state
+        # and screen change move the actual interval around it
+        self.capture_scheduler = AdaptiveCaptureScheduler(
+            base_interval=self.screenshot_interval,
+            min_interval=SCREENSHOT_MIN_INTERVAL,
+            max_interval=SCREENSHOT_MAX_INTERVAL,
+            hourly_budget=SCREENSHOT_HOURLY_BUDGET,
+            jitter=SCREENSHOT_JITTER
+        )
+        self._last_signature = None
+        self._last_window_title = None
+
+        # Window observations are merged into app sessions; only closed
+        # sessions and periodic checkpoints of the open one are written,
+        # each tagged with its category from the user's rules
+        self.classifier = Classifier.from_settings(self.sqlite, CLASSIFIER_SETTINGS_KEY)
+        self.sessions = SessionBuilder(
+            on_close=self._persist_session,
+            on_checkpoint=lambda session: self._persist_session(session, is_open=True),
+            checkpoint_interval=APP_SESSION_CHECKPOINT,
+            min_duration=APP_SESSION_MIN_SECONDS,
+            min_title_dwell=TITLE_MIN_DWELL,
+            classify=self.classifier.classify
+        )
 
     async def start_monitoring(self):
         """Start monitoring user activity."""
         try:
             self._running = True
             self.current_time_entry = self.sqlite.insert_time_entry(self.user_id)
+            self.sqlite.close_open_app_sessions(self.user_id)
+            # Window switches are observed as they happen, not once a minute
+            self.window_service.subscribe(self._on_window_change)
+            self.window_service.start()
+            # Picks up segments left in the queue by an earlier run too
+            self.recording_uploader.start()
+            if CLIP_BUFFER_ENABLED:
+                # Window titles and input rate below can trigger a clip from it
+                self.clip_recorder = self.recording.start_clip_buffer()
+                if self.websocket_server is not None:
+                    self.websocket_server.register_clip_recorder(self.user_id, self.clip_recorder)
             
             # Register event handlers
             self.event_manager.register_handler('keyboard', self._handle_keyboard_event)
             self.event_manager.register_handler('mouse', self._handle_mouse_event)
             self.event_manager.register_handler('window', self._handle_window_event)
             
+            # Activity and capture polls back off while idle; input wakes them
+            self.scheduler.add(FunctionCollector('activity', self._activity_tick),
+                               self.activity_log_interval,
+                               backoff=self._idle_backoff(self.activity_log_interval))
+            # Re-reads capture signals every capture_poll_interval, sooner
+            # when the adaptive schedule has a capture due
+            self.scheduler.add(FunctionCollector('screenshots', self._screenshot_tick,
+                                                 self.capture_scheduler.seconds_until_next),
+                               self.capture_poll_interval, policy=CATCH_UP_DELAY,
+                               backoff=self._idle_backoff(self.capture_poll_interval))
+            self.scheduler.add(FunctionCollector('cleanup', self._cleanup_tick),
+                               self.cleanup_interval, policy=CATCH_UP_DELAY)
+
             # Start all monitoring tasks
             await asyncio.gather(
                 self.event_manager.start(),
-                self._monitor_activity(),
-                self._take_screenshots(),
-                self.sync_manager.start(),
-                self._cleanup_task()
+                self.scheduler.run(),
+                self.sync_manager.start()
             )
         except Exception as e:
             logger.error(f"Error in activity monitoring: {e}")
@@ -77,7 +178,14 @@ class ActivityMonitor:
             self._running = False
             
             # Stop managers
+            self.scheduler.stop()
             self.event_manager.stop()
+            self.window_service.stop()
+            if self.clip_recorder is not None:
+                self.clip_recorder.stop()
+                self.clip_recorder = None
+            self.recording_uploader.stop(timeout=5)
+            self.sessions.close()
             self.sync_manager.stop()
             
             # Update time entry
@@ -94,69 +202,88 @@ class ActivityMonitor:
             logger.error(f"Error stopping monitoring: {e}")
             raise
 
-    async def _monitor_activity(self):
-        """Monitor and log user activity."""
-        while self._running:
-            try:
-                # Get active window
-                active_window = gw.getActiveWindow()
-                if active_window:
-                    await self.event_manager.put_event('window', {
-                        'app_name': active_window.title,
-                        'window_title': active_window.title,
-                        'timestamp': datetime.now().isoformat()
-                    })
-                
-                # Check for idle state
-                idle_time = (datetime.now() - self.last_activity).total_seconds()
-                if idle_time >= self.idle_threshold:
-                    logger.info(f"User idle for {idle_time} seconds")
-                
-                await asyncio.sleep(self.activity_log_interval)
-                
-            except Exception as e:
-                logger.error(f"Error in activity monitoring: {e}")
-                await asyncio.sleep(5)  # Wait before retrying
-
-    async def _take_screenshots(self):
-        """Take periodic screenshots."""
-        while self._running:
-            try:
-                # Skip if user is idle
-                idle_time = (datetime.now() - self.last_activity).total_seconds()
-                if idle_time < self.idle_threshold:
-                    screenshot = ImageGrab.grab()
-                    filepath = await self.resource_manager.save_screenshot(
-                        screenshot,
-                        self.user_id
-                    )
-                    
-                    if filepath:
-                        self.sqlite.insert_screenshot(
-                            user_id=self.user_id,
-                            time_entry_id=self.current_time_entry,
-                            local_file_path=filepath
-                        )
-                
-                await asyncio.sleep(self.screenshot_interval)
-                
-            except Exception as e:
-                logger.error(f"Error taking screenshot: {e}")
-                await asyncio.sleep(5)  # Wait before retrying
-
-    async def _cleanup_task(self):
-        """Periodic cleanup task."""
-        while self._running:
-            try:
-                await self.resource_manager.cleanup_old_files()
-                await asyncio.sleep(3600)  # Run cleanup every hour
-            except Exception as e:
-                logger.error(f"Error in cleanup task: {e}")
-                await asyncio.sleep(300)  # Wait before retrying
+    async def _activity_tick(self, now):
+        """Log the active window and close the open session once idle."""
+        # Get active window (shared snapshot, not a fresh OS query)
+        active_window = self.window_service.get()
+        if active_window['window_title'] or active_window['app_name']:
+            await self.event_manager.put_event('window', {
+                'app_name': active_window['app_name'] or active_window['window_title'],
+                'window_title': active_window['window_title'],
+                'timestamp': datetime.fromtimestamp(now).isoformat()
+            })
+
+        # Check for idle state
+        idle_time = self.idle.seconds()
+        if idle_time >= self.idle_threshold:
+            logger.info(f"User idle for {idle_time} seconds")
+            self.sessions.observe_idle(now - idle_time)
+
+    def _grab(self):
+        """Grab the active window (or full screen) with the resolution cap applied."""
+        region = capture_region(CAPTURE_MODE)
+        if region is None:
+            frame = ImageGrab.grab()
+        else:
+            frame = ImageGrab.grab(bbox=(region['left'], region['top'],
+                                         region['left'] + region['width'],
+                                         region['top'] + region['height']),
+                                   all_screens=True)
+        # Cap the resolution before anything else touches the frame
+        return downscale_image(frame, CAPTURE_MAX_LONG_EDGE, CAPTURE_SCALE)
+
+    async def _screenshot_tick(self, now):
+        """Take a screenshot if the adaptive scheduler says one is due."""
+        scheduler = self.capture_scheduler
+        # No captures are scheduled while the user is idle
+        idle_time = self.idle.seconds()
+        scheduler.observe_idle(idle_time >= self.idle_threshold)
+        counts = self.event_manager.get_event_stats()['counts']
+        input_total = counts.get('keyboard', 0) + counts.get('mouse', 0)
+        scheduler.observe_input(now, input_total)
+        if self.clip_recorder is not None:
+            self.clip_recorder.observe_input(now, input_total)
+
+        if not scheduler.should_capture(now):
+            return
+        screenshot = self._grab()
+        signature = frame_signature(screenshot)
+        if self._last_signature is not None:
+            scheduler.observe_frame_change(frame_change(self._last_signature, signature))
+        self._last_signature = signature
+        scheduler.record_capture(now)
+        saved = await self.resource_manager.save_screenshot_with_thumbnails(
+            screenshot,
+            self.user_id
+        )
+
+        if saved:
+            self.sqlite.insert_screenshot(
+                user_id=self.user_id,
+                time_entry_id=self.current_time_entry,
+                local_file_path=saved['path'],
+                thumbnails=saved['thumbnails'],
+                content_hash=saved['content_hash']
+            )
+
+    async def _cleanup_tick(self, now):
+        """Periodic cleanup of old local files."""
+        await self.resource_manager.cleanup_old_files()
+
+    def _idle_backoff(self, min_interval):
+        return IdleBackoff(self.idle, min_interval, COLLECTOR_POLL_MAX,
+                           factor=POLL_BACKOFF_FACTOR, idle_after=POLL_IDLE_AFTER)
+
+    def _on_input(self):
+        """First input after an idle stretch brings every backed-off poll back to full speed."""
+        self.idle.touch()  # only the input-event fallback keeps state here
+        if self.scheduler.backed_off:
+            self.scheduler.wake()
+        self.window_service.wake()
 
     async def _handle_keyboard_event(self, event):
         """Handle keyboard events."""
-        self.last_activity = datetime.now()
+        self._on_input()
         self.sqlite.insert_activity_log(
             user_id=self.user_id,
             time_entry_id=self.current_time_entry,
@@ -167,7 +294,7 @@ class ActivityMonitor:
 
     async def _handle_mouse_event(self, event):
         """Handle mouse events."""
-        self.last_activity = datetime.now()
+        self._on_input()
         self.sqlite.insert_activity_log(
             user_id=self.user_id,
             time_entry_id=self.current_time_entry,
@@ -178,19 +305,36 @@ class ActivityMonitor:
 
     async def _handle_window_event(self, event):
         """Handle window focus events."""
-        self.sqlite.insert_activity_log(
-            user_id=self.user_id,
-            time_entry_id=self.current_time_entry,
-            app_name=event['app_name'],
-            window_title=event['window_title'],
-            activity_type='window_focus',
-            keystroke_count=0,
-            mouse_events=0
-        )
+        data = event.get('data', event)
+        self._observe_window(data.get('app_name'), data.get('window_title'))
+
+    def _on_window_change(self, snapshot):
+        """Active-window service subscriber; may run on the service's thread."""
+        if self.scheduler.backed_off:
+            self.scheduler.wake()  # a focus change is input too
+        self._observe_window(snapshot['app_name'] or snapshot['window_title'], snapshot['window_title'])
+
+    def _observe_window(self, app_name, window_title):
+        if self.clip_recorder is not None:
+            # Policy titles trigger a clip whether or not the user is idle
+            self.clip_recorder.observe_window(window_title)
+        if self.idle.seconds() >= self.idle_threshold:
+            return  # title changes while idle don't start a session
+        # Same rules the service applies, for titles that arrive as events
+        window_title = self.window_service.normalizer.normalize(app_name, window_title)
+        if window_title != self._last_window_title:
+            if self._last_window_title is not None:
+                # A new window is worth a capture soon after the switch
+                self.capture_scheduler.observe_focus_change()
+            self._last_window_title = window_title
+        self.sessions.observe(app_name, window_title)
+
+    def _persist_session(self, session, is_open=False):
+        self.sqlite.upsert_app_session(self.user_id, self.current_time_entry, session, is_open=is_open)
 
-def start_monitoring(supabase_url: str, supabase_key: str, user_id: str):
+def start_monitoring(supabase_url: str, supabase_key: str, user_id: str, websocket_server=None):
     """Start the monitoring process."""
-    monitor = ActivityMonitor(supabase_url, supabase_key, user_id)
+    monitor = ActivityMonitor(supabase_url, supabase_key, user_id, websocket_server=websocket_server)
     
     try:
         # Set up keyboard and mouse hooks
@@ -0,0 +1,237 @@
+import os
+import base64
+import logging
+import threading
+from typing import Callable, Dict, Optional
+import requests
+from ..utils.config import (
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    RECORDINGS_BUCKET,
+    UPLOAD_CHUNK_BYTES,
+    MAX_RETRIES,
+    RETRY_DELAY
+)
+from ..utils.sqlite_manager import SQLiteManager
+
+logger = logging.getLogger(__name__)
+
+TUS_VERSION = "1.0.0"
+
+class UploadExpired(Exception):
+    """The server no longer knows the upload URL; the upload has to be recreated."""
+
+class TusClient:
+    """Minimal TUS 1.0 client for Supabase Storage resumable uploads.
+
+    An upload is created once (POST, returns its URL) and then filled with
+    PATCH requests of `chunk_size` bytes. After a crash or network error the
+    current offset is read back with HEAD, so only the unacknowledged tail
+    of the file is sent again.
+    """
+
+    def __init__(self, base_url: str = SUPABASE_URL, api_key: str = SUPABASE_KEY,
+                 chunk_size: int = UPLOAD_CHUNK_BYTES, timeout: float = 60,
+                 session: Optional[requests.Session] = None):
+        self.endpoint = f"{base_url.rstrip('/')}/storage/v1/upload/resumable"
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.headers = {
+            "Tus-Resumable": TUS_VERSION,
+            "Authorization": f"Bearer {api_key}",
+            "apikey": api_key
+        }
+
+    @staticmethod
+    def _metadata(values: Dict[str, str]) -> str:
+        return ",".join(f"{k} {base64.b64encode(v.encode()).decode()}" for k, v in values.items())
+
+    def create(self, bucket: str, object_path: str, total_bytes: int,
+               content_type: str = "video/mp4") -> str:
+        response = self.session.post(self.endpoint, timeout=self.timeout, headers=dict(
+            self.headers,
+            **{
+                "Upload-Length": str(total_bytes),
+                "Upload-Metadata": self._metadata({
+                    "bucketName": bucket,
+                    "objectName": object_path,
+                    "contentType": content_type
+                }),
+                "x-upsert": "true"
+            }
+        ))
+        response.raise_for_status()
+        location = response.headers.get("Location")
+        if not location:
+            raise RuntimeError("Resumable upload created without a Location header")
+        return requests.compat.urljoin(self.endpoint + "/", location)
+
+    def offset(self, upload_url: str) -> int:
+        response = self.session.head(upload_url, headers=self.headers, timeout=self.timeout)
+        if response.status_code in (404, 410):
+            raise UploadExpired(upload_url)
+        response.raise_for_status()
+        return int(response.headers["Upload-Offset"])
+
+    def upload(self, upload_url: str, file_path: str, offset: int, total_bytes: int,
+               on_progress: Optional[Callable[[int], None]] = None) -> int:
+        """Send `file_path` from `offset` to the end, one chunk per PATCH."""
+        with open(file_path, "rb") as f:
+            f.seek(offset)
+            while offset < total_bytes:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    raise IOError(f"{file_path} shrank below {total_bytes} bytes")
+                response = self.session.patch(upload_url, data=chunk, timeout=self.timeout, headers=dict(
+                    self.headers,
+                    **{
+                        "Upload-Offset": str(offset),
+                        "Content-Type": "application/offset+octet-stream"
+                    }
+                ))
+                if response.status_code in (404, 410):
+                    raise UploadExpired(upload_url)
+                response.raise_for_status()
+                offset = int(response.headers.get("Upload-Offset", offset + len(chunk)))
+                # The server may have accepted less than the full chunk
+                f.seek(offset)
+                if on_progress:
+                    on_progress(offset)
+        return offset
+
+class RecordingUploader:
+    """Uploads queued recording segments while recording continues.
+
+    Segments are queued in the local SQLite database as they close
+    (`enqueue_segment`) and drained by a background worker, so nothing is
+    lost across restarts. Progress is persisted after every chunk; a
+    retried upload resumes from the last acknowledged offset instead of
+    starting over. Once a segment is fully uploaded its `videos` row is
+    inserted and the local file deleted.
+    """
+
+    def __init__(self, user_id: str, sqlite_db: Optional[SQLiteManager] = None, supabase=None,
+                 tus: Optional[TusClient] = None, bucket: str = RECORDINGS_BUCKET,
+                 max_attempts: int = MAX_RETRIES * 3, retry_delay: float = RETRY_DELAY):
+        self.user_id = user_id
+        self.sqlite_db = sqlite_db or SQLiteManager()
+        if supabase is None:
+            from supabase import create_client
+            supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.supabase = supabase
+        self.tus = tus or TusClient()
+        self.bucket = bucket
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def object_path(self, recording_id: str, index: int) -> str:
+        return f"{self.user_id}/{recording_id}/{index:04d}.mp4"
+
+    def enqueue_segment(self, segment: Dict, recording_id: str, captured_at: Optional[str] = None) -> int:
+        upload_id = self.sqlite_db.enqueue_upload(
+            user_id=self.user_id,
+            local_file_path=segment["path"],
+            object_path=self.object_path(recording_id, segment["index"]),
+            total_bytes=os.path.getsize(segment["path"]),
+            recording_id=recording_id,
+            duration=segment["duration"],
+            captured_at=captured_at
+        )
+        self.notify()
+        return upload_id
+
+    def notify(self):
+        self._wake.set()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="recording-uploader", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.retry_delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.process_queue(stop=self._stop)
+            except Exception as e:
+                logger.error(f"Error in recording upload worker: {e}")
+
+    def process_queue(self, stop: Optional[threading.Event] = None) -> Dict[str, int]:
+        """Upload everything pending; returns counts of uploaded and failed segments."""
+        stats = {"uploaded": 0, "failed": 0}
+        # The worker and a sync pass may both drain the queue
+        with self._lock:
+            for row in self.sqlite_db.get_pending_uploads(self.user_id, self.max_attempts):
+                if stop is not None and stop.is_set():
+                    break
+                try:
+                    self._upload(row)
+                    stats["uploaded"] += 1
+                except Exception as e:
+                    final = isinstance(e, FileNotFoundError) or row["attempts"] + 1 >= self.max_attempts
+                    logger.error(f"Error uploading {row['local_file_path']}: {e}")
+                    self.sqlite_db.fail_upload_attempt(row["id"], e, final=final)
+                    stats["failed"] += 1
+        return stats
+
+    def _upload(self, row: Dict):
+        local_path = row["local_file_path"]
+        if not os.path.exists(local_path):
+            raise FileNotFoundError(local_path)
+        total = row["total_bytes"]
+
+        upload_url = row["upload_url"]
+        offset = None
+        if upload_url:
+            try:
+                offset = self.tus.offset(upload_url)
+            except UploadExpired:
+                upload_url = None
+        if upload_url is None:
+            upload_url = self.tus.create(self.bucket, row["object_path"], total, row["content_type"])
+            offset = 0
+            self.sqlite_db.update_upload_progress(row["id"], upload_url, 0)
+
+        try:
+            self.tus.upload(upload_url, local_path, offset, total,
+                            on_progress=lambda done: self.sqlite_db.update_upload_progress(
+                                row["id"], upload_url, done))
+        except UploadExpired:
+            # Start from scratch on the next attempt
+            self.sqlite_db.update_upload_progress(row["id"], None, 0)
+            raise
+
+        self.supabase.table("videos").insert({
+            "user_id": self.user_id,
+            "data": row["object_path"],
+            "duration": int(round(row["duration"] or 0)),
+            "captured_at": row["captured_at"] or row["created_at"]
+        }).execute()
+        self.sqlite_db.complete_upload(row["id"])
+        self._release(local_path)
+
+    @staticmethod
+    def _release(local_path: str):
+        for path in (local_path, f"{local_path}.timestamps.txt"):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove uploaded segment {path}: {e}")
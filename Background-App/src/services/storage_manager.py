@@ -2,87 +2,103 @@ import os
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
 from src.utils.config import (
     SCREENSHOTS_DIR,
+    SCREENSHOT_BACKEND,
+    PACK_SEGMENT_MB,
+    STORAGE_CATALOG_DB,
     MAX_LOCAL_STORAGE,
     MAX_SCREENSHOTS,
-    SCREENSHOT_MAX_SIZE
+    SCREENSHOT_MAX_SIZE,
+    EVICTION_TARGET_RATIO,
+    EVICTION_CRITICAL_RATIO,
+    EVICTION_DOWNSCALE
+)
+from src.utils.storage_catalog import StorageCatalog
+from src.utils.content_store import open_screenshot_store
+from src.utils.eviction import (
+    EvictionEngine,
+    downscale_bytes,
+    NeverEvictUnsyncedUnlessCritical,
+    OldestSyncedFirst,
+    DownscaleBeforeDelete
 )
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class StorageManager:
-    def __init__(self):
+    def __init__(self, catalog: Optional[StorageCatalog] = None, store=None):
         self.screenshots_dir = SCREENSHOTS_DIR
         self.max_storage = MAX_LOCAL_STORAGE
         self.max_screenshots = MAX_SCREENSHOTS
         self.max_size = SCREENSHOT_MAX_SIZE
+        self.catalog = catalog or StorageCatalog(str(STORAGE_CATALOG_DB))
+        self.store = store or open_screenshot_store(str(SCREENSHOTS_DIR), SCREENSHOT_BACKEND,
+                                                    segment_bytes=PACK_SEGMENT_MB * 1024 * 1024)
+        policies = [NeverEvictUnsyncedUnlessCritical(), OldestSyncedFirst()]
+        if EVICTION_DOWNSCALE:
+            policies.append(DownscaleBeforeDelete())
+        self.eviction = EvictionEngine(self.catalog, policies,
+                                       critical_ratio=EVICTION_CRITICAL_RATIO,
+                                       remover=self.store.delete,
+                                       downscaler=self._downscale)
+
+    def _downscale(self, path: str, scale: float) -> int:
+        return self.store.put_at(path, downscale_bytes(self.store.read(path), scale))
+
+    def _delete(self, path: str) -> int:
+        """Delete a catalogued screenshot and its thumbnails, returning bytes freed."""
+        entry = self.catalog.get(path)
+        freed = 0
+        for removed in self.catalog.remove(path):
+            try:
+                freed += self.store.size(removed)
+                self.store.delete(removed)
+            except FileNotFoundError:
+                pass
+        return freed or (entry['bytes'] if entry else 0)
 
     def cleanup_old_screenshots(self, days_to_keep: int = 30):
         """Delete screenshots older than specified days."""
         cutoff_date = datetime.now() - timedelta(days=days_to_keep)
         deleted_count = 0
 
-        for screenshot in self.screenshots_dir.glob("*.jpg"):
+        for entry in self.catalog.older_than(cutoff_date.timestamp()):
+            name = Path(entry['path']).name
             try:
-                file_time = datetime.fromtimestamp(screenshot.stat().st_mtime)
-                if file_time < cutoff_date:
-                    screenshot.unlink()
-                    deleted_count += 1
-                    logger.info(f"Deleted old screenshot: {screenshot.name}")
+                self._delete(entry['path'])
+                deleted_count += 1
+                logger.info(f"Deleted old screenshot: {name}")
             except Exception as e:
-                logger.error(f"Error deleting {screenshot.name}: {str(e)}")
+                logger.error(f"Error deleting {name}: {str(e)}")
 
         logger.info(f"Cleaned up {deleted_count} old screenshots")
         return deleted_count
 
     def check_storage_usage(self) -> tuple[int, int]:
         """Check current storage usage and file count."""
-        total_size = 0
-        file_count = 0
-
-        for screenshot in self.screenshots_dir.glob("*.jpg"):
-            try:
-                total_size += screenshot.stat().st_size
-                file_count += 1
-            except Exception as e:
-                logger.error(f"Error checking {screenshot.name}: {str(e)}")
-
-        return total_size, file_count
-
-    def enforce_storage_limits(self):
-        """Remove oldest files if storage limits are exceeded."""
-        total_size, file_count = self.check_storage_usage()
-        deleted_count = 0
-
-        # Check if we need to delete files
-        while (total_size > self.max_storage * 0.9 or  # 90% of max storage
-               file_count > self.max_screenshots):
-            # Get oldest file
-            oldest_file = min(
-                self.screenshots_dir.glob("*.jpg"),
-                key=lambda x: x.stat().st_mtime,
-                default=None
-            )
-
-            if not oldest_file:
-                break
-
-            try:
-                file_size = oldest_file.stat().st_size
-                oldest_file.unlink()
-                total_size -= file_size
-                file_count -= 1
-                deleted_count += 1
-                logger.info(f"Deleted oldest screenshot: {oldest_file.name}")
-            except Exception as e:
-                logger.error(f"Error deleting {oldest_file.name}: {str(e)}")
-                break
-
-        if deleted_count > 0:
-            logger.info(f"Enforced storage limits: deleted {deleted_count} files")
-        return deleted_count
+        return self.catalog.totals()
+
+    def enforce_storage_limits(self, dry_run: bool = False) -> dict:
+        """Evict screenshots until storage and file-count limits are met.
+
+        Uploaded screenshots go first (oldest first); screenshots that were never
+        synced are only touched once usage is critical. With `dry_run` nothing is
+        deleted and the report lists the actions that would be taken.
+        """
+        report = self.eviction.enforce(
+            max_bytes=self.max_storage,
+            target_bytes=int(self.max_storage * EVICTION_TARGET_RATIO),
+            max_files=self.max_screenshots,
+            dry_run=dry_run
+        )
+        if report['deletes'] or report['downscales']:
+            verb = "Would evict" if dry_run else "Enforced storage limits:"
+            logger.info(f"{verb} {report['deletes']} deleted, {report['downscales']} downscaled, "
+                        f"{report['bytes_freed'] / 1024 / 1024:.1f}MB freed")
+        return report
 
     def compress_large_screenshots(self):
         """Compress screenshots that exceed size limit."""
@@ -90,22 +106,27 @@ class StorageManager:
         import io
 
         compressed_count = 0
-        for screenshot in self.screenshots_dir.glob("*.jpg"):
+        for entry in self.catalog.larger_than(self.max_size):
+            screenshot = Path(entry['path'])
             try:
-                if screenshot.stat().st_size > self.max_size:
+                if screenshot.suffix.lower() in ('.jpg', '.jpeg'):
                     # Open and compress image
-                    with Image.open(screenshot) as img:
+                    with Image.open(io.BytesIO(self.store.read(entry['path']))) as img:
                         # Convert to RGB if needed
                         if img.mode in ('RGBA', 'P'):
                             img = img.convert('RGB')
                         
                         # Save with compression
+                        buffer = io.BytesIO()
                         img.save(
-                            screenshot,
+                            buffer,
                             'JPEG',
                             quality=60,
                             optimize=True
                         )
+                    size = self.store.put_at(entry['path'], buffer.getvalue())
+                    # No longer the bytes its digest names: keep it out of duplicate reuse
+                    self.catalog.mark_downscaled(entry['path'], size)
                     compressed_count += 1
                     logger.info(f"Compressed screenshot: {screenshot.name}")
             except Exception as e:
@@ -90,6 +90,24 @@ class SupabaseService:
             logger.error(f"Failed to get user settings: {str(e)}")
             return None
 
+    def verify_access_token(self, access_token):
+        """Return the id of the user a Supabase access token belongs to, or None if it is invalid."""
+        try:
+            response = self.supabase.auth.get_user(access_token)
+            return response.user.id if response and response.user else None
+        except Exception as e:
+            logger.error(f"Failed to verify access token: {str(e)}")
+            return None
+
+    def get_user_role(self, user_id):
+        """Get the user's profile role ('admin' or 'employee')."""
+        try:
+            response = self.supabase.table('profiles').select('role').eq('id', user_id).execute()
+            return response.data[0]['role'] if response.data else None
+        except Exception as e:
+            logger.error(f"Failed to get user role: {str(e)}")
+            return None
+
     def update_user_settings(self, user_id, settings):
         """Update user settings in Supabase."""
         try:
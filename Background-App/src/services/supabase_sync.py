@@ -4,23 +4,42 @@ import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
+from typing import Dict, Optional, Set
 from supabase import create_client, Client
 from src.utils.config import (
     SUPABASE_URL,
     SUPABASE_KEY,
     SCREENSHOTS_DIR,
+    SCREENSHOT_BACKEND,
+    PACK_SEGMENT_MB,
+    STORAGE_CATALOG_DB,
     MAX_RETRIES,
     RETRY_DELAY,
     API_CALLS_PER_SYNC
 )
+from src.utils.sqlite_manager import SQLiteManager
+from src.utils.storage_catalog import StorageCatalog
+from src.utils.content_store import open_screenshot_store
+from src.services.recording_uploader import RecordingUploader
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CONTENT_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
+
 class SupabaseSync:
-    def __init__(self, user_id: str):
+    def __init__(self, user_id: str, recording_uploader: RecordingUploader,
+                 sqlite_db: Optional[SQLiteManager] = None, store=None):
         self.user_id = user_id
         self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.sqlite_db = sqlite_db or SQLiteManager()
+        self.catalog = StorageCatalog(str(STORAGE_CATALOG_DB))
+        # Screenshots are read and released through the active storage backend,
+        # so local_file_path may be a file path or a pack:// locator
+        self.store = store or open_screenshot_store(str(SCREENSHOTS_DIR), SCREENSHOT_BACKEND,
+                                                    segment_bytes=PACK_SEGMENT_MB * 1024 * 1024)
+        # The running uploader's worker owns local_upload_queue; sync only wakes it
+        self.recording_uploader = recording_uploader
         self.last_sync = self._load_last_sync()
         self.api_calls_today = self._load_api_calls()
         
@@ -76,6 +95,7 @@ class SupabaseSync:
             self._sync_screenshots()
             self._sync_activity_logs()
             self._sync_daily_hours()
+            self._sync_recordings()
             
             self.last_sync = current_time
             self._save_last_sync()
@@ -107,6 +127,7 @@ class SupabaseSync:
 
         logger.info(f"Found {len(screenshots_to_sync)} screenshots to sync.")
         bucket_name = "user-captures" # Or your chosen bucket name
+        remote_objects = self._load_remote_index(bucket_name)
 
         for record in screenshots_to_sync:
             if not self._check_api_limits(): # Assuming this checks generic API call count
@@ -120,29 +141,60 @@ class SupabaseSync:
                 logger.error(f"Skipping record due to missing local_file_path or id: {record}")
                 continue
             
-            local_file = Path(local_file_path_str)
-            if not local_file.exists():
+            local_file = local_file_path_str
+
+            # Define the path in Supabase Storage
+            # Content-addressed screenshots are stored as user_id/<sha256><ext>, so the
+            # same bytes map to the same object; older records keep user_id/screenshot_id.webp
+            content_hash = record.get('content_hash')
+            object_stem = content_hash or screenshot_id
+            object_ext = os.path.splitext(local_file)[1] if content_hash else ".webp"
+            supabase_file_path = f"{self.user_id}/{object_stem}{object_ext}"
+            content_type = CONTENT_TYPES.get(object_ext.lower(), "application/octet-stream")
+
+            # Deduplicated frames share one local object: only the last unsynced
+            # row referencing it may release the file and its thumbnails
+            shared = self.sqlite_db.count_unsynced_screenshot_refs(local_file) > 1
+
+            if f"{object_stem}{object_ext}" in remote_objects:
+                # The bucket already has these bytes (duplicate frame, or an earlier
+                # sync that uploaded but never recorded it): skip the upload
+                logger.info(f"{supabase_file_path} already in bucket, skipping upload")
+                thumbnail_storage_paths = self._upload_thumbnails(
+                    bucket_name, object_stem, record.get('thumbnail_paths') or {}, remote_objects,
+                    release=not shared
+                )
+                self.sqlite_db.update_screenshot_sync_details(
+                    screenshot_id, supabase_file_path, thumbnail_storage_paths
+                )
+                if not shared:
+                    self.catalog.mark_synced(local_file)
+                    self._release_local_file(local_file)
+                continue
+
+            if not self.store.exists(local_file):
                 logger.warning(f"Local screenshot file not found: {local_file_path_str}. Skipping and marking as error or deleting record.")
                 # Optionally, delete the orphaned DB record here if the file is truly gone
                 # self.sqlite_db.delete_screenshot_record_and_file(screenshot_id, None) 
                 continue
 
-            # Define the path in Supabase Storage
-            # Using user_id/screenshot_id.webp to ensure uniqueness and organization
-            supabase_file_path = f"{self.user_id}/{screenshot_id}.webp"
-
             for attempt in range(MAX_RETRIES):
                 try:
                     logger.info(f"Attempting to upload {local_file} to {bucket_name}/{supabase_file_path}")
-                    with open(local_file, "rb") as f:
-                        # file_options for content type and potentially upsert behavior
-                        file_options = {"content-type": "image/webp", "cacheControl": "3600", "upsert": False}
+                    # file_options for content type and potentially upsert behavior
+                    file_options = {"content-type": content_type, "cacheControl": "3600", "upsert": False}
+                    try:
                         upload_response = self.supabase.storage.from_(bucket_name).upload(
                             path=supabase_file_path,
-                            file=f,
+                            file=self.store.read(local_file),
                             file_options=file_options
                         )
+                    except Exception as e_upload:
+                        if not self._is_duplicate_error(e_upload):
+                            raise
+                        logger.info(f"{supabase_file_path} already exists remotely")
                     self._increment_api_calls() # Count this as an API call
+                    remote_objects.add(f"{object_stem}{object_ext}")
 
                     # upload_response from supabase-py v1.x returns data on success, error on failure
                     # For supabase-py v2.x, it might raise an exception on failure directly or response structure might differ.
@@ -161,16 +213,26 @@ class SupabaseSync:
                     # Option 2: Store the relative path used for upload. Simpler.
                     stored_path_for_db = supabase_file_path
 
+                    # Thumbnails go up as their own small objects so list views
+                    # never have to fetch the full-size frame
+                    thumbnail_storage_paths = self._upload_thumbnails(
+                        bucket_name, object_stem, record.get('thumbnail_paths') or {}, remote_objects,
+                        release=not shared
+                    )
+
                     # Update local SQLite DB with the Supabase storage path
-                    self.sqlite_db.update_screenshot_sync_details(screenshot_id, stored_path_for_db)
+                    self.sqlite_db.update_screenshot_sync_details(
+                        screenshot_id, stored_path_for_db, thumbnail_storage_paths
+                    )
                     logger.info(f"Updated local DB for screenshot {screenshot_id} with path: {stored_path_for_db}")
+                    if shared:
+                        logger.info(f"{local_file} still backs unsynced screenshots, keeping it")
+                    else:
+                        # Uploaded copies are the first thing eviction may reclaim
+                        self.catalog.mark_synced(local_file)
 
-                    # Delete local file after successful upload and DB update
-                    try:
-                        local_file.unlink()
-                        logger.info(f"Deleted local screenshot file: {local_file}")
-                    except Exception as e_del:
-                        logger.error(f"Error deleting local screenshot file {local_file}: {e_del}")
+                        # Delete local file after successful upload and DB update
+                        self._release_local_file(local_file)
                     
                     break  # Success, break retry loop
                     
@@ -181,6 +243,83 @@ class SupabaseSync:
                     else:
                         time.sleep(RETRY_DELAY)
         logger.info("Screenshot sync process finished.")
+
+    def _load_remote_index(self, bucket_name: str) -> Set[str]:
+        """List the user's folder once per sync so known objects aren't re-uploaded."""
+        names: Set[str] = set()
+        offset = 0
+        page_size = 1000
+        try:
+            while self._check_api_limits():
+                page = self.supabase.storage.from_(bucket_name).list(
+                    self.user_id, {"limit": page_size, "offset": offset}
+                )
+                self._increment_api_calls()
+                names.update(item["name"] for item in page if item.get("name"))
+                if len(page) < page_size:
+                    break
+                offset += page_size
+        except Exception as e:
+            logger.warning(f"Could not list remote screenshots, uploading without dedup: {e}")
+        return names
+
+    @staticmethod
+    def _is_duplicate_error(error: Exception) -> bool:
+        message = str(error).lower()
+        return "duplicate" in message or "already exists" in message or "409" in message
+
+    def _release_local_file(self, local_file: str):
+        """Delete an uploaded screenshot locally and drop it from the storage catalog."""
+        try:
+            if self.store.exists(local_file):
+                self.store.delete(local_file)
+                logger.info(f"Deleted local screenshot file: {local_file}")
+            self.catalog.remove(local_file)
+        except Exception as e_del:
+            logger.error(f"Error deleting local screenshot file {local_file}: {e_del}")
+
+    def _upload_thumbnails(self, bucket_name: str, object_stem: str,
+                           thumbnail_paths: Dict[int, str],
+                           remote_objects: Set[str],
+                           release: bool = True) -> Dict[int, str]:
+        """Upload each thumbnail of a screenshot, returning {size: storage path}.
+
+        Local copies are deleted once uploaded unless `release` is False
+        (the screenshot still backs other unsynced rows).
+        """
+        uploaded = {}
+        for size, local_path_str in sorted(thumbnail_paths.items()):
+            local_thumb = local_path_str
+            remote_name = f"{object_stem}_t{size}.jpg"
+            supabase_thumb_path = f"{self.user_id}/{remote_name}"
+            if remote_name in remote_objects:
+                uploaded[size] = supabase_thumb_path
+                if release and self.store.exists(local_thumb):
+                    self.store.delete(local_thumb)
+                continue
+            if not self.store.exists(local_thumb):
+                logger.warning(f"Local thumbnail not found: {local_path_str}")
+                continue
+            try:
+                file_options = {"content-type": "image/jpeg", "cacheControl": "3600", "upsert": False}
+                try:
+                    self.supabase.storage.from_(bucket_name).upload(
+                        path=supabase_thumb_path,
+                        file=self.store.read(local_thumb),
+                        file_options=file_options
+                    )
+                except Exception as e_upload:
+                    if not self._is_duplicate_error(e_upload):
+                        raise
+                self._increment_api_calls()
+                remote_objects.add(remote_name)
+                uploaded[size] = supabase_thumb_path
+                if release:
+                    self.store.delete(local_thumb)
+                logger.info(f"Uploaded {size}px thumbnail to {supabase_thumb_path}")
+            except Exception as e:
+                logger.error(f"Failed to upload {size}px thumbnail for {object_stem}: {e}")
+        return uploaded
         
     def _sync_activity_logs(self):
         # Similar implementation for activity logs
@@ -188,4 +327,8 @@ class SupabaseSync:
         
     def _sync_daily_hours(self):
         # Similar implementation for daily hours
-        pass 
\ No newline at end of file
+        pass
+
+    def _sync_recordings(self):
+        # Segments are queued as they close; retrying leftovers is the worker's job
+        self.recording_uploader.notify() 
\ No newline at end of file
@@ -2,11 +2,23 @@ import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Set
+from typing import Callable, Dict, Optional, Set
 import websockets
 from websockets.server import WebSocketServerProtocol
 from ..collectors.activity_collector import ActivityCollector
 from ..collectors.screenshot_collector import ScreenshotCollector
+from ..collectors.app_usage_collector import AppUsageCollector
+from ..utils.collector_scheduler import CollectorScheduler, CATCH_UP_DELAY
+from ..utils.active_window import get_active_window_service
+from ..utils.idle_time import IdleBackoff, get_idle_provider
+from ..utils.resource_sampler import get_resource_sampler
+from ..utils.config import (
+    COLLECTOR_POLL_INTERVAL,
+    RESOURCE_SAMPLE_INTERVAL,
+    COLLECTOR_POLL_MAX,
+    POLL_BACKOFF_FACTOR,
+    POLL_IDLE_AFTER
+)
 
 # Configure logging
 logging.basicConfig(
@@ -20,11 +32,24 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class WebSocketServer:
-    def __init__(self, host: str = 'localhost', port: int = 8765):
+    def __init__(self, host: str = 'localhost', port: int = 8765,
+                 role_lookup: Optional[Callable[[str], Optional[str]]] = None,
+                 token_verifier: Optional[Callable[[str], Optional[str]]] = None):
         self.host = host
         self.port = port
+        # user_id -> profile role; only admins may request another user's clip
+        self._role_lookup = role_lookup
+        self._roles: Dict[str, Optional[str]] = {}
+        # access token -> user_id; only token-authenticated sockets act on other users
+        self._token_verifier = token_verifier
+        self._supabase_service = None
         self.clients: Dict[str, Set[WebSocketServerProtocol]] = {}
-        self.collectors: Dict[str, tuple[ActivityCollector, ScreenshotCollector]] = {}
+        self.collectors: Dict[str, tuple[ActivityCollector, ScreenshotCollector, AppUsageCollector]] = {}
+        self.clip_recorders: Dict[str, object] = {}  # user_id -> RollingClipRecorder
+        # Every user's collectors run from this one scheduler task
+        self.scheduler = CollectorScheduler()
+        # Collectors back off while the machine is idle; a focus change wakes them
+        get_active_window_service().subscribe(self._on_window_change)
         logger.info(f"WebSocket server initialized on {host}:{port}")
 
     async def register(self, websocket: WebSocketServerProtocol, user_id: str):
@@ -34,7 +59,8 @@ class WebSocketServer:
             # Initialize collectors for this user
             activity_collector = ActivityCollector(user_id)
             screenshot_collector = ScreenshotCollector(user_id)
-            self.collectors[user_id] = (activity_collector, screenshot_collector)
+            app_usage_collector = AppUsageCollector(user_id)
+            self.collectors[user_id] = (activity_collector, screenshot_collector, app_usage_collector)
             
         self.clients[user_id].add(websocket)
         logger.info(f"Client registered for user {user_id}")
@@ -46,13 +72,89 @@ class WebSocketServer:
             if not self.clients[user_id]:
                 # No more clients for this user, cleanup collectors
                 if user_id in self.collectors:
-                    activity_collector, screenshot_collector = self.collectors[user_id]
+                    self.unschedule_collectors(user_id)
+                    activity_collector, screenshot_collector, app_usage_collector = self.collectors[user_id]
+                    app_usage_collector.flush()
                     activity_collector.close()
                     screenshot_collector.close()
                     del self.collectors[user_id]
                 del self.clients[user_id]
         logger.info(f"Client unregistered for user {user_id}")
 
+    def schedule_collectors(self, user_id: str) -> None:
+        """Drive the user's collectors from the shared scheduler (idempotent)."""
+        activity_collector, screenshot_collector, app_usage_collector = self.collectors[user_id]
+
+        async def on_activity(collector, activity_data):
+            screenshot_collector.observe_activity(activity_data)
+            await self.broadcast_to_user(user_id, {
+                'type': 'activity_update',
+                'data': activity_data,
+                'timestamp': datetime.utcnow().isoformat()
+            })
+
+        self.scheduler.add(activity_collector, COLLECTOR_POLL_INTERVAL, on_result=on_activity,
+                           backoff=self._idle_backoff())
+        async def on_app_usage(collector, usage):
+            # The session itself is already written locally by the collector
+            await self.broadcast_to_user(user_id, {
+                'type': 'app_usage_update',
+                'data': usage,
+                'timestamp': datetime.utcnow().isoformat()
+            })
+
+        self.scheduler.add(app_usage_collector, COLLECTOR_POLL_INTERVAL, on_result=on_app_usage,
+                           backoff=self._idle_backoff())
+        # Re-checked every poll, or sooner when the adaptive schedule has a capture due
+        self.scheduler.add(screenshot_collector, COLLECTOR_POLL_INTERVAL, policy=CATCH_UP_DELAY,
+                           backoff=self._idle_backoff())
+        # One sampler for all users; activity records carry its aggregates
+        sampler = get_resource_sampler()
+        if not self.scheduler.scheduled(sampler):
+            self.scheduler.add(sampler, RESOURCE_SAMPLE_INTERVAL)
+
+    @staticmethod
+    def _idle_backoff() -> IdleBackoff:
+        return IdleBackoff(get_idle_provider(), COLLECTOR_POLL_INTERVAL, COLLECTOR_POLL_MAX,
+                           factor=POLL_BACKOFF_FACTOR, idle_after=POLL_IDLE_AFTER)
+
+    def _on_window_change(self, snapshot) -> None:
+        if self.scheduler.backed_off:
+            self.scheduler.wake()
+
+    def unschedule_collectors(self, user_id: str) -> None:
+        for collector in self.collectors.get(user_id, ()):
+            self.scheduler.remove(collector)
+        if not any(self.scheduler.scheduled(c) for cs in self.collectors.values() for c in cs):
+            self.scheduler.remove(get_resource_sampler())
+
+    def register_clip_recorder(self, user_id: str, recorder) -> None:
+        """Let admins request the buffered clip for a user with a 'request_clip' message."""
+        self.clip_recorders[user_id] = recorder
+
+    def _service(self):
+        if self._supabase_service is None:
+            from .supabase_service import SupabaseService
+            self._supabase_service = SupabaseService()
+        return self._supabase_service
+
+    async def verify_token(self, access_token: str) -> Optional[str]:
+        """The user id a Supabase access token belongs to, or None."""
+        if self._token_verifier is None:
+            self._token_verifier = self._service().verify_access_token
+        return await asyncio.to_thread(self._token_verifier, access_token)
+
+    async def is_admin(self, user_id: str) -> bool:
+        role = self._roles.get(user_id)
+        if role is None:
+            if self._role_lookup is None:
+                self._role_lookup = self._service().get_user_role
+            # The lookup is a blocking HTTP call; a failed one (None) is retried next time
+            role = await asyncio.to_thread(self._role_lookup, user_id)
+            if role is not None:
+                self._roles[user_id] = role
+        return role == 'admin'
+
     async def broadcast_to_user(self, user_id: str, message: dict):
         """Broadcast a message to all clients of a specific user."""
         if user_id in self.clients:
@@ -70,6 +172,8 @@ class WebSocketServer:
     async def handle_client(self, websocket: WebSocketServerProtocol, path: str):
         """Handle client connection and messages."""
         user_id = None
+        # Set only when user_id came from a verified access token
+        verified = False
         try:
             async for message in websocket:
                 try:
@@ -77,7 +181,19 @@ class WebSocketServer:
                     message_type = data.get('type')
 
                     if message_type == 'auth':
-                        user_id = data.get('user_id')
+                        access_token = data.get('access_token')
+                        if access_token:
+                            token_user = await self.verify_token(access_token)
+                            if not token_user or data.get('user_id') not in (None, token_user):
+                                await websocket.send(json.dumps({
+                                    'type': 'error',
+                                    'error': 'Authentication failed: Invalid access token',
+                                    'timestamp': datetime.utcnow().isoformat()
+                                }))
+                                continue
+                            user_id, verified = token_user, True
+                        else:
+                            user_id, verified = data.get('user_id'), False
                         if not user_id:
                             await websocket.send(json.dumps({
                                 'type': 'error',
@@ -94,14 +210,7 @@ class WebSocketServer:
 
                         # Start collecting data for this user
                         if user_id in self.collectors:
-                            activity_collector, screenshot_collector = self.collectors[user_id]
-                            activity_data = activity_collector.collect_activity()
-                            if activity_data:
-                                await self.broadcast_to_user(user_id, {
-                                    'type': 'activity_update',
-                                    'data': activity_data,
-                                    'timestamp': datetime.utcnow().isoformat()
-                                })
+                            self.schedule_collectors(user_id)
 
                     elif message_type == 'start_monitoring':
                         if not user_id or user_id not in self.collectors:
@@ -113,20 +222,40 @@ class WebSocketServer:
                             continue
 
                         # Start monitoring for this user
-                        activity_collector, screenshot_collector = self.collectors[user_id]
-                        activity_data = activity_collector.collect_activity()
-                        if activity_data:
-                            await self.broadcast_to_user(user_id, {
-                                'type': 'activity_update',
-                                'data': activity_data,
-                                'timestamp': datetime.utcnow().isoformat()
-                            })
+                        self.schedule_collectors(user_id)
 
                     elif message_type == 'stop_monitoring':
                         if user_id in self.collectors:
-                            activity_collector, screenshot_collector = self.collectors[user_id]
-                            activity_collector.close()
-                            screenshot_collector.close()
+                            # Collectors stay open until the last client disconnects
+                            self.unschedule_collectors(user_id)
+
+                    elif message_type == 'request_clip':
+                        target_user = data.get('target_user_id') or user_id
+                        # A claimed user_id is not proof of identity: another user's
+                        # screen is only captured for a token-verified admin
+                        if user_id and target_user != user_id and not (verified and await self.is_admin(user_id)):
+                            await websocket.send(json.dumps({
+                                'type': 'error',
+                                'error': 'Only authenticated admins can request clips for other users',
+                                'timestamp': datetime.utcnow().isoformat()
+                            }))
+                            continue
+
+                        recorder = self.clip_recorders.get(target_user)
+                        if not user_id or recorder is None:
+                            await websocket.send(json.dumps({
+                                'type': 'error',
+                                'error': 'No clip buffer running for this user',
+                                'timestamp': datetime.utcnow().isoformat()
+                            }))
+                            continue
+
+                        accepted = recorder.trigger(f"admin:{user_id}")
+                        await websocket.send(json.dumps({
+                            'type': 'clip_requested',
+                            'accepted': accepted,
+                            'timestamp': datetime.utcnow().isoformat()
+                        }))
 
                     elif message_type == 'ping':
                         await websocket.send(json.dumps({
@@ -166,7 +295,7 @@ class WebSocketServer:
         try:
             async with websockets.serve(self.handle_client, self.host, self.port):
                 logger.info(f"WebSocket server started on ws://{self.host}:{self.port}")
-                await asyncio.Future()  # run forever
+                await self.scheduler.run()  # run forever
         except Exception as e:
             logger.error(f"Failed to start WebSocket server: {str(e)}")
             raise
@@ -0,0 +1,314 @@
+import sys
+import time
+import logging
+import platform
+import subprocess
+import threading
+from typing import Callable, Dict, List, Optional
+from .process_cache import get_process_cache
+from .x11_window import get_x11_tracker
+from .title_normalizer import DEFAULT_RULES, TitleNormalizer, load_rules
+from .idle_time import IdleBackoff, get_idle_provider
+from .config import (
+    TITLE_MASK_DIGITS,
+    TITLE_RULES_FILE,
+    WINDOW_POLL_MIN,
+    WINDOW_POLL_MAX,
+    POLL_BACKOFF_FACTOR,
+    POLL_IDLE_AFTER
+)
+
+if sys.platform == "win32":
+    try:
+        import win32gui
+        import win32process
+    except ImportError:
+        win32gui = win32process = None
+else:
+    win32gui = win32process = None
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("app_name", "window_title", "pid")
+
+class WindowProvider:
+    """Source of the focused window: `read()` returns {app_name, window_title, pid} or None.
+
+    Providers that can push changes set `pushes = True` and call every
+    listener registered through `add_listener` with a fresh reading.
+    """
+
+    pushes = False
+
+    def __init__(self):
+        self._listeners: List[Callable[[Optional[Dict]], None]] = []
+
+    def read(self) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def add_listener(self, callback: Callable[[Optional[Dict]], None]):
+        self._listeners.append(callback)
+
+    def _push(self, reading: Optional[Dict]):
+        for callback in self._listeners:
+            callback(reading)
+
+class Win32Provider(WindowProvider):
+    def read(self) -> Optional[Dict]:
+        hwnd = win32gui.GetForegroundWindow()
+        if not hwnd:
+            return None
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        return {"app_name": get_process_cache().name(pid),
+                "window_title": win32gui.GetWindowText(hwnd),
+                "pid": pid}
+
+class MacProvider(WindowProvider):
+    def read(self) -> Optional[Dict]:
+        from AppKit import NSWorkspace
+        app = NSWorkspace.sharedWorkspace().frontmostApplication()
+        if app is None:
+            return None
+        name = app.localizedName()
+        # macOS does not expose window titles without accessibility permissions
+        return {"app_name": name, "window_title": name, "pid": int(app.processIdentifier())}
+
+class X11Provider(WindowProvider):
+    """Focus and title changes pushed over the persistent X connection."""
+
+    pushes = True
+
+    def __init__(self, tracker):
+        super().__init__()
+        self.tracker = tracker
+        tracker.add_listener(lambda state: self._push(self._convert(state)))
+
+    @staticmethod
+    def _convert(state: Dict) -> Optional[Dict]:
+        if state["window_id"] is None:
+            return None
+        pid = state["pid"]
+        return {"app_name": get_process_cache().name(pid) if pid else None,
+                "window_title": state["window_title"],
+                "pid": pid}
+
+    def read(self) -> Optional[Dict]:
+        return self._convert(self.tracker.snapshot())
+
+class XpropProvider(WindowProvider):
+    """Forks xprop for every reading; only used when python-xlib can't connect."""
+
+    def read(self) -> Optional[Dict]:
+        win_id = subprocess.check_output(
+            ['xprop', '-root', '_NET_ACTIVE_WINDOW'], timeout=2
+        ).decode().strip().split()[-1]
+        if win_id in ('0x0', '0'):
+            return None
+        win_name = subprocess.check_output(['xprop', '-id', win_id, 'WM_NAME'], timeout=2).decode()
+        pid_line = subprocess.check_output(['xprop', '-id', win_id, '_NET_WM_PID'], timeout=2).decode()
+        pid = int(pid_line.split()[-1])
+        return {"app_name": get_process_cache().name(pid),
+                "window_title": win_name.split('=')[-1].strip().strip('"'),
+                "pid": pid}
+
+class FakeProvider(WindowProvider):
+    """Scripted provider for tests: `set()` changes the window, optionally pushing it."""
+
+    def __init__(self, app_name=None, window_title=None, pid=None, pushes=False):
+        super().__init__()
+        self.pushes = pushes
+        self.reads = 0
+        self.current = None
+        if app_name or window_title:
+            self.current = {"app_name": app_name, "window_title": window_title, "pid": pid}
+
+    def set(self, app_name, window_title=None, pid=None):
+        self.current = {"app_name": app_name, "window_title": window_title, "pid": pid}
+        if self.pushes:
+            self._push(dict(self.current))
+
+    def clear(self):
+        self.current = None
+        if self.pushes:
+            self._push(None)
+
+    def read(self) -> Optional[Dict]:
+        self.reads += 1
+        return dict(self.current) if self.current else None
+
+def default_provider() -> Optional[WindowProvider]:
+    if win32gui is not None:
+        return Win32Provider()
+    system = platform.system()
+    if system == "Darwin":
+        return MacProvider()
+    if system == "Linux":
+        tracker = get_x11_tracker()
+        return X11Provider(tracker) if tracker is not None else XpropProvider()
+    return None
+
+class ActiveWindowService:
+    """One shared view of the focused window for every consumer.
+
+    The provider is read at most once per `poll_interval` (or not at all
+    when it pushes changes) no matter how many consumers ask. The current
+    snapshot carries a `version` that only increases when the app, title
+    or pid actually changes, and subscribers are called once per change,
+    so consumers can compare versions instead of re-reading the OS.
+
+    `window_title` is the normalized title (see TitleNormalizer), so a
+    ticking clock or unread count in the title is not a change;
+    `raw_title` keeps what the OS reported.
+
+    With an IdleBackoff the background poll slows down while the user is
+    idle (a non-pushing provider would otherwise be read every second all
+    night); `wake()` on input snaps it back to `poll_interval`.
+    """
+
+    def __init__(self, provider: Optional[WindowProvider] = None, poll_interval: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 normalizer: Optional[TitleNormalizer] = None, backoff=None):
+        self.provider = provider if provider is not None else default_provider()
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.normalizer = normalizer if normalizer is not None else TitleNormalizer(
+            load_rules(TITLE_RULES_FILE) + DEFAULT_RULES, mask_digits=TITLE_MASK_DIGITS)
+        self.backoff = backoff
+        self.polls = 0
+        self.version = 0
+        self._snapshot = {"app_name": None, "window_title": None, "raw_title": None, "pid": None,
+                          "version": 0, "changed_at": None}
+        self._read_at = None
+        self._subscribers: List[Callable[[Dict], None]] = []
+        # _lock only guards the snapshot and subscriber list; provider reads are
+        # serialized by _read_lock, and subscribers run with neither held
+        self._lock = threading.RLock()
+        self._read_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        if self.provider is not None and self.provider.pushes:
+            self.provider.add_listener(self._apply)
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """Call `callback(snapshot)` on every change; returns an unsubscribe function.
+
+        Callbacks run on the thread that saw the change, after the service's
+        locks are released, so they may block or take other locks.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _stale(self, max_age: float) -> bool:
+        with self._lock:
+            stale = self._read_at is None or self.clock() - self._read_at >= max_age
+            # A pushing provider keeps the snapshot current by itself
+            return stale and not (self.provider is not None and self.provider.pushes
+                                  and self._read_at is not None)
+
+    def get(self, max_age: Optional[float] = None) -> Dict:
+        """The current snapshot, re-reading the provider only if it is older than `max_age`."""
+        max_age = self.poll_interval if max_age is None else max_age
+        if self._stale(max_age):
+            return self.refresh(max_age)
+        with self._lock:
+            return dict(self._snapshot)
+
+    def refresh(self, max_age: Optional[float] = None) -> Dict:
+        """Read the provider now, or with `max_age` only if no other caller just did."""
+        if self.provider is None:
+            with self._lock:
+                return dict(self._snapshot)
+        with self._read_lock:
+            if max_age is not None and not self._stale(max_age):
+                with self._lock:
+                    return dict(self._snapshot)
+            try:
+                reading = self.provider.read()
+            except Exception as e:
+                logger.error(f"Error reading active window: {e}")
+                with self._lock:
+                    return dict(self._snapshot)
+            snapshot, subscribers = self._update(reading)
+        self._notify(snapshot, subscribers)
+        return snapshot
+
+    def _apply(self, reading: Optional[Dict]) -> Dict:
+        """Listener for pushing providers."""
+        snapshot, subscribers = self._update(reading)
+        self._notify(snapshot, subscribers)
+        return snapshot
+
+    def _update(self, reading: Optional[Dict]):
+        """Store a reading; returns the snapshot and, if it changed, the subscribers to tell."""
+        reading = dict(reading or {})
+        raw_title = reading.get("window_title")
+        reading["window_title"] = self.normalizer.normalize(reading.get("app_name"), raw_title)
+        with self._lock:
+            self._read_at = self.clock()
+            if all(self._snapshot[k] == reading.get(k) for k in FIELDS):
+                self._snapshot["raw_title"] = raw_title
+                return dict(self._snapshot), []
+            self.version += 1
+            self._snapshot = {k: reading.get(k) for k in FIELDS}
+            self._snapshot.update(raw_title=raw_title, version=self.version, changed_at=time.time())
+            return dict(self._snapshot), list(self._subscribers)
+
+    def _notify(self, snapshot: Dict, subscribers: List[Callable[[Dict], None]]):
+        for callback in subscribers:
+            if self.version != snapshot["version"]:
+                return  # superseded; the newer change is delivered by its own caller
+            try:
+                callback(dict(snapshot))
+            except Exception as e:
+                logger.error(f"Error in active window subscriber: {e}")
+
+    def start(self):
+        """Poll in the background so subscribers hear about changes without a consumer asking."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="active-window", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        """Input arrived: if the poll has backed off, read now and return to the fast interval."""
+        if self.backoff is not None and self.backoff.backed_off:
+            self.backoff.reset()
+            self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        self.refresh()
+        while not self._stop.is_set():
+            interval = self.backoff.next_interval() if self.backoff is not None else self.poll_interval
+            self._wake.wait(interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if self.provider is not None and not self.provider.pushes:
+                self.polls += 1
+                self.refresh()
+
+_shared_service = None
+
+def get_active_window_service() -> ActiveWindowService:
+    """The active-window service shared by the monitor and all collectors."""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = ActiveWindowService(
+            poll_interval=WINDOW_POLL_MIN,
+            backoff=IdleBackoff(get_idle_provider(), WINDOW_POLL_MIN, WINDOW_POLL_MAX,
+                                factor=POLL_BACKOFF_FACTOR, idle_after=POLL_IDLE_AFTER))
+    return _shared_service
@@ -0,0 +1,182 @@
+import time
+import logging
+from datetime import datetime, timezone, tzinfo
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 86400
+
+def parse_local_iso(values: List[str]) -> np.ndarray:
+    """Naive local ISO timestamps (as the sessionizer writes them) to epoch seconds."""
+    if not values:
+        return np.zeros(0)
+    wall = np.array(values, dtype="datetime64[us]").astype(np.int64) / 1e6
+    # Wall time minus the local UTC offset, looked up at the (approximate) instant itself
+    guess = wall - utc_offsets(wall, None)
+    return wall - utc_offsets(guess, None)
+
+def utc_offsets(epochs: np.ndarray, tz: Optional[tzinfo]) -> np.ndarray:
+    """UTC offset in seconds at each instant, for `tz` or the system zone (None).
+
+    The zone is only asked once per hour in the range, then every instant
+    looks up its hour, so DST is honoured without a call per timestamp.
+    """
+    if not epochs.size:
+        return np.zeros(0)
+    first = int(np.floor(epochs.min() / HOUR)) * HOUR
+    hours = np.arange(first, epochs.max() + HOUR, HOUR)
+    if tz is None:
+        grid = np.array([time.localtime(int(t)).tm_gmtoff for t in hours], dtype=np.float64)
+    else:
+        grid = np.array([datetime.fromtimestamp(int(t), tz).utcoffset().total_seconds() for t in hours])
+    return grid[((epochs - first) // HOUR).astype(np.int64)]
+
+def clip_intervals(starts: np.ndarray, ends: np.ndarray, lo: float, hi: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Intervals clipped to [lo, hi); ones entirely outside come back empty (start == end)."""
+    s = np.clip(starts, lo, hi)
+    e = np.clip(ends, lo, hi)
+    return s, np.maximum(s, e)
+
+def coverage(starts: np.ndarray, ends: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Seconds of the intervals falling into each bin between consecutive `edges`.
+
+    Uses the cumulative covered time C(x) = sum over intervals of
+    clip(x - start, 0, length), evaluated at every edge with two sorted
+    searches, so the cost is O((n + bins) log n) however many bins an
+    interval spans.
+    """
+    if not starts.size:
+        return np.zeros(len(edges) - 1)
+    # Work relative to the first edge: cumulative sums of raw epochs lose sub-second precision
+    origin = edges[0]
+    edges = edges - origin
+    s = np.sort(starts) - origin
+    e = np.sort(ends) - origin
+    s_sum = np.concatenate(([0.0], np.cumsum(s)))
+    e_sum = np.concatenate(([0.0], np.cumsum(e)))
+    ns = np.searchsorted(s, edges, side="right")
+    ne = np.searchsorted(e, edges, side="right")
+    covered = (edges * ns - s_sum[ns]) - (edges * ne - e_sum[ne])
+    return np.diff(covered)
+
+class ActivityAnalytics:
+    """Daily/weekly aggregates over app sessions, computed on NumPy columns.
+
+    Closed sessions in the requested range are loaded once as arrays
+    (epoch start/end, interned app id, category code). Per-app and
+    per-category totals are `np.bincount` over clipped durations; daily
+    active/idle and the weekday x hour heatmap bin the intervals in the
+    requested time zone with `coverage()`. Idle time is the gaps between
+    consecutive sessions no longer than `max_gap` (longer gaps mean the
+    machine was off or the user left, not idle at the desk).
+    """
+
+    def __init__(self, sqlite, user_id: str, tz: Optional[tzinfo] = None, max_gap: float = 2 * HOUR):
+        self.sqlite = sqlite
+        self.user_id = user_id
+        self.tz = tz
+        self.max_gap = max_gap
+
+    def load(self, start: float, end: float) -> Dict[str, np.ndarray]:
+        """Closed sessions overlapping [start, end) as column arrays."""
+        # Stored times are naive local; widen the text filter by a day for any zone offset
+        lo = datetime.fromtimestamp(start - DAY).isoformat()
+        hi = datetime.fromtimestamp(end + DAY).isoformat()
+        with self.sqlite.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT COALESCE(app_id, 0), start_time, end_time, COALESCE(category, 'uncategorized')
+                FROM local_app_sessions
+                WHERE user_id = ? AND is_open = 0 AND end_time > ? AND start_time < ?
+            """, (self.user_id, lo, hi)).fetchall()
+        if not rows:
+            return self.from_columns([], [], [], [])
+        app_ids, starts, ends, categories = zip(*rows)
+        return self.from_columns(app_ids, parse_local_iso(list(starts)), parse_local_iso(list(ends)), categories)
+
+    @staticmethod
+    def from_columns(app_ids, starts, ends, categories) -> Dict[str, np.ndarray]:
+        labels, codes = np.unique(np.asarray(categories, dtype=object).astype(str), return_inverse=True)
+        return {
+            "app_id": np.asarray(app_ids, dtype=np.int64),
+            "start": np.asarray(starts, dtype=np.float64),
+            "end": np.asarray(ends, dtype=np.float64),
+            "category": codes.astype(np.int64).ravel(),
+            "category_labels": labels,
+        }
+
+    def app_totals(self, sessions: Dict, start: float, end: float) -> List[Tuple[int, float]]:
+        s, e = clip_intervals(sessions["start"], sessions["end"], start, end)
+        if not s.size:
+            return []
+        totals = np.bincount(sessions["app_id"], weights=e - s)
+        order = np.flatnonzero(totals)[np.argsort(totals[totals > 0])[::-1]]
+        return [(int(i), float(totals[i])) for i in order]
+
+    def category_totals(self, sessions: Dict, start: float, end: float) -> Dict[str, float]:
+        s, e = clip_intervals(sessions["start"], sessions["end"], start, end)
+        totals = np.bincount(sessions["category"], weights=e - s, minlength=len(sessions["category_labels"]))
+        return {str(label): float(total) for label, total in zip(sessions["category_labels"], totals) if total > 0}
+
+    def idle_intervals(self, sessions: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """Gaps between consecutive sessions of at most `max_gap` seconds."""
+        order = np.argsort(sessions["start"])
+        starts = sessions["start"][order]
+        # Overlapping checkpoints/sessions: a gap starts after the latest end so far
+        ends = np.maximum.accumulate(sessions["end"][order])
+        gap_start, gap_end = ends[:-1], starts[1:]
+        keep = (gap_end > gap_start) & (gap_end - gap_start <= self.max_gap)
+        return gap_start[keep], gap_end[keep]
+
+    def _local(self, *arrays: np.ndarray) -> List[np.ndarray]:
+        """Each array shifted to local wall-clock seconds, asking the zone once for all of them."""
+        joined = np.concatenate([np.asarray(a, dtype=np.float64) for a in arrays])
+        shifted = joined + utc_offsets(joined, self.tz)
+        return np.split(shifted, np.cumsum([len(a) for a in arrays])[:-1])
+
+    def daily(self, sessions: Dict, start: float, end: float) -> List[Dict]:
+        """Active and idle seconds per local calendar day of [start, end)."""
+        s, e = clip_intervals(sessions["start"], sessions["end"], start, end)
+        gs, ge = self.idle_intervals(sessions)
+        gs, ge = clip_intervals(gs, ge, start, end)
+        bounds, s, e, gs, ge = self._local([start, end], s, e, gs, ge)
+        # Across a fall-back change the end moves back further than the start
+        e, ge = np.maximum(s, e), np.maximum(gs, ge)
+        local_start, local_end = bounds
+        edges = np.arange(np.floor(local_start / DAY) * DAY, local_end + DAY, DAY)
+        active = coverage(s, e, edges)
+        idle = coverage(gs, ge, edges)
+        return [{"date": datetime.fromtimestamp(edge, timezone.utc).date().isoformat(),
+                 "active": float(a), "idle": float(i)}
+                for edge, a, i in zip(edges[:-1], active, idle) if edge < local_end]
+
+    def heatmap(self, sessions: Dict, start: float, end: float) -> np.ndarray:
+        """Active seconds as a 7 x 24 array: local weekday (Monday = 0) by local hour."""
+        s, e = clip_intervals(sessions["start"], sessions["end"], start, end)
+        bounds, s, e = self._local([start, end], s, e)
+        e = np.maximum(s, e)
+        local_start, local_end = bounds
+        edges = np.arange(np.floor(local_start / HOUR) * HOUR, local_end + HOUR, HOUR)
+        per_hour = coverage(s, e, edges)
+        hour_index = (edges[:-1] // HOUR).astype(np.int64)
+        weekday = (hour_index // 24 + 3) % 7  # 1970-01-01 was a Thursday
+        cells = weekday * 24 + hour_index % 24
+        return np.bincount(cells, weights=per_hour, minlength=7 * 24).reshape(7, 24)
+
+    def summary(self, start: float, end: float) -> Dict:
+        """Everything the dashboard shows for [start, end), from one load."""
+        sessions = self.load(start, end)
+        with self.sqlite.get_connection() as conn:
+            apps = [(self.sqlite.strings.lookup(conn, app_id), seconds)
+                    for app_id, seconds in self.app_totals(sessions, start, end)]
+        daily = self.daily(sessions, start, end)
+        return {
+            "apps": apps,
+            "categories": self.category_totals(sessions, start, end),
+            "daily": daily,
+            "active": sum(day["active"] for day in daily),
+            "idle": sum(day["idle"] for day in daily),
+            "heatmap": self.heatmap(sessions, start, end).round().astype(int).tolist(),
+        }
@@ -0,0 +1,191 @@
+import math
+import random
+import logging
+from collections import deque
+from typing import Dict, Iterable, Optional
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+def frame_signature(image: Image.Image, size=(64, 36)) -> np.ndarray:
+    """Tiny grayscale copy of a frame, enough to tell how much the screen changed."""
+    return np.asarray(image.convert('L').resize(size, Image.Resampling.BOX), dtype=np.float32)
+
+def frame_change(previous: Optional[np.ndarray], current: np.ndarray) -> float:
+    """Mean absolute difference of two signatures, scaled to 0..1."""
+    if previous is None or previous.shape != current.shape:
+        return 1.0
+    return float(np.abs(current - previous).mean() / 255.0)
+
+class AdaptiveCaptureScheduler:
+    """Decides when to take the next screenshot from activity signals.
+
+    The base interval is shortened by a high input rate and by large frame
+    changes, stretched while the screen stays static, and cut to the minimum
+    spacing right after a window-focus change. No captures are scheduled
+    while idle. Every interval gets random jitter so capture times can't be
+    predicted, and a sliding one-hour window enforces the hourly budget on
+    top of the minimum spacing.
+    """
+
+    def __init__(self,
+                 base_interval: float = 300,
+                 min_interval: float = 30,
+                 max_interval: float = 900,
+                 hourly_budget: int = 30,
+                 jitter: float = 0.2,
+                 input_rate_ref: float = 2.0,
+                 static_threshold: float = 0.01,
+                 busy_threshold: float = 0.15,
+                 rng: Optional[random.Random] = None):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.hourly_budget = hourly_budget
+        self.jitter = jitter
+        self.input_rate_ref = input_rate_ref  # events/sec that halves the interval
+        self.static_threshold = static_threshold
+        self.busy_threshold = busy_threshold
+        self.rng = rng or random.Random()
+
+        self.last_capture: Optional[float] = None
+        self.captures = deque()  # capture times within the last hour
+        self.idle = False
+        self.focus_changed = False
+        self.input_rate = 0.0
+        self.last_change: Optional[float] = None
+        self.static_streak = 0
+        self._last_input_total = None
+        self._last_input_time = None
+        self._jitter_factor = 1.0
+
+    # Signals
+
+    def observe_focus_change(self):
+        self.focus_changed = True
+
+    def observe_idle(self, idle: bool):
+        self.idle = idle
+
+    def observe_input(self, now: float, event_total: int):
+        """Feed the cumulative input-event count (e.g. sum of EventManager.event_counts)."""
+        if self._last_input_total is not None and now > self._last_input_time:
+            delta = max(0, event_total - self._last_input_total)
+            rate = delta / (now - self._last_input_time)
+            self.input_rate = 0.3 * rate + 0.7 * self.input_rate
+        self._last_input_total = event_total
+        self._last_input_time = now
+
+    def observe_frame_change(self, magnitude: float):
+        """Feed how much the last captured frame differed from the one before (0..1)."""
+        self.last_change = magnitude
+        if magnitude < self.static_threshold:
+            self.static_streak += 1
+        else:
+            self.static_streak = 0
+
+    # Scheduling
+
+    def current_interval(self) -> float:
+        """Interval the signals currently ask for, before jitter and the budget."""
+        if self.focus_changed:
+            return self.min_interval
+        interval = self.base_interval / (1.0 + self.input_rate / self.input_rate_ref)
+        if self.static_streak:
+            interval *= 2 ** min(self.static_streak, 4)
+        elif self.last_change is not None and self.last_change >= self.busy_threshold:
+            interval *= 0.5
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def next_capture_time(self, now: float) -> float:
+        """Earliest time the next capture may happen (inf while idle)."""
+        if self.idle:
+            return math.inf
+        if self.last_capture is None:
+            due = now
+        else:
+            interval = max(self.current_interval() * self._jitter_factor, self.min_interval)
+            due = self.last_capture + interval
+        self._expire(now)
+        if len(self.captures) >= self.hourly_budget:
+            due = max(due, self.captures[0] + 3600)
+        return due
+
+    def should_capture(self, now: float) -> bool:
+        return now >= self.next_capture_time(now)
+
+    def seconds_until_next(self, now: float) -> float:
+        return max(0.0, self.next_capture_time(now) - now)
+
+    def record_capture(self, now: float):
+        self.last_capture = now
+        self.captures.append(now)
+        self.focus_changed = False
+        self._jitter_factor = 1.0 + self.rng.uniform(-self.jitter, self.jitter)
+
+    def _expire(self, now: float):
+        while self.captures and self.captures[0] <= now - 3600:
+            self.captures.popleft()
+
+def simulate(trace: Iterable[Dict],
+             scheduler: AdaptiveCaptureScheduler,
+             duration: Optional[float] = None,
+             tick: float = 1.0) -> Dict:
+    """Replay an activity trace through a scheduler and report when it would capture.
+
+    `trace` is time-ordered dicts with `t` (seconds from start), `type` and
+    `value`: `focus` (window switched), `input` (number of input events),
+    `idle` (bool) and `change` (how different the screen now is from the
+    last capture, 0..1, reported to the scheduler at the next capture).
+    """
+    events = sorted(trace, key=lambda e: e['t'])
+    end = duration if duration is not None else (events[-1]['t'] if events else 0.0)
+    captures = []
+    input_total = 0
+    screen_change = 1.0
+    index = 0
+    now = 0.0
+    while now <= end:
+        while index < len(events) and events[index]['t'] <= now:
+            event = events[index]
+            if event['type'] == 'focus':
+                scheduler.observe_focus_change()
+                screen_change = 1.0
+            elif event['type'] == 'input':
+                input_total += int(event.get('value', 1))
+            elif event['type'] == 'idle':
+                scheduler.observe_idle(bool(event['value']))
+            elif event['type'] == 'change':
+                screen_change = max(screen_change, float(event['value']))
+            index += 1
+        scheduler.observe_input(now, input_total)
+        if scheduler.should_capture(now):
+            if captures:
+                scheduler.observe_frame_change(screen_change)
+            scheduler.record_capture(now)
+            captures.append(now)
+            screen_change = 0.0
+        now += tick
+
+    hours = max(1, math.ceil(end / 3600)) if end else 1
+    per_hour = [0] * hours
+    for t in captures:
+        per_hour[min(int(t // 3600), hours - 1)] += 1
+    window = deque()
+    busiest = 0
+    for t in captures:
+        window.append(t)
+        while window[0] <= t - 3600:
+            window.popleft()
+        busiest = max(busiest, len(window))
+    gaps = [b - a for a, b in zip(captures, captures[1:])]
+    return {
+        'captures': len(captures),
+        'hours': end / 3600,
+        'captures_per_hour': per_hour,
+        'max_in_any_hour': busiest,
+        'min_spacing': min(gaps) if gaps else None,
+        'mean_spacing': sum(gaps) / len(gaps) if gaps else None,
+        'times': captures
+    }
@@ -0,0 +1,155 @@
+import re
+import json
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Pattern, Tuple
+from .title_normalizer import app_key
+
+logger = logging.getLogger(__name__)
+
+UNCATEGORIZED = "uncategorized"
+
+# category -> productivity shown on the dashboard
+DEFAULT_CATEGORIES = {
+    "development": "productive",
+    "design": "productive",
+    "documents": "productive",
+    "communication": "neutral",
+    "meetings": "neutral",
+    "social": "unproductive",
+    "entertainment": "unproductive",
+    UNCATEGORIZED: "neutral",
+}
+
+# Each rule can match on app names (exact, case-insensitive, without .exe),
+# domains seen in the title (also matching subdomains), literal title
+# keywords (whole words) or title regexes
+DEFAULT_RULES = [
+    {"category": "entertainment", "domains": ["youtube.com", "netflix.com", "twitch.tv", "primevideo.com"],
+     "keywords": ["YouTube", "Netflix", "Twitch"], "apps": ["spotify", "vlc", "steam"]},
+    {"category": "social", "domains": ["facebook.com", "instagram.com", "x.com", "twitter.com", "reddit.com",
+                                       "tiktok.com"],
+     "keywords": ["Facebook", "Instagram", "Reddit", "TikTok"]},
+    {"category": "development", "domains": ["github.com", "gitlab.com", "stackoverflow.com", "docs.python.org"],
+     "keywords": ["GitHub", "GitLab", "Stack Overflow", "Jira"],
+     "apps": ["code", "pycharm64", "pycharm", "idea64", "devenv", "sublime_text", "windowsterminal",
+              "gnome-terminal-server", "terminal", "iterm2", "postman"]},
+    {"category": "design", "apps": ["figma", "photoshop", "illustrator", "blender"], "keywords": ["Figma"]},
+    {"category": "documents", "domains": ["docs.google.com", "notion.so"],
+     "keywords": ["Google Docs", "Google Sheets", "Notion", "Confluence"],
+     "apps": ["winword", "excel", "powerpnt", "notion", "acrord32", "libreoffice"]},
+    {"category": "meetings", "domains": ["meet.google.com", "zoom.us"], "keywords": ["Zoom Meeting", "Google Meet"],
+     "apps": ["zoom", "teams"]},
+    {"category": "communication", "domains": ["mail.google.com", "outlook.office.com", "slack.com"],
+     "keywords": ["Gmail", "Inbox", "Outlook"], "apps": ["slack", "outlook", "thunderbird", "discord"]},
+]
+
+_DOMAIN = re.compile(r"(?<![\w@.-])((?:[a-z0-9-]+\.)+[a-z]{2,})(?![\w-])", re.IGNORECASE)
+
+class Classifier:
+    """Tags an (app, title) pair with a category using rules compiled once.
+
+    All domain, keyword and regex rules are folded into one alternation
+    per kind with a named group per category, so a title is scanned once
+    per kind instead of once per rule. Domains in the title win over
+    keywords and regexes, which win over the app name (a browser showing
+    YouTube is entertainment, not "browser"). Results are memoized per
+    (app, title) in an LRU; titles should already be normalized so the
+    cache isn't defeated by counters.
+    """
+
+    def __init__(self, rules: Optional[List[Dict]] = None,
+                 categories: Optional[Dict[str, str]] = None,
+                 cache_size: int = 8192):
+        rules = DEFAULT_RULES if rules is None else rules
+        self.categories = dict(DEFAULT_CATEGORIES if categories is None else categories)
+        self.cache_size = cache_size
+        self._groups: Dict[str, str] = {}  # group name -> category
+        self._apps: Dict[str, str] = {}
+        domains: Dict[str, List[str]] = {}
+        title: Dict[str, List[str]] = {}
+        for rule in rules:
+            category = rule["category"]
+            self.categories.setdefault(category, "neutral")
+            for app in rule.get("apps", []):
+                self._apps.setdefault(app_key(app), category)
+            domains.setdefault(category, []).extend(re.escape(d.lower()) for d in rule.get("domains", []))
+            title.setdefault(category, []).extend(rf"\b{re.escape(k)}\b" for k in rule.get("keywords", []))
+            for pattern in rule.get("patterns", []):
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    logger.error(f"Ignoring invalid classifier pattern {pattern!r}: {e}")
+                    continue
+                title[category].append(f"(?:{pattern})")
+        # A domain rule matches the domain itself and any subdomain
+        self._domains = self._compile(domains, r"(?:^|\.)(?:{})$")
+        self._title = self._compile(title, "{}")
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _compile(self, alternatives: Dict[str, List[str]], wrap: str) -> Optional[Pattern]:
+        parts = []
+        for category, patterns in alternatives.items():
+            if not patterns:
+                continue
+            group = f"c{len(self._groups)}"
+            self._groups[group] = category
+            parts.append(f"(?P<{group}>{wrap.format('|'.join(patterns))})")
+        return re.compile("|".join(parts), re.IGNORECASE) if parts else None
+
+    @classmethod
+    def from_settings(cls, sqlite, key: str) -> "Classifier":
+        """Rules from the JSON local setting `key` ({"rules": [...], "categories": {...}}), else the defaults."""
+        try:
+            raw = sqlite.get_setting(key)
+        except Exception:
+            raw = None
+        if not raw:
+            return cls()
+        try:
+            settings = json.loads(raw)
+            return cls(settings.get("rules"), settings.get("categories"))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Invalid classifier rules in setting {key}, using defaults: {e}")
+            return cls()
+
+    def classify(self, app_name: Optional[str], window_title: Optional[str]) -> str:
+        key = (app_key(app_name), window_title or "")
+        category = self._cache.get(key)
+        if category is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return category
+        self.misses += 1
+        category = self._classify(*key)
+        self._cache[key] = category
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return category
+
+    def _classify(self, app: str, title: str) -> str:
+        if title:
+            if self._domains is not None:
+                for domain in _DOMAIN.findall(title):
+                    match = self._domains.search(domain.lower())
+                    if match:
+                        return self._groups[match.lastgroup]
+            if self._title is not None:
+                match = self._title.search(title)
+                if match:
+                    return self._groups[match.lastgroup]
+        return self._apps.get(app, UNCATEGORIZED)
+
+    def productivity(self, category: str) -> str:
+        return self.categories.get(category, "neutral")
+
+_shared_classifier = None
+
+def get_classifier() -> Classifier:
+    """The classifier with the built-in rules, for collectors without a settings database."""
+    global _shared_classifier
+    if _shared_classifier is None:
+        _shared_classifier = Classifier()
+    return _shared_classifier
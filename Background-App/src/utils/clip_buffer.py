@@ -0,0 +1,122 @@
+import re
+import math
+import time
+import logging
+import threading
+from typing import Iterable, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class FrameRing:
+    """Fixed-size ring of the most recent frames, allocated once up front.
+
+    Holds `capacity` BGR frames of `size` (width, height) plus their
+    timestamps in a single preallocated array, so memory use is exactly
+    `nbytes` for the life of the ring no matter how long it runs. Writers
+    fill the next slot in place (`slot()` / `commit()`), nothing is
+    allocated per frame.
+    """
+
+    def __init__(self, capacity: int, size: Tuple[int, int]):
+        width, height = size
+        self.capacity = capacity
+        self.size = size
+        self.frames = np.zeros((capacity, height, width, 3), dtype=np.uint8)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.head = 0   # next slot to write
+        self.count = 0
+        self.lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return self.frames.nbytes + self.timestamps.nbytes
+
+    def slot(self) -> np.ndarray:
+        """The array to write the next frame into."""
+        return self.frames[self.head]
+
+    def commit(self, timestamp: float):
+        """Publish the frame written into `slot()`."""
+        with self.lock:
+            self.timestamps[self.head] = timestamp
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def push(self, frame: np.ndarray, timestamp: float):
+        np.copyto(self.slot(), frame)
+        self.commit(timestamp)
+
+    def order(self) -> np.ndarray:
+        """Slot indices from oldest to newest frame."""
+        with self.lock:
+            start = (self.head - self.count) % self.capacity
+            return (start + np.arange(self.count)) % self.capacity
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        with self.lock:
+            self.head = 0
+            self.count = 0
+
+class TitleTrigger:
+    """Fires when the focused window title matches a policy pattern."""
+
+    def __init__(self, patterns: Iterable[str]):
+        patterns = [p for p in patterns if p]
+        self.pattern = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE) if patterns else None
+
+    def matches(self, title: Optional[str]) -> bool:
+        return bool(self.pattern and title and self.pattern.search(title))
+
+class InputRateAnomaly:
+    """Flags input rates far outside the running norm.
+
+    Keeps an exponentially weighted mean and variance of events per second
+    and reports an anomaly when the current rate is more than `z` standard
+    deviations above the mean (and above `min_rate`, so bursts after a quiet
+    period of near-zero variance don't fire on every keystroke).
+    """
+
+    def __init__(self, alpha: float = 0.05, z: float = 4.0, min_rate: float = 15.0, warmup: int = 30):
+        self.alpha = alpha
+        self.z = z
+        self.min_rate = min_rate
+        self.warmup = warmup
+        self.mean = 0.0
+        self.var = 0.0
+        self.samples = 0
+        self._last_total = None
+        self._last_time = None
+
+    def observe(self, now: float, event_total: int) -> bool:
+        """Feed the cumulative input-event count; True when this sample is anomalous."""
+        if self._last_total is None or now <= self._last_time:
+            self._last_total, self._last_time = event_total, now
+            return False
+        rate = max(0, event_total - self._last_total) / (now - self._last_time)
+        self._last_total, self._last_time = event_total, now
+
+        anomalous = (self.samples >= self.warmup and rate >= self.min_rate
+                     and rate > self.mean + self.z * math.sqrt(self.var))
+        diff = rate - self.mean
+        self.mean += self.alpha * diff
+        self.var = (1 - self.alpha) * (self.var + self.alpha * diff * diff)
+        self.samples += 1
+        return anomalous
+
+class Cooldown:
+    """Rate-limits triggers so one burst doesn't persist many overlapping clips."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._last = -math.inf
+
+    def ready(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if now - self._last < self.seconds:
+            return False
+        self._last = now
+        return True
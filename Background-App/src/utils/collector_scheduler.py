@@ -0,0 +1,214 @@
+import time
+import heapq
+import asyncio
+import inspect
+import logging
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from .config import SCHEDULER_COALESCE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# What to do when a collector's tick comes due late (sleep, suspend, a slow tick)
+CATCH_UP_SKIP = "skip"    # run once, then continue on the original grid
+CATCH_UP_ALL = "all"      # run once for every missed tick (bounded by max_catch_up)
+CATCH_UP_DELAY = "delay"  # run once, next tick one interval after this run
+
+class Collector:
+    """Something the CollectorScheduler drives.
+
+    `tick(now)` does one unit of work at the scheduler's clock time `now`
+    and may be a coroutine. `next_delay(now)` lets a collector ask to run
+    sooner than its interval (e.g. an adaptive capture schedule); None
+    means "just use the interval".
+    """
+
+    name = "collector"
+
+    def tick(self, now: float) -> Any:
+        raise NotImplementedError
+
+    def next_delay(self, now: float) -> Optional[float]:
+        return None
+
+class FunctionCollector(Collector):
+    """Wraps a plain function or coroutine function taking `now`."""
+
+    def __init__(self, name: str, func: Callable[[float], Any],
+                 next_delay: Optional[Callable[[float], Optional[float]]] = None):
+        self.name = name
+        self.func = func
+        self._next_delay = next_delay
+
+    def tick(self, now: float) -> Any:
+        return self.func(now)
+
+    def next_delay(self, now: float) -> Optional[float]:
+        return self._next_delay(now) if self._next_delay is not None else None
+
+class CollectorScheduler:
+    """One heap of due times drives every collector from a single task.
+
+    Each collector has its own interval and catch-up policy. A wakeup runs
+    every collector due within `coalesce_window` seconds of the earliest
+    one, so collectors with nearby due times share a wakeup instead of
+    each waking the process. Every collector in a wakeup sees the same
+    `now`. Ticks that raise are logged and rescheduled normally.
+
+    A collector added with an IdleBackoff ignores its fixed interval and
+    uses the backoff's instead, so it wakes less and less while the user
+    is away; `wake()` on the first input brings it straight back.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time, coalesce_window: float = SCHEDULER_COALESCE_SECONDS,
+                 max_catch_up: int = 10):
+        self.clock = clock
+        self.coalesce_window = coalesce_window
+        self.max_catch_up = max_catch_up
+        self.wakeups = 0
+        self._heap: List = []
+        self._jobs: Dict[int, Dict] = {}
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+        self._stopped = False
+        self._loop = None
+        self._loop_thread = None
+
+    def add(self, collector: Collector, interval: float, policy: str = CATCH_UP_SKIP,
+            delay: float = 0.0, on_result: Optional[Callable[[Collector, Any], Any]] = None,
+            backoff=None) -> Dict:
+        """Schedule `collector` every `interval` seconds, first after `delay`.
+
+        `on_result(collector, result)` is called with every non-None tick
+        result and may also be a coroutine function.
+        """
+        if policy not in (CATCH_UP_SKIP, CATCH_UP_ALL, CATCH_UP_DELAY):
+            raise ValueError(f"Unknown catch-up policy: {policy}")
+        job = {"collector": collector, "interval": interval, "policy": policy,
+               "on_result": on_result, "backoff": backoff,
+               "due": self.clock() + delay, "runs": 0, "missed": 0}
+        self._jobs[id(collector)] = job
+        self._push(job)
+        return job
+
+    def remove(self, collector: Collector):
+        # Heap entries of removed jobs are dropped lazily when they surface
+        self._jobs.pop(id(collector), None)
+        self._changed.set()
+
+    def scheduled(self, collector: Collector) -> bool:
+        return id(collector) in self._jobs
+
+    @property
+    def backed_off(self) -> bool:
+        return any(job["backoff"] is not None and job["backoff"].backed_off for job in list(self._jobs.values()))
+
+    def wake(self):
+        """Input arrived: run every backed-off collector now. Safe to call from any thread."""
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            self._loop.call_soon_threadsafe(self._wake)
+        else:
+            self._wake()
+
+    def _wake(self):
+        now = self.clock()
+        for job in list(self._jobs.values()):
+            backoff = job["backoff"]
+            if backoff is not None and backoff.backed_off:
+                backoff.reset()
+                if job["due"] > now:
+                    job["due"] = now
+                    self._push(job)
+
+    def _push(self, job: Dict):
+        heapq.heappush(self._heap, (job["due"], next(self._seq), job))
+        self._changed.set()
+
+    def _live(self, entry) -> bool:
+        due, _, job = entry
+        return self._jobs.get(id(job["collector"])) is job and job["due"] == due
+
+    def next_due(self) -> Optional[float]:
+        while self._heap and not self._live(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    async def run_pending(self, now: Optional[float] = None) -> List[str]:
+        """Run every collector due by `now` (plus the coalesce window); returns their names."""
+        now = self.clock() if now is None else now
+        first = self.next_due()
+        if first is None or first > now:
+            return []
+        self.wakeups += 1
+        horizon = max(now, first) + self.coalesce_window
+        batch = []
+        while self._heap and self._heap[0][0] <= horizon:
+            entry = heapq.heappop(self._heap)
+            if self._live(entry):
+                batch.append(entry[2])
+        for job in batch:
+            await self._run(job, now)
+        return [job["collector"].name for job in batch]
+
+    async def _run(self, job: Dict, now: float):
+        collector, interval = job["collector"], job["interval"]
+        late = max(0.0, now - job["due"])
+        missed = int(late // interval) if interval > 0 else 0
+        job["missed"] += missed
+        runs = min(missed + 1, self.max_catch_up) if job["policy"] == CATCH_UP_ALL else 1
+        for _ in range(runs):
+            await self._tick(job, now)
+        if job["backoff"] is not None:
+            due = now + job["backoff"].next_interval()
+        elif job["policy"] == CATCH_UP_DELAY:
+            due = now + interval
+        else:
+            # Stay on the grid: the first slot after now
+            due = job["due"] + interval * (missed + 1)
+        try:
+            requested = collector.next_delay(now)
+        except Exception as e:
+            logger.error(f"Error in {collector.name} next_delay: {e}")
+            requested = None
+        if requested is not None:
+            due = min(due, now + max(0.0, requested))
+        if self._jobs.get(id(collector)) is job:
+            job["due"] = max(due, now)
+            self._push(job)
+
+    async def _tick(self, job: Dict, now: float):
+        collector = job["collector"]
+        try:
+            result = collector.tick(now)
+            if inspect.isawaitable(result):
+                result = await result
+            job["runs"] += 1
+            if result is not None and job["on_result"] is not None:
+                handled = job["on_result"](collector, result)
+                if inspect.isawaitable(handled):
+                    await handled
+        except Exception as e:
+            logger.error(f"Error in collector {collector.name}: {e}")
+
+    async def run(self):
+        """Sleep until the next due collector, run the batch, repeat until `stop()`."""
+        self._stopped = False
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        while not self._stopped:
+            self._changed.clear()
+            due = self.next_due()
+            timeout = None if due is None else max(0.0, due - self.clock())
+            if timeout is None or timeout > 0:
+                try:
+                    # Woken early when collectors are added or removed
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+            await self.run_pending()
+
+    def stop(self):
+        self._stopped = True
+        self._changed.set()
@@ -12,6 +12,7 @@ SCREENSHOTS_DIR = DATA_DIR / "screenshots"
 VIDEOS_DIR = DATA_DIR / "videos"
 LOGS_DIR = DATA_DIR / "logs"
 ACTIVITY_LOG_FILE = LOGS_DIR / "activity.log"
+STORAGE_CATALOG_DB = DATA_DIR / "storage_catalog.db"
 
 # Create necessary directories
 for directory in [DATA_DIR, SCREENSHOTS_DIR, VIDEOS_DIR, LOGS_DIR]:
@@ -24,10 +25,29 @@ USER_ID = os.getenv('USER_ID', '')
 
 # Data collection settings
 SCREENSHOT_INTERVAL = int(os.getenv('SCREENSHOT_INTERVAL', '300'))  # 5 minutes in seconds
+SCREENSHOT_MIN_INTERVAL = int(os.getenv('SCREENSHOT_MIN_INTERVAL', '30'))    # Never capture more often than this
+SCREENSHOT_MAX_INTERVAL = int(os.getenv('SCREENSHOT_MAX_INTERVAL', '900'))  # Longest gap on a static screen
+SCREENSHOT_HOURLY_BUDGET = int(os.getenv('SCREENSHOT_HOURLY_BUDGET', '30')) # Captures allowed per rolling hour
+SCREENSHOT_JITTER = 0.2        # +/- fraction of randomness on every interval
 VIDEO_INTERVAL = 60 * 60       # 60 minutes in seconds
 ACTIVITY_INTERVAL = 10 * 60    # 10 minutes in seconds
 KEYSTROKE_INTERVAL = int(os.getenv('KEYSTROKE_INTERVAL', '60'))    # 1 minute in seconds
 SYNC_INTERVAL = int(os.getenv('SYNC_INTERVAL', '120'))            # 2 minutes in seconds
+COLLECTOR_POLL_INTERVAL = int(os.getenv('COLLECTOR_POLL_INTERVAL', '5'))  # Seconds between activity/app usage ticks
+SCHEDULER_COALESCE_SECONDS = 1.0  # Collectors due this close together share one wakeup
+
+# Idle backoff: polling slows down while nobody is at the machine and snaps back on input
+POLL_IDLE_AFTER = int(os.getenv('POLL_IDLE_AFTER', '60'))  # Seconds without input before polls back off
+POLL_BACKOFF_FACTOR = 2.0          # Interval multiplier per idle poll
+WINDOW_POLL_MIN = 1.0              # Active-window poll interval while active
+WINDOW_POLL_MAX = 30.0             # ...and its ceiling while idle
+COLLECTOR_POLL_MAX = int(os.getenv('COLLECTOR_POLL_MAX', '300'))  # Ceiling for collector ticks while idle
+
+# Resource sampling
+RESOURCE_SAMPLE_INTERVAL = int(os.getenv('RESOURCE_SAMPLE_INTERVAL', '5'))  # Seconds between system CPU/memory samples
+RESOURCE_RING_SIZE = 720       # Samples kept in memory (1 hour at 5 s)
+RESOURCE_TOP_N = 5             # Processes kept per top-process snapshot
+RESOURCE_TOP_EVERY = 6         # Walk the process table every Nth sample only
 MAX_STORAGE_MB = int(os.getenv("MAX_STORAGE_MB", 450))  # Maximum storage in MB
 
 # Storage optimization
@@ -35,9 +55,45 @@ MAX_LOCAL_STORAGE = MAX_STORAGE_MB * 1024 * 1024  # Convert MB to bytes
 SCREENSHOT_QUALITY = 30  # WebP quality (0-100)
 VIDEO_QUALITY = "low"    # Video quality (low, medium, high)
 VIDEO_DURATION = 10      # Video duration in seconds
+RECORDING_FPS = 20.0     # Nominal recording frame rate
+RECORDING_MODE = os.getenv('RECORDING_MODE', 'cfr')  # 'cfr' (every frame) or 'vfr' (changed frames + timestamps sidecar)
+RECORDING_SEGMENT_SECONDS = int(os.getenv('RECORDING_SEGMENT_SECONDS', '10'))  # Length of each uploadable segment
+RECORDING_MAX_LONG_EDGE = int(os.getenv('RECORDING_MAX_LONG_EDGE', '0'))  # Downscale recorded frames above this long edge (0 = native)
+RECORDING_GRAYSCALE = os.getenv('RECORDING_GRAYSCALE', 'false').lower() == 'true'  # Record single-channel frames
+RECORDINGS_BUCKET = "user-recordings"  # Storage bucket for recording segments
+UPLOAD_CHUNK_BYTES = 6 * 1024 * 1024  # Resumable upload chunk size (Supabase requires 6MB)
+CLIP_BUFFER_ENABLED = os.getenv('CLIP_BUFFER_ENABLED', 'true').lower() == 'true'  # Keep a rolling clip buffer while monitoring
+CLIP_BUFFER_SECONDS = int(os.getenv('CLIP_BUFFER_SECONDS', '20'))  # Seconds of frames kept in memory for on-trigger clips
+CLIP_FPS = 4.0                 # Frame rate of the rolling clip buffer
+CLIP_MAX_LONG_EDGE = 640       # Clip frames are downscaled to this long edge
+CLIP_TITLE_PATTERNS = [p for p in os.getenv('CLIP_TITLE_PATTERNS', '').split(',') if p]  # Regexes that trigger a clip
+CLIP_COOLDOWN = 60             # Minimum seconds between persisted clips
 MAX_SCREENSHOTS = 1000   # Maximum screenshots to keep locally
 MAX_VIDEOS = 100         # Maximum videos to keep locally
 SCREENSHOT_MAX_SIZE = 1024 * 1024  # 1MB maximum size for screenshots
+THUMBNAIL_SIZES = (480, 160)  # Thumbnail long-edge sizes in pixels
+THUMBNAIL_QUALITY = 50   # JPEG quality for thumbnails (0-100)
+CAPTURE_MAX_LONG_EDGE = int(os.getenv('CAPTURE_MAX_LONG_EDGE', '1920'))  # Downscale captures above this long edge (0 = off)
+CAPTURE_SCALE = float(os.getenv('CAPTURE_SCALE', '0'))  # Fixed scale per frame, e.g. 0.5 on 200% DPI (0 = use long edge)
+CAPTURE_MODE = os.getenv('CAPTURE_MODE', 'full')  # 'full' (whole screen) or 'window' (active window only)
+SCREENSHOT_BACKEND = os.getenv('SCREENSHOT_BACKEND', 'files')  # 'files' (sharded files) or 'pack' (segment files)
+PACK_SEGMENT_MB = int(os.getenv('PACK_SEGMENT_MB', '64'))      # Roll pack segments over at this size
+
+# App sessions
+APP_SESSION_CHECKPOINT = 300    # Seconds between checkpoints of the open app session
+APP_SESSION_MIN_SECONDS = 2     # Shorter focus stretches (alt-tab flicker) are dropped
+
+# Window title normalization
+TITLE_MASK_DIGITS = os.getenv('TITLE_MASK_DIGITS', 'true').lower() == 'true'  # "(3) Inbox 12:04" -> "Inbox"
+TITLE_MIN_DWELL = int(os.getenv('TITLE_MIN_DWELL', '10'))   # Seconds a new title must hold before it starts a session
+TITLE_RULES_FILE = os.getenv('TITLE_RULES_FILE', '')        # JSON list of [app or null, pattern, replacement]
+CLASSIFIER_SETTINGS_KEY = "classifier_rules"  # local_settings key holding the category rules as JSON
+
+# Eviction
+EVICTION_HIGH_WATER_RATIO = 0.95  # Capture-time eviction starts above 95% of the storage limit
+EVICTION_TARGET_RATIO = 0.9     # Evict down to 90% of MAX_LOCAL_STORAGE
+EVICTION_CRITICAL_RATIO = 0.98  # Above this, unsynced screenshots may be evicted too
+EVICTION_DOWNSCALE = True       # Halve resolution of a screenshot before deleting it
 
 # Data retention (30 days)
 DATA_RETENTION_DAYS = 30
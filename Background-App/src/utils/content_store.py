@@ -0,0 +1,106 @@
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class ContentAddressedStore:
+    """Stores encoded screenshots under the SHA-256 of their bytes.
+
+    Files live at `<root>/<h[0:2]>/<h[2:4]>/<h><ext>`, which keeps every
+    directory small (at most 256 entries per level) and makes exact duplicates
+    free: a frame whose bytes are already stored is never written twice.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, digest: str, ext: str = '.jpg') -> str:
+        """Sharded location of an object with the given digest."""
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}{ext}")
+
+    def put(self, data: bytes, ext: str = '.jpg') -> Tuple[str, str, bool]:
+        """Store `data`, returning (path, digest, duplicate).
+
+        The write goes through a temporary file in the shard directory and
+        an atomic rename, so readers never see a partially written object.
+        """
+        digest = self.digest(data)
+        path = self.path_for(digest, ext)
+        if os.path.exists(path):
+            logger.debug(f"Duplicate screenshot content {digest[:12]}, reusing {path}")
+            return path, digest, True
+
+        self.put_at(path, data)
+        return path, digest, False
+
+    def put_at(self, path: str, data: bytes) -> int:
+        """Atomically write `data` at an explicit path (thumbnails, re-encodes)."""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return len(data)
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def size(self, path: str) -> int:
+        return os.path.getsize(path)
+
+    def read(self, path: str) -> bytes:
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def delete(self, path: str):
+        """Remove an object and prune its shard directories once empty."""
+        os.remove(path)
+        shard = os.path.dirname(path)
+        for directory in (shard, os.path.dirname(shard)):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break  # not empty (or already gone)
+
+    def reconcile(self, catalog, owner: Optional[str] = None) -> Dict[str, int]:
+        """Bring the storage catalog in line with the files on disk."""
+        return catalog.reconcile(self.root, owner=owner)
+
+    def compact(self) -> Dict[str, int]:
+        """Nothing to compact: deleted objects free their space immediately."""
+        return {'segments': 0, 'moved': 0, 'bytes_reclaimed': 0}
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root, exist_ok=True)
+
+    def close(self):
+        pass
+
+def open_screenshot_store(root: str, backend: str = 'files', segment_bytes: int = 64 * 1024 * 1024):
+    """Build the screenshot storage backend named by `backend` ('files' or 'pack').
+
+    Pack stores are shared per root, so every component writing to the
+    same directory appends through one lock and one active segment.
+    """
+    if backend == 'pack':
+        from .pack_store import get_pack_store
+        return get_pack_store(root, segment_bytes=segment_bytes)
+    if backend != 'files':
+        logger.warning(f"Unknown screenshot backend '{backend}', using files")
+    return ContentAddressedStore(root)
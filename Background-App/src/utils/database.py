@@ -1,4 +1,5 @@
 import os
+import json
 import logging
 from supabase import create_client, Client
 from dotenv import load_dotenv
@@ -110,6 +111,7 @@ class LocalDatabase:
                 user_id TEXT NOT NULL,
                 timestamp DATETIME NOT NULL,
                 file_path TEXT NOT NULL,
+                thumbnail_paths TEXT,
                 synced BOOLEAN DEFAULT 0
             );
 
@@ -132,6 +134,10 @@ class LocalDatabase:
                 synced BOOLEAN DEFAULT 0
             );
         ''')
+        # Add columns introduced after the database was first created
+        columns = [row[1] for row in self.cursor.execute("PRAGMA table_info(screenshots)").fetchall()]
+        if "thumbnail_paths" not in columns:
+            self.cursor.execute("ALTER TABLE screenshots ADD COLUMN thumbnail_paths TEXT")
         self.conn.commit()
 
     def insert_activity(self, user_id: str, activity_type: str, details: Optional[Dict] = None) -> int:
@@ -147,12 +153,14 @@ class LocalDatabase:
             logger.error(f"Error inserting activity: {str(e)}")
             raise
 
-    def insert_screenshot(self, user_id: str, file_path: str) -> int:
+    def insert_screenshot(self, user_id: str, file_path: str,
+                          thumbnails: Optional[Dict[int, str]] = None) -> int:
         """Insert a new screenshot record."""
         try:
+            thumbnail_paths = json.dumps({str(k): v for k, v in thumbnails.items()}) if thumbnails else None
             self.cursor.execute(
-                "INSERT INTO screenshots (user_id, timestamp, file_path) VALUES (?, ?, ?)",
-                (user_id, datetime.now().isoformat(), file_path)
+                "INSERT INTO screenshots (user_id, timestamp, file_path, thumbnail_paths) VALUES (?, ?, ?, ?)",
+                (user_id, datetime.now().isoformat(), file_path, thumbnail_paths)
             )
             self.conn.commit()
             return self.cursor.lastrowid
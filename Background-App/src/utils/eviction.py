@@ -0,0 +1,254 @@
+import io
+import os
+import heapq
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+from PIL import Image
+from .storage_catalog import StorageCatalog
+
+logger = logging.getLogger(__name__)
+
+# Field positions in StorageCatalog.candidates() rows
+PATH, BYTES, CAPTURED_AT, SYNCED, DOWNSCALED, THUMB_BYTES = range(6)
+
+class EvictionPolicy:
+    """Decides which catalogued screenshots may be evicted, in what order and how.
+
+    Policies are combined by EvictionEngine: a candidate must be admitted by
+    every policy, heap ordering is the concatenation of every policy's
+    sort key, and the first policy asking for a non-delete action wins.
+    """
+
+    name = "policy"
+
+    def admits(self, row: tuple, critical: bool) -> bool:
+        return True
+
+    def sort_key(self, row: tuple) -> tuple:
+        return ()
+
+    def action(self, row: tuple) -> str:
+        return "delete"
+
+class OldestFirst(EvictionPolicy):
+    name = "oldest-first"
+
+    def sort_key(self, row: tuple) -> tuple:
+        return (row[CAPTURED_AT],)
+
+class OldestSyncedFirst(EvictionPolicy):
+    """Evict uploaded screenshots before anything that still needs syncing."""
+
+    name = "oldest-synced-first"
+
+    def sort_key(self, row: tuple) -> tuple:
+        return (0 if row[SYNCED] else 1, row[CAPTURED_AT])
+
+class NeverEvictUnsyncedUnlessCritical(EvictionPolicy):
+    """Keep screenshots that were never uploaded unless the disk is critically full."""
+
+    name = "never-evict-unsynced-unless-critical"
+
+    def admits(self, row: tuple, critical: bool) -> bool:
+        return bool(row[SYNCED]) or critical
+
+class DownscaleBeforeDelete(EvictionPolicy):
+    """Shrink a screenshot in place the first time it is picked, delete it the second."""
+
+    name = "downscale-before-delete"
+
+    def __init__(self, scale: float = 0.5, min_bytes: int = 64 * 1024):
+        self.scale = scale
+        self.min_bytes = min_bytes
+
+    def action(self, row: tuple) -> str:
+        if not row[DOWNSCALED] and row[BYTES] >= self.min_bytes:
+            return "downscale"
+        return "delete"
+
+    def estimate(self, size: int) -> int:
+        """Expected size after downscaling (encoded size tracks pixel count)."""
+        return int(size * self.scale * self.scale)
+
+def downscale_bytes(data: bytes, scale: float = 0.5, quality: int = 60) -> bytes:
+    """Re-encode an encoded image at a smaller resolution, keeping its format."""
+    with Image.open(io.BytesIO(data)) as img:
+        fmt = img.format or 'JPEG'
+        factor = max(1, int(round(1 / scale)))
+        smaller = img.reduce(factor) if factor > 1 else img.copy()
+    if fmt == 'JPEG' and smaller.mode != 'RGB':
+        smaller = smaller.convert('RGB')
+    save_kwargs = {'quality': quality, 'optimize': True} if fmt in ('JPEG', 'WEBP') else {'optimize': True}
+    buffer = io.BytesIO()
+    smaller.save(buffer, fmt, **save_kwargs)
+    return buffer.getvalue()
+
+def downscale_file(path: str, scale: float = 0.5, quality: int = 60) -> int:
+    """Re-encode an image file at a smaller resolution in place, returning its new size."""
+    with open(path, 'rb') as f:
+        data = downscale_bytes(f.read(), scale, quality)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+class EvictionPlan:
+    """Ordered list of eviction actions, produced without touching the disk."""
+
+    def __init__(self, total_bytes: int, file_count: int, critical: bool):
+        self.total_bytes = total_bytes
+        self.file_count = file_count
+        self.critical = critical
+        self.actions: List[Dict] = []
+        self.blocked_unsynced = 0
+
+    @property
+    def bytes_freed(self) -> int:
+        return sum(a['bytes_freed'] for a in self.actions)
+
+    def summary(self) -> Dict:
+        deletes = [a for a in self.actions if a['action'] == 'delete']
+        downscales = [a for a in self.actions if a['action'] == 'downscale']
+        return {
+            'critical': self.critical,
+            'total_bytes_before': self.total_bytes,
+            'total_bytes_after': self.total_bytes - self.bytes_freed,
+            'files_before': self.file_count,
+            'files_after': self.file_count - len(deletes),
+            'deletes': len(deletes),
+            'downscales': len(downscales),
+            'unsynced_deletes': sum(1 for a in deletes if not a['synced']),
+            'blocked_unsynced': self.blocked_unsynced,
+            'bytes_freed': self.bytes_freed
+        }
+
+class EvictionEngine:
+    """Heap-driven eviction over the storage catalog.
+
+    Candidates are loaded once from the catalog and heapified (O(n)); each
+    eviction is then a heap pop (O(log n)), so planning over 100k files takes
+    a fraction of a second and never re-stats the directory.
+    """
+
+    def __init__(self,
+                 catalog: StorageCatalog,
+                 policies: Optional[Sequence[EvictionPolicy]] = None,
+                 critical_ratio: float = 0.98,
+                 remover: Callable[[str], None] = os.remove,
+                 downscaler: Callable[[str, float], int] = downscale_file):
+        self.catalog = catalog
+        self.policies = list(policies) if policies else [
+            NeverEvictUnsyncedUnlessCritical(),
+            OldestSyncedFirst(),
+        ]
+        self.critical_ratio = critical_ratio
+        self.remover = remover
+        self.downscaler = downscaler
+
+    def plan(self,
+             max_bytes: int,
+             target_bytes: Optional[int] = None,
+             max_files: Optional[int] = None) -> EvictionPlan:
+        """Work out what to evict to get under `target_bytes` and `max_files`."""
+        total_bytes, _ = self.catalog.totals()
+        file_count = self.catalog.original_count()
+        target_bytes = max_bytes if target_bytes is None else target_bytes
+        critical = total_bytes >= max_bytes * self.critical_ratio
+        plan = EvictionPlan(total_bytes, file_count, critical)
+
+        bytes_over = total_bytes - target_bytes
+        files_over = file_count - max_files if max_files is not None else 0
+        if bytes_over <= 0 and files_over <= 0:
+            return plan
+
+        # Only call the hooks a policy actually overrides; this loop runs once per file
+        admit_fns = [p.admits for p in self.policies if type(p).admits is not EvictionPolicy.admits]
+        key_fns = [p.sort_key for p in self.policies if type(p).sort_key is not EvictionPolicy.sort_key]
+        action_fns = [p.action for p in self.policies if type(p).action is not EvictionPolicy.action]
+        if not key_fns:
+            key_fns = [OldestFirst().sort_key]
+
+        heap = []
+        for row in self.catalog.candidates():
+            if admit_fns and not all([fn(row, critical) for fn in admit_fns]):
+                if not row[SYNCED]:
+                    plan.blocked_unsynced += 1
+                continue
+            key = key_fns[0](row) if len(key_fns) == 1 else sum([fn(row) for fn in key_fns], ())
+            # Leading 0 is the pass: downscaled files re-enter at pass 1, so
+            # every candidate is shrunk before anything is deleted
+            heap.append((0,) + key + (row[PATH], row))
+        heapq.heapify(heap)
+
+        downscaler = next((p for p in self.policies if isinstance(p, DownscaleBeforeDelete)), None)
+        actions = plan.actions
+        while heap and (bytes_over > 0 or files_over > 0):
+            entry = heapq.heappop(heap)
+            key, path, row = entry[1:-2], entry[-2], entry[-1]
+            action = "delete"
+            for fn in action_fns:
+                action = fn(row)
+                if action != "delete":
+                    break
+
+            # Shrinking a file doesn't help a file-count limit
+            if action == "downscale" and downscaler and files_over <= 0:
+                new_size = downscaler.estimate(row[BYTES])
+                freed = row[BYTES] - new_size
+                actions.append({'path': path, 'action': 'downscale',
+                                'bytes_freed': freed, 'synced': bool(row[SYNCED])})
+                bytes_over -= freed
+                shrunk = row[:BYTES] + (new_size,) + row[BYTES + 1:DOWNSCALED] + (1,) + row[DOWNSCALED + 1:]
+                heapq.heappush(heap, (1,) + key + (path, shrunk))
+                continue
+
+            freed = row[BYTES] + row[THUMB_BYTES]
+            actions.append({'path': path, 'action': 'delete',
+                            'bytes_freed': freed, 'synced': bool(row[SYNCED])})
+            bytes_over -= freed
+            files_over -= 1
+
+        return plan
+
+    def execute(self, plan: EvictionPlan) -> Dict:
+        """Carry out a plan, keeping the catalog in step with the disk."""
+        scale = next((p.scale for p in self.policies if isinstance(p, DownscaleBeforeDelete)), 0.5)
+        doomed = {step['path'] for step in plan.actions if step['action'] == 'delete'}
+        deleted = downscaled = failed = 0
+        for step in plan.actions:
+            path = step['path']
+            try:
+                if step['action'] == 'downscale':
+                    if path in doomed:
+                        continue  # the same plan deletes it later
+                    self.catalog.mark_downscaled(path, self.downscaler(path, scale))
+                    downscaled += 1
+                else:
+                    for removed in self.catalog.remove(path):
+                        try:
+                            self.remover(removed)
+                        except FileNotFoundError:
+                            pass
+                    deleted += 1
+                    logger.info(f"Evicted screenshot: {path}")
+            except Exception as e:
+                failed += 1
+                logger.error(f"Error evicting {path}: {e}")
+        return {'deleted': deleted, 'downscaled': downscaled, 'failed': failed}
+
+    def enforce(self,
+                max_bytes: int,
+                target_bytes: Optional[int] = None,
+                max_files: Optional[int] = None,
+                dry_run: bool = False) -> Dict:
+        """Plan and (unless `dry_run`) execute eviction, returning a report."""
+        plan = self.plan(max_bytes, target_bytes, max_files)
+        report = plan.summary()
+        report['dry_run'] = dry_run
+        report['policies'] = [p.name for p in self.policies]
+        if dry_run:
+            report['actions'] = plan.actions
+        elif plan.actions:
+            report.update(self.execute(plan))
+        if plan.blocked_unsynced and report['total_bytes_after'] > (max_bytes if target_bytes is None else target_bytes):
+            logger.warning(f"{plan.blocked_unsynced} unsynced screenshots kept despite storage pressure")
+        return report
@@ -0,0 +1,49 @@
+import math
+import logging
+from typing import Optional
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+def reduction_factor(width: int,
+                     height: int,
+                     max_long_edge: Optional[int] = None,
+                     scale: Optional[float] = None) -> int:
+    """Integer area-reduction factor that brings a frame within the resolution cap.
+
+    `scale` (e.g. 0.5 for a 200% DPI display) wins over `max_long_edge`; with
+    neither set, or a frame already small enough, the factor is 1.
+    """
+    if scale and 0 < scale < 1:
+        return max(1, int(round(1 / scale)))
+    if max_long_edge and max(width, height) > max_long_edge:
+        return math.ceil(max(width, height) / max_long_edge)
+    return 1
+
+def downscale_bgra(raw, width: int, height: int, factor: int) -> Image.Image:
+    """Area-reduce a raw BGRA capture buffer by `factor`, returning an RGB image.
+
+    The buffer is unpacked by Pillow's BGRX raw decoder (channel swap fused
+    into the single read of the buffer) and box-reduced in C, so no full-size
+    RGB copy is made before the reduce. This measured faster than doing the
+    area average in NumPy on the same buffer.
+    """
+    frame = Image.frombuffer('RGB', (width, height), raw, 'raw', 'BGRX', 0, 1)
+    return frame.reduce(factor) if factor > 1 else frame
+
+def downscale_image(image: Image.Image,
+                    max_long_edge: Optional[int] = None,
+                    scale: Optional[float] = None) -> Image.Image:
+    """Apply the resolution cap to an already-decoded PIL frame (box/area reduce)."""
+    factor = reduction_factor(image.width, image.height, max_long_edge, scale)
+    if factor <= 1:
+        return image
+    return image.reduce(factor)
+
+def capture_frame(shot,
+                  max_long_edge: Optional[int] = None,
+                  scale: Optional[float] = None) -> Image.Image:
+    """Reduce an mss screenshot straight from its BGRA buffer."""
+    width, height = shot.size
+    factor = reduction_factor(width, height, max_long_edge, scale)
+    return downscale_bgra(shot.bgra, width, height, factor)
@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+import ctypes
+import logging
+import platform
+import threading
+from typing import Callable, Optional
+
+# python-xlib is optional; without it (or without a display) idle falls back to input events
+try:
+    from Xlib import display as xdisplay
+except ImportError:
+    xdisplay = None
+
+logger = logging.getLogger(__name__)
+
+class IdleProvider:
+    """Source of "seconds since the last keyboard or mouse input".
+
+    OS-backed providers read the system's own input counter, so they need
+    no input hooks and no work per event. `touch()` is only meaningful for
+    the input-event fallback and is a no-op everywhere else.
+    """
+
+    def seconds(self) -> float:
+        raise NotImplementedError
+
+    def touch(self):
+        pass
+
+    def idle_since(self) -> float:
+        """Epoch time of the last input."""
+        return time.time() - self.seconds()
+
+class Win32IdleProvider(IdleProvider):
+    """GetLastInputInfo: tick count of the last input in this session."""
+
+    class _LastInputInfo(ctypes.Structure):
+        _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+    def __init__(self):
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._info = self._LastInputInfo()
+        self._info.cbSize = ctypes.sizeof(self._info)
+
+    def seconds(self) -> float:
+        if not self._user32.GetLastInputInfo(ctypes.byref(self._info)):
+            raise OSError("GetLastInputInfo failed")
+        # Both are 32-bit millisecond tick counts that wrap every 49.7 days
+        elapsed = (self._kernel32.GetTickCount() - self._info.dwTime) & 0xFFFFFFFF
+        return elapsed / 1000.0
+
+class XScreenSaverIdleProvider(IdleProvider):
+    """MIT-SCREEN-SAVER extension: the X server's own idle counter."""
+
+    def __init__(self, display_name: Optional[str] = None):
+        if xdisplay is None:
+            raise RuntimeError("python-xlib is not installed")
+        # A connection of its own; the window tracker's is read by its thread
+        self.display = xdisplay.Display(display_name)
+        if not self.display.has_extension("MIT-SCREEN-SAVER"):
+            self.display.close()
+            raise RuntimeError("X server has no MIT-SCREEN-SAVER extension")
+        self.root = self.display.screen().root
+        self._lock = threading.Lock()
+
+    def seconds(self) -> float:
+        with self._lock:
+            return self.root.screensaver_query_info().idle / 1000.0
+
+class MacIdleProvider(IdleProvider):
+    """Quartz event source: seconds since any HID event."""
+
+    def __init__(self):
+        import Quartz
+        self._quartz = Quartz
+
+    def seconds(self) -> float:
+        q = self._quartz
+        return q.CGEventSourceSecondsSinceLastEventType(q.kCGEventSourceStateHIDSystemState,
+                                                       q.kCGAnyInputEventType)
+
+class InputEventIdleProvider(IdleProvider):
+    """Fallback without an OS counter: idle since the last `touch()` from an input hook."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._last_input = clock()
+
+    def touch(self):
+        self._last_input = self.clock()
+
+    def seconds(self) -> float:
+        return max(0.0, self.clock() - self._last_input)
+
+class FakeIdleProvider(IdleProvider):
+    """Scripted idle time for tests."""
+
+    def __init__(self, idle: float = 0.0):
+        self.idle = idle
+        self.reads = 0
+
+    def set(self, idle: float):
+        self.idle = idle
+
+    def touch(self):
+        self.idle = 0.0
+
+    def seconds(self) -> float:
+        self.reads += 1
+        return self.idle
+
+class IdleBackoff:
+    """Polling interval that backs off exponentially while the user is idle.
+
+    Each `next_interval()` returns `min_interval` as long as there was input
+    in the last `idle_after` seconds, and otherwise the previous interval
+    times `factor`, capped at `max_interval`. `reset()` (on the first input
+    event) snaps straight back to `min_interval`.
+    """
+
+    def __init__(self, idle: IdleProvider, min_interval: float, max_interval: float,
+                 factor: float = 2.0, idle_after: float = 60.0):
+        self.idle = idle
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.factor = factor
+        self.idle_after = idle_after
+        self.current = min_interval
+
+    @property
+    def backed_off(self) -> bool:
+        return self.current > self.min_interval
+
+    def next_interval(self) -> float:
+        try:
+            idle = self.idle.seconds()
+        except Exception as e:
+            logger.error(f"Error reading idle time: {e}")
+            idle = 0.0
+        if idle < self.idle_after:
+            self.current = self.min_interval
+        else:
+            self.current = min(self.current * self.factor, self.max_interval)
+        return self.current
+
+    def reset(self):
+        self.current = self.min_interval
+
+def default_idle_provider() -> IdleProvider:
+    """The OS idle counter for this platform, or the input-event fallback."""
+    try:
+        if sys.platform == "win32":
+            return Win32IdleProvider()
+        system = platform.system()
+        if system == "Darwin":
+            return MacIdleProvider()
+        if system == "Linux" and os.environ.get("DISPLAY"):
+            provider = XScreenSaverIdleProvider()
+            provider.seconds()
+            return provider
+    except Exception as e:
+        logger.info(f"OS idle time unavailable, using input events: {e}")
+    return InputEventIdleProvider()
+
+_shared_provider = None
+
+def get_idle_provider() -> IdleProvider:
+    """The idle-time provider shared by the monitor and all collectors."""
+    global _shared_provider
+    if _shared_provider is None:
+        _shared_provider = default_idle_provider()
+    return _shared_provider
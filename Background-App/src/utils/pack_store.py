@@ -0,0 +1,373 @@
+import os
+import mmap
+import time
+import struct
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Record header: magic, key length, data length
+_HEADER = struct.Struct('<4sHI')
+_MAGIC = b'PKR1'
+
+class PackStore:
+    """Log-structured screenshot store that appends objects into segment files.
+
+    Encoded frames (and their thumbnails) are appended to the active
+    `segment_<n>.pack` file until it reaches `segment_bytes`, then a new one is
+    started. A SQLite index maps each key to (segment, offset, length, hash,
+    timestamp), reads go through a cached mmap of the segment, and deletes only
+    drop the index row. `compact()` rewrites sparse sealed segments to reclaim
+    the space of deleted objects, so thousands of small frames cost a handful
+    of files instead of thousands of inodes.
+
+    Objects are addressed by `pack://<root>/<key>` locators, so any store can
+    tell which root a catalog row lives in and hands other roots' locators to
+    that root's store; any other locator is treated as a plain file path so
+    records written by the file backend keep working. A root must have a
+    single writer in the process: open stores with `get_pack_store()`, which
+    shares one instance (one lock, one active segment) per root.
+    """
+
+    SCHEME = 'pack://'
+
+    def __init__(self, root: str, segment_bytes: int = 64 * 1024 * 1024):
+        self.root = root
+        self.segment_bytes = segment_bytes
+        os.makedirs(self.root, exist_ok=True)
+        self.root_id = root_id(root)
+        self.prefix = f"{self.SCHEME}{self.root_id}/"
+        self._lock = threading.RLock()
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._active = None
+        self._active_id = None
+        self.conn = None
+        self.initialize()
+
+    def initialize(self):
+        """Open the pack index and create its schema."""
+        try:
+            self.conn = sqlite3.connect(os.path.join(self.root, 'pack_index.db'), check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS pack_index (
+                    key TEXT PRIMARY KEY,
+                    hash TEXT,
+                    segment INTEGER NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    ts REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_pack_index_segment ON pack_index(segment);
+                CREATE INDEX IF NOT EXISTS idx_pack_index_ts ON pack_index(ts);
+
+                CREATE TABLE IF NOT EXISTS pack_segments (
+                    id INTEGER PRIMARY KEY,
+                    bytes INTEGER NOT NULL DEFAULT 0,
+                    live_bytes INTEGER NOT NULL DEFAULT 0,
+                    sealed INTEGER NOT NULL DEFAULT 0
+                );
+            """)
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error initializing pack store: {e}")
+            raise
+
+    # Locators
+
+    def locator(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _key(self, locator: str) -> Optional[str]:
+        locator = str(locator)
+        if not locator.startswith(self.SCHEME):
+            return None
+        # A bare pack://<key> is read as a key of this store
+        return locator[len(self.SCHEME):].rsplit('/', 1)[-1]
+
+    def _foreign(self, locator: str) -> Optional['PackStore']:
+        """The shared store of another root, if `locator` lives there."""
+        locator = str(locator)
+        if not locator.startswith(self.SCHEME):
+            return None
+        rest = locator[len(self.SCHEME):]
+        if '/' not in rest:
+            return None
+        # Roots nest (a per-user root inside the shared one), so compare exactly
+        root = rest.rsplit('/', 1)[0]
+        return None if root == self.root_id else get_pack_store(root, self.segment_bytes)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.root, f"segment_{segment:06d}.pack")
+
+    # Writes
+
+    def put(self, data: bytes, ext: str = '.jpg') -> Tuple[str, str, bool]:
+        """Store `data` under its SHA-256, returning (locator, digest, duplicate)."""
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{digest}{ext}"
+        with self._lock:
+            if self._row(key) is not None:
+                logger.debug(f"Duplicate screenshot content {digest[:12]}, reusing {self.locator(key)}")
+                return self.locator(key), digest, True
+            self._append(key, data, digest)
+        return self.locator(key), digest, False
+
+    def put_at(self, locator: str, data: bytes) -> int:
+        """Write `data` at an explicit locator (thumbnails, re-encodes), returning its size."""
+        other = self._foreign(locator)
+        if other is not None:
+            return other.put_at(locator, data)
+        key = self._key(locator)
+        if key is None:
+            with open(locator, 'wb') as f:
+                f.write(data)
+            return len(data)
+        self._append(key, data, None)
+        return len(data)
+
+    def _append(self, key: str, data: bytes, digest: Optional[str]):
+        key_bytes = key.encode('utf-8')
+        record = _HEADER.pack(_MAGIC, len(key_bytes), len(data)) + key_bytes
+        with self._lock:
+            active = self._writer(len(record) + len(data))
+            active.seek(0, os.SEEK_END)
+            offset = active.tell() + len(record)
+            active.write(record)
+            active.write(data)
+            active.flush()
+            with self.conn:
+                old = self._row(key)
+                if old is not None:
+                    self.conn.execute(
+                        "UPDATE pack_segments SET live_bytes = live_bytes - ? WHERE id = ?",
+                        (old['length'], old['segment'])
+                    )
+                self.conn.execute("""
+                    INSERT OR REPLACE INTO pack_index (key, hash, segment, offset, length, ts)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (key, digest, self._active_id, offset, len(data), time.time()))
+                self.conn.execute("""
+                    UPDATE pack_segments SET bytes = bytes + ?, live_bytes = live_bytes + ?
+                    WHERE id = ?
+                """, (len(record) + len(data), len(data), self._active_id))
+
+    def _writer(self, incoming: int):
+        """The active segment file, rolling over to a new one when it would overflow."""
+        if self._active is None:
+            row = self.conn.execute(
+                "SELECT id FROM pack_segments WHERE sealed = 0 ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._start_segment()
+            else:
+                self._active_id = row['id']
+                self._active = open(self._segment_path(self._active_id), 'ab')
+        elif self._active.tell() > 0 and self._active.tell() + incoming > self.segment_bytes:
+            self._start_segment()
+        return self._active
+
+    def _start_segment(self):
+        if self._active is not None:
+            self._active.close()
+            with self.conn:
+                self.conn.execute("UPDATE pack_segments SET sealed = 1 WHERE id = ?", (self._active_id,))
+        with self.conn:
+            cursor = self.conn.execute("INSERT INTO pack_segments (bytes, live_bytes) VALUES (0, 0)")
+        self._active_id = cursor.lastrowid
+        self._active = open(self._segment_path(self._active_id), 'ab')
+        logger.info(f"Started pack segment {self._active_id}")
+
+    # Reads
+
+    def _row(self, key: str) -> Optional[sqlite3.Row]:
+        return self.conn.execute(
+            "SELECT segment, offset, length FROM pack_index WHERE key = ?", (key,)
+        ).fetchone()
+
+    def _map(self, segment: int, needed: int) -> mmap.mmap:
+        """Cached read-only mmap of a segment, remapped when the segment has grown."""
+        mm = self._maps.get(segment)
+        if mm is None or len(mm) < needed:
+            if mm is not None:
+                mm.close()
+            with open(self._segment_path(segment), 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = mm
+        return mm
+
+    def read(self, locator: str) -> bytes:
+        other = self._foreign(locator)
+        if other is not None:
+            return other.read(locator)
+        key = self._key(locator)
+        if key is None:
+            with open(locator, 'rb') as f:
+                return f.read()
+        with self._lock:
+            row = self._row(key)
+            if row is None:
+                raise FileNotFoundError(locator)
+            offset, length = row['offset'], row['length']
+            return self._map(row['segment'], offset + length)[offset:offset + length]
+
+    def exists(self, locator: str) -> bool:
+        other = self._foreign(locator)
+        if other is not None:
+            return other.exists(locator)
+        key = self._key(locator)
+        if key is None:
+            return os.path.exists(locator)
+        return self._row(key) is not None
+
+    def size(self, locator: str) -> int:
+        other = self._foreign(locator)
+        if other is not None:
+            return other.size(locator)
+        key = self._key(locator)
+        if key is None:
+            return os.path.getsize(locator)
+        row = self._row(key)
+        if row is None:
+            raise FileNotFoundError(locator)
+        return row['length']
+
+    def entries(self) -> Dict[str, Tuple[int, float]]:
+        """Every live object as {locator: (bytes, timestamp)}."""
+        return {
+            self.locator(row['key']): (row['length'], row['ts'])
+            for row in self.conn.execute("SELECT key, length, ts FROM pack_index")
+        }
+
+    # Deletes and compaction
+
+    def delete(self, locator: str):
+        """Drop an object from the index; a sealed segment left empty is removed at once."""
+        other = self._foreign(locator)
+        if other is not None:
+            return other.delete(locator)
+        key = self._key(locator)
+        if key is None:
+            os.remove(locator)
+            return
+        with self._lock:
+            row = self._row(key)
+            if row is None:
+                raise FileNotFoundError(locator)
+            with self.conn:
+                self.conn.execute("DELETE FROM pack_index WHERE key = ?", (key,))
+                self.conn.execute(
+                    "UPDATE pack_segments SET live_bytes = live_bytes - ? WHERE id = ?",
+                    (row['length'], row['segment'])
+                )
+            segment = self.conn.execute(
+                "SELECT sealed, live_bytes FROM pack_segments WHERE id = ?", (row['segment'],)
+            ).fetchone()
+            if segment is not None and segment['sealed'] and segment['live_bytes'] <= 0:
+                self._drop_segment(row['segment'])
+
+    def _drop_segment(self, segment: int):
+        mm = self._maps.pop(segment, None)
+        if mm is not None:
+            mm.close()
+        with self.conn:
+            self.conn.execute("DELETE FROM pack_segments WHERE id = ?", (segment,))
+        try:
+            os.remove(self._segment_path(segment))
+        except FileNotFoundError:
+            pass
+        logger.info(f"Removed pack segment {segment}")
+
+    def compact(self, max_live_ratio: float = 0.5) -> Dict[str, int]:
+        """Rewrite sealed segments that are mostly dead space.
+
+        Live objects of every sealed segment whose live bytes are at most
+        `max_live_ratio` of its size are appended to the active segment, then
+        the old segment file is deleted.
+        """
+        stats = {'segments': 0, 'moved': 0, 'bytes_reclaimed': 0}
+        with self._lock:
+            sparse = self.conn.execute("""
+                SELECT id, bytes, live_bytes FROM pack_segments
+                WHERE sealed = 1 AND live_bytes <= bytes * ?
+                ORDER BY id
+            """, (max_live_ratio,)).fetchall()
+            for segment in sparse:
+                rows = self.conn.execute(
+                    "SELECT key, hash, offset, length FROM pack_index WHERE segment = ?",
+                    (segment['id'],)
+                ).fetchall()
+                for row in rows:
+                    offset, length = row['offset'], row['length']
+                    data = self._map(segment['id'], offset + length)[offset:offset + length]
+                    self._append(row['key'], data, row['hash'])
+                    stats['moved'] += 1
+                self._drop_segment(segment['id'])
+                stats['segments'] += 1
+                stats['bytes_reclaimed'] += segment['bytes'] - segment['live_bytes']
+        if stats['segments']:
+            logger.info(f"Compacted {stats['segments']} pack segments, "
+                        f"reclaimed {stats['bytes_reclaimed']} bytes")
+        return stats
+
+    def reconcile(self, catalog, owner: Optional[str] = None) -> Dict[str, int]:
+        """Bring the storage catalog's rows for this root in line with the pack index."""
+        return catalog.reconcile_entries(self.entries(), self.prefix, owner=owner, nested=False)
+
+    def disk_usage(self) -> int:
+        row = self.conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM pack_segments").fetchone()
+        return row[0]
+
+    def clear(self):
+        """Delete every segment and empty the index."""
+        with self._lock:
+            self._close_files()
+            with self.conn:
+                segments = [row['id'] for row in self.conn.execute("SELECT id FROM pack_segments")]
+                self.conn.execute("DELETE FROM pack_index")
+                self.conn.execute("DELETE FROM pack_segments")
+            for segment in segments:
+                try:
+                    os.remove(self._segment_path(segment))
+                except FileNotFoundError:
+                    pass
+
+    def _close_files(self):
+        for mm in self._maps.values():
+            mm.close()
+        self._maps.clear()
+        if self._active is not None:
+            self._active.close()
+            self._active = None
+            self._active_id = None
+
+    def close(self):
+        with _stores_lock:
+            if _stores.get(self.root_id) is self:
+                del _stores[self.root_id]
+        with self._lock:
+            self._close_files()
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+
+def root_id(root: str) -> str:
+    """Canonical form of a pack root as it appears in locators."""
+    return Path(os.path.abspath(root)).as_posix()
+
+_stores: Dict[str, PackStore] = {}
+_stores_lock = threading.Lock()
+
+def get_pack_store(root: str, segment_bytes: int = 64 * 1024 * 1024) -> PackStore:
+    """The pack store shared by every reader and writer of `root` in this process."""
+    key = root_id(root)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = PackStore(root, segment_bytes=segment_bytes)
+        return store
@@ -0,0 +1,167 @@
+import sys
+import time
+import logging
+import platform
+import subprocess
+import threading
+from typing import Dict, Optional, Tuple
+import psutil
+from .x11_window import get_x11_tracker
+
+if sys.platform == "win32":
+    try:
+        import win32gui
+        import win32process
+    except ImportError:
+        win32gui = win32process = None
+else:
+    win32gui = win32process = None
+
+logger = logging.getLogger(__name__)
+
+ProcessKey = Tuple[int, float]  # pid, create_time: a pid alone can be reused
+
+class _Entry:
+    __slots__ = ("process", "key", "name", "exe")
+
+    def __init__(self, process: psutil.Process, key: ProcessKey):
+        self.process = process
+        self.key = key
+        self.name = None
+        self.exe = None
+
+class ProcessCache:
+    """Long-lived psutil.Process handles, shared between collectors.
+
+    Entries are keyed by (pid, create_time), so a reused pid gets a fresh
+    entry instead of another process's name. Handing out the same Process
+    object on every poll is what makes `cpu_percent(interval=None)` useful:
+    psutil measures it against the previous call on that object, so a new
+    object per poll always reports 0.0. Static details (name, exe) are read
+    once per process. Exited processes are dropped incrementally by diffing
+    `psutil.pids()` at most every `refresh_interval` seconds; nothing here
+    iterates or stats the whole process table.
+    """
+
+    def __init__(self, refresh_interval: float = 5.0):
+        self.refresh_interval = refresh_interval
+        self._entries: Dict[int, _Entry] = {}
+        self._lock = threading.Lock()
+        self._last_refresh = time.monotonic()
+
+    def _entry(self, pid: int) -> Optional[_Entry]:
+        if not pid:
+            return None
+        self._maybe_refresh()
+        with self._lock:
+            entry = self._entries.get(pid)
+        try:
+            if entry is not None and entry.process.is_running():
+                return entry
+            # Unknown pid, or the pid now belongs to a different process
+            process = psutil.Process(pid)
+            entry = _Entry(process, (pid, process.create_time()))
+            process.cpu_percent(interval=None)  # prime the CPU counter
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            with self._lock:
+                self._entries.pop(pid, None)
+            return None
+        with self._lock:
+            self._entries[pid] = entry
+        return entry
+
+    def get(self, pid: int) -> Optional[psutil.Process]:
+        entry = self._entry(pid)
+        return entry.process if entry else None
+
+    def key(self, pid: int) -> Optional[ProcessKey]:
+        entry = self._entry(pid)
+        return entry.key if entry else None
+
+    def name(self, pid: int) -> Optional[str]:
+        entry = self._entry(pid)
+        if entry is None:
+            return None
+        if entry.name is None:
+            try:
+                entry.name = entry.process.name()
+            except psutil.Error:
+                return None
+        return entry.name
+
+    def cpu_percent(self, pid: int) -> float:
+        """CPU use since the previous call for this process (0.0 on the first)."""
+        entry = self._entry(pid)
+        if entry is None:
+            return 0.0
+        try:
+            return entry.process.cpu_percent(interval=None)
+        except psutil.Error:
+            return 0.0
+
+    def memory_rss(self, pid: int) -> int:
+        entry = self._entry(pid)
+        if entry is None:
+            return 0
+        try:
+            return entry.process.memory_info().rss
+        except psutil.Error:
+            return 0
+
+    def _maybe_refresh(self):
+        if time.monotonic() - self._last_refresh >= self.refresh_interval:
+            self.refresh()
+
+    def refresh(self):
+        """Drop entries whose pid no longer exists."""
+        self._last_refresh = time.monotonic()
+        try:
+            live = set(psutil.pids())
+        except Exception as e:
+            logger.error(f"Error listing processes: {e}")
+            return
+        with self._lock:
+            for pid in [pid for pid in self._entries if pid not in live]:
+                del self._entries[pid]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+_shared_cache = None
+
+def get_process_cache() -> ProcessCache:
+    """The process cache shared by all collectors."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ProcessCache()
+    return _shared_cache
+
+def foreground_pid() -> Optional[int]:
+    """Pid of the process owning the focused window, or None if unknown."""
+    try:
+        if win32gui is not None:
+            hwnd = win32gui.GetForegroundWindow()
+            if not hwnd:
+                return None
+            return win32process.GetWindowThreadProcessId(hwnd)[1] or None
+        system = platform.system()
+        if system == "Darwin":
+            from AppKit import NSWorkspace
+            app = NSWorkspace.sharedWorkspace().frontmostApplication()
+            return int(app.processIdentifier()) if app else None
+        if system == "Linux":
+            tracker = get_x11_tracker()
+            if tracker is not None:
+                return tracker.snapshot()["pid"]
+            win_id = subprocess.check_output(
+                ['xprop', '-root', '_NET_ACTIVE_WINDOW'], timeout=2
+            ).decode().strip().split()[-1]
+            if win_id in ('0x0', '0'):
+                return None
+            pid_line = subprocess.check_output(
+                ['xprop', '-id', win_id, '_NET_WM_PID'], timeout=2
+            ).decode()
+            return int(pid_line.split()[-1])
+    except Exception as e:
+        logger.debug(f"Could not determine foreground process: {e}")
+    return None
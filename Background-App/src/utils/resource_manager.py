@@ -1,12 +1,16 @@
 import os
+import io
+import time
 import logging
 import asyncio
 from datetime import datetime, timedelta
 from PIL import Image
-import shutil
-from typing import Optional
-import aiofiles
-import aiofiles.os
+from typing import Dict, Optional, Sequence
+from .thumbnails import encode_thumbnails, thumbnail_path
+from .content_store import open_screenshot_store
+from .storage_catalog import StorageCatalog
+from .eviction import EvictionEngine, downscale_bytes
+from .config import EVICTION_HIGH_WATER_RATIO, EVICTION_TARGET_RATIO, EVICTION_CRITICAL_RATIO
 
 logger = logging.getLogger(__name__)
 
@@ -15,13 +19,34 @@ class ResourceManager:
                  base_dir: str,
                  max_storage_mb: int = 1000,  # 1GB default
                  max_file_age_days: int = 7,
-                 compression_quality: int = 60):
+                 compression_quality: int = 60,
+                 thumbnail_sizes: Sequence[int] = (480, 160),
+                 thumbnail_quality: int = 50,
+                 catalog: Optional[StorageCatalog] = None,
+                 reconcile_interval: int = 24 * 3600,
+                 backend: str = 'files',
+                 pack_segment_mb: int = 64):
         self.base_dir = base_dir
         self.screenshots_dir = os.path.join(base_dir, 'screenshots')
         self.max_storage_bytes = max_storage_mb * 1024 * 1024
         self.max_file_age = timedelta(days=max_file_age_days)
         self.compression_quality = compression_quality
+        self.thumbnail_sizes = tuple(thumbnail_sizes)
+        self.thumbnail_quality = thumbnail_quality
         self._setup_directories()
+        self.catalog = catalog or StorageCatalog(os.path.join(base_dir, 'storage_catalog.db'))
+        # 'files' keeps one sharded file per object, 'pack' appends into segment files;
+        # everything below talks to the store through the same locator interface
+        self.store = open_screenshot_store(self.screenshots_dir, backend,
+                                           segment_bytes=pack_segment_mb * 1024 * 1024)
+        # Unsynced screenshots are only evicted past the critical ratio, which
+        # sits above the high-water mark that starts a normal pass
+        self.eviction = EvictionEngine(self.catalog,
+                                       critical_ratio=EVICTION_CRITICAL_RATIO,
+                                       remover=self.store.delete,
+                                       downscaler=self._downscale)
+        self.reconcile_interval = reconcile_interval
+        self._last_reconcile = 0.0
 
     def _setup_directories(self):
         """Create necessary directories if they don't exist."""
@@ -31,89 +56,112 @@ class ResourceManager:
                             screenshot: Image.Image, 
                             user_id: str) -> Optional[str]:
         """Save and compress a screenshot, returning the file path if successful."""
-        try:
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{user_id}_{timestamp}.jpg"  # Using jpg for better compression
-            filepath = os.path.join(self.screenshots_dir, filename)
+        saved = await self.save_screenshot_with_thumbnails(screenshot, user_id)
+        return saved['path'] if saved else None
+
+    async def save_screenshot_with_thumbnails(self,
+                                              screenshot: Image.Image,
+                                              user_id: str) -> Optional[Dict]:
+        """Save a screenshot plus its thumbnails from the same decoded frame.
 
-            # Compress and save the image
+        Objects are content-addressed, so an identical frame is detected and
+        reused instead of written again. Returns {'path', 'thumbnails',
+        'content_hash', 'duplicate'} or None on failure.
+        """
+        try:
+            # Compress the image in memory; its hash decides where it lives
             compressed = screenshot.convert('RGB')  # Convert to RGB for JPEG
-            compressed.save(filepath, 
+            buffer = io.BytesIO()
+            compressed.save(buffer, 
                           'JPEG', 
                           quality=self.compression_quality, 
                           optimize=True)
+            data = buffer.getvalue()
+            filepath, digest, duplicate = self.store.put(data, '.jpg')
+            captured_at = time.time()
+
+            if duplicate:
+                # Identical frame already stored: reuse it and its thumbnails
+                thumbnails = {size: thumbnail_path(filepath, size) for size in self.thumbnail_sizes
+                              if self.store.exists(thumbnail_path(filepath, size))}
+                entry = self.catalog.get(filepath)
+                if entry is None:
+                    self.catalog.add(filepath, len(data), captured_at, file_hash=digest)
+                elif entry['downscaled']:
+                    # Eviction re-encoded the stored object; put this frame's bytes back
+                    self.catalog.restore(filepath, self.store.put_at(filepath, data), digest, captured_at)
+                    duplicate = False
+                else:
+                    # The object now backs a newer, unsynced row: keep it from ageing out
+                    self.catalog.touch(filepath, captured_at)
+                if duplicate:
+                    logger.info(f"Screenshot for {user_id} duplicates {digest[:12]}, not stored again")
+            else:
+                self.catalog.add(filepath, len(data), captured_at, file_hash=digest)
+                thumbnails = {}
+                encoded = encode_thumbnails(compressed, self.thumbnail_sizes, quality=self.thumbnail_quality)
+                for size, thumb_data in encoded.items():
+                    thumb_path = thumbnail_path(filepath, size)
+                    self.store.put_at(thumb_path, thumb_data)
+                    self.catalog.add(thumb_path, len(thumb_data), captured_at, parent_path=filepath)
+                    thumbnails[size] = thumb_path
 
             # Check if we need to clean up old files
             await self._cleanup_if_needed()
 
-            return filepath
+            return {'path': filepath, 'thumbnails': thumbnails,
+                    'content_hash': digest, 'duplicate': duplicate}
         except Exception as e:
             logger.error(f"Error saving screenshot: {e}")
             return None
 
     async def _cleanup_if_needed(self):
-        """Check storage usage and clean up old files if necessary."""
+        """Evict down to the target once the catalog total passes the high-water mark, synced first."""
         try:
-            total_size = 0
-            files_info = []
-
-            # Get all files and their info
-            async for entry in aiofiles.os.scandir(self.screenshots_dir):
-                if entry.is_file():
-                    stats = await aiofiles.os.stat(entry.path)
-                    total_size += stats.st_size
-                    files_info.append({
-                        'path': entry.path,
-                        'size': stats.st_size,
-                        'mtime': stats.st_mtime
-                    })
-
-            # If we're over the limit, start cleaning up
-            if total_size > self.max_storage_bytes:
-                # Sort files by modification time (oldest first)
-                files_info.sort(key=lambda x: x['mtime'])
-                
-                # Remove files until we're under the limit
-                for file_info in files_info:
-                    if total_size <= self.max_storage_bytes:
-                        break
-                    try:
-                        await aiofiles.os.remove(file_info['path'])
-                        total_size -= file_info['size']
-                        logger.info(f"Removed old file: {file_info['path']}")
-                    except Exception as e:
-                        logger.error(f"Error removing file {file_info['path']}: {e}")
-
+            if self.catalog.total_bytes() > self.max_storage_bytes * EVICTION_HIGH_WATER_RATIO:
+                self.eviction.enforce(max_bytes=self.max_storage_bytes,
+                                      target_bytes=int(self.max_storage_bytes * EVICTION_TARGET_RATIO))
         except Exception as e:
             logger.error(f"Error in cleanup: {e}")
 
+    def _downscale(self, path: str, scale: float) -> int:
+        """Shrink a stored screenshot in place for the eviction engine."""
+        return self.store.put_at(path, downscale_bytes(self.store.read(path), scale,
+                                                      self.compression_quality))
+
+    async def remove_file(self, path: str):
+        """Delete a screenshot and its thumbnails from disk and the catalog."""
+        for removed in self.catalog.remove(path):
+            try:
+                await asyncio.to_thread(self.store.delete, removed)
+                logger.info(f"Removed old file: {removed}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"Error removing file {removed}: {e}")
+
     async def cleanup_old_files(self):
         """Remove files older than max_file_age."""
         try:
-            cutoff_time = datetime.now() - self.max_file_age
-            async for entry in aiofiles.os.scandir(self.screenshots_dir):
-                if entry.is_file():
-                    stats = await aiofiles.os.stat(entry.path)
-                    if datetime.fromtimestamp(stats.st_mtime) < cutoff_time:
-                        try:
-                            await aiofiles.os.remove(entry.path)
-                            logger.info(f"Removed expired file: {entry.path}")
-                        except Exception as e:
-                            logger.error(f"Error removing expired file {entry.path}: {e}")
+            if time.time() - self._last_reconcile >= self.reconcile_interval:
+                await self.reconcile()
+
+            cutoff_time = (datetime.now() - self.max_file_age).timestamp()
+            for entry in self.catalog.older_than(cutoff_time):
+                await self.remove_file(entry['path'])
+            await asyncio.to_thread(self.store.compact)
         except Exception as e:
             logger.error(f"Error in old file cleanup: {e}")
 
+    async def reconcile(self) -> dict:
+        """Repair catalog drift against the screenshot store."""
+        stats = await asyncio.to_thread(self.store.reconcile, self.catalog)
+        self._last_reconcile = time.time()
+        return stats
+
     def get_storage_stats(self) -> dict:
         """Get current storage statistics."""
-        total_size = 0
-        file_count = 0
-        
-        for root, _, files in os.walk(self.screenshots_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                total_size += os.path.getsize(file_path)
-                file_count += 1
+        total_size, file_count = self.catalog.totals()
 
         return {
             'total_size_mb': total_size / (1024 * 1024),
@@ -124,8 +172,8 @@ class ResourceManager:
     async def clear_all(self):
         """Clear all stored resources."""
         try:
-            shutil.rmtree(self.screenshots_dir)
-            self._setup_directories()
+            self.store.clear()
+            self.catalog.clear()
             logger.info("All resources cleared successfully")
         except Exception as e:
             logger.error(f"Error clearing resources: {e}")
@@ -0,0 +1,187 @@
+import os
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import psutil
+from .collector_scheduler import Collector
+from .config import RESOURCE_RING_SIZE, RESOURCE_TOP_N, RESOURCE_TOP_EVERY
+
+logger = logging.getLogger(__name__)
+
+class _ProcReader:
+    """System CPU and memory straight from /proc, through file descriptors kept open."""
+
+    def __init__(self):
+        self._stat = os.open("/proc/stat", os.O_RDONLY)
+        self._meminfo = os.open("/proc/meminfo", os.O_RDONLY)
+        self._prev: Optional[Tuple[int, int]] = None
+
+    def cpu_percent(self) -> float:
+        fields = os.pread(self._stat, 256, 0).split(b"\n", 1)[0].split()[1:]
+        ticks = [int(f) for f in fields]
+        total = sum(ticks[:8])            # guest time is already counted in user/nice
+        idle = ticks[3] + ticks[4]        # idle + iowait
+        prev, self._prev = self._prev, (total, idle)
+        if prev is None or total == prev[0]:
+            return 0.0
+        return 100.0 * (1.0 - (idle - prev[1]) / (total - prev[0]))
+
+    def memory_percent(self) -> float:
+        values = {}
+        for line in os.pread(self._meminfo, 512, 0).split(b"\n"):
+            key, _, rest = line.partition(b":")
+            if key in (b"MemTotal", b"MemAvailable"):
+                values[key] = int(rest.split()[0])
+                if len(values) == 2:
+                    break
+        return 100.0 * (1.0 - values[b"MemAvailable"] / values[b"MemTotal"])
+
+    def close(self):
+        os.close(self._stat)
+        os.close(self._meminfo)
+
+class _PsutilReader:
+    """The same numbers from psutil where there is no /proc."""
+
+    def __init__(self):
+        psutil.cpu_percent(interval=None)  # prime: the first call always returns 0.0
+
+    def cpu_percent(self) -> float:
+        return psutil.cpu_percent(interval=None)
+
+    def memory_percent(self) -> float:
+        return psutil.virtual_memory().percent
+
+    def close(self):
+        pass
+
+class ResourceSampler(Collector):
+    """System and top-process CPU/memory, sampled into a fixed-size ring.
+
+    Every tick reads system CPU and memory (two preads of /proc on Linux,
+    psutil elsewhere) into preallocated NumPy arrays holding the last
+    `capacity` samples, so memory use never grows. Every `top_every`-th
+    tick also walks the process table through psutil's cached
+    process_iter and keeps the `top_n` processes by CPU. `window()`
+    aggregates any time range of the ring for an activity rollup.
+    """
+
+    name = "resources"
+
+    def __init__(self, capacity: int = RESOURCE_RING_SIZE, top_n: int = RESOURCE_TOP_N,
+                 top_every: int = RESOURCE_TOP_EVERY):
+        self.capacity = capacity
+        self.top_n = top_n
+        self.top_every = top_every
+        self.timestamps = np.full(capacity, np.nan)
+        self.cpu = np.zeros(capacity, dtype=np.float32)
+        self.memory = np.zeros(capacity, dtype=np.float32)
+        self.top_pids = np.zeros((capacity, top_n), dtype=np.int32)
+        self.top_cpu = np.full((capacity, top_n), np.nan, dtype=np.float32)
+        self.top_memory = np.full((capacity, top_n), np.nan, dtype=np.float32)
+        self.names: Dict[int, str] = {}
+        self.head = 0
+        self.samples = 0
+        self.lock = threading.Lock()
+        self._reader = _ProcReader() if os.path.exists("/proc/stat") else _PsutilReader()
+
+    def tick(self, now: float) -> None:
+        self.sample(now)
+
+    def sample(self, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        cpu = self._reader.cpu_percent()
+        memory = self._reader.memory_percent()
+        top = self._top_processes() if self.samples % self.top_every == 0 else None
+        with self.lock:
+            i = self.head
+            self.timestamps[i] = now
+            self.cpu[i] = cpu
+            self.memory[i] = memory
+            self.top_cpu[i] = np.nan
+            self.top_memory[i] = np.nan
+            if top:
+                n = len(top)
+                self.top_pids[i, :n] = [pid for pid, _, _ in top]
+                self.top_cpu[i, :n] = [c for _, c, _ in top]
+                self.top_memory[i, :n] = [m for _, _, m in top]
+            self.head = (i + 1) % self.capacity
+            self.samples += 1
+
+    def _top_processes(self) -> List[Tuple[int, float, float]]:
+        rows = []
+        # process_iter reuses its Process objects, so cpu_percent is measured since the last walk
+        for proc in psutil.process_iter(["name", "cpu_percent", "memory_percent"]):
+            info = proc.info
+            if info["cpu_percent"] is None:
+                continue
+            rows.append((proc.pid, info["cpu_percent"], info["memory_percent"] or 0.0, info["name"]))
+        rows.sort(key=lambda row: row[1], reverse=True)
+        top = rows[:self.top_n]
+        if len(self.names) > 4 * self.capacity * self.top_n:
+            # Forget processes that have rotated out of the ring
+            with self.lock:
+                live = set(self.top_pids[~np.isnan(self.top_cpu)].tolist())
+            self.names = {pid: name for pid, name in self.names.items() if pid in live}
+        for pid, _, _, name in top:
+            self.names[pid] = name
+        return [(pid, cpu, memory) for pid, cpu, memory, _ in top]
+
+    def latest(self) -> Optional[Dict]:
+        with self.lock:
+            if not self.samples:
+                return None
+            i = (self.head - 1) % self.capacity
+            return {"timestamp": float(self.timestamps[i]),
+                    "cpu_percent": float(self.cpu[i]),
+                    "memory_percent": float(self.memory[i])}
+
+    def window(self, start: float, end: Optional[float] = None) -> Dict:
+        """Aggregates of the samples taken in [start, end]."""
+        end = time.time() if end is None else end
+        with self.lock:
+            mask = (self.timestamps >= start) & (self.timestamps <= end)
+            cpu = self.cpu[mask]
+            memory = self.memory[mask]
+            top_rows = mask & ~np.isnan(self.top_cpu[:, 0])
+            pids = self.top_pids[top_rows].ravel()
+            top_cpu = self.top_cpu[top_rows].ravel()
+            top_memory = self.top_memory[top_rows].ravel()
+        if not cpu.size:
+            return {"samples": 0, "cpu_percent": 0.0, "cpu_max": 0.0,
+                    "memory_percent": 0.0, "memory_max": 0.0, "top_processes": []}
+        return {
+            "samples": int(cpu.size),
+            "cpu_percent": round(float(cpu.mean()), 1),
+            "cpu_max": round(float(cpu.max()), 1),
+            "memory_percent": round(float(memory.mean()), 1),
+            "memory_max": round(float(memory.max()), 1),
+            "top_processes": self._rank(pids, top_cpu, top_memory, int(top_rows.sum()))
+        }
+
+    def _rank(self, pids: np.ndarray, cpu: np.ndarray, memory: np.ndarray, snapshots: int) -> List[Dict]:
+        """Mean CPU/memory per process over the snapshots in a window, a process absent from one counting as 0."""
+        valid = ~np.isnan(cpu)
+        if not snapshots or not valid.any():
+            return []
+        unique, inverse = np.unique(pids[valid], return_inverse=True)
+        cpu_mean = np.bincount(inverse, weights=cpu[valid]) / snapshots
+        memory_mean = np.bincount(inverse, weights=memory[valid]) / snapshots
+        order = np.argsort(cpu_mean)[::-1][:self.top_n]
+        return [{"pid": int(unique[k]), "name": self.names.get(int(unique[k])),
+                 "cpu_percent": round(float(cpu_mean[k]), 1),
+                 "memory_percent": round(float(memory_mean[k]), 1)} for k in order]
+
+    def close(self):
+        self._reader.close()
+
+_shared_sampler = None
+
+def get_resource_sampler() -> ResourceSampler:
+    """The resource sampler shared by all collectors; schedule it every RESOURCE_SAMPLE_INTERVAL."""
+    global _shared_sampler
+    if _shared_sampler is None:
+        _shared_sampler = ResourceSampler()
+    return _shared_sampler
@@ -0,0 +1,153 @@
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class SessionBuilder:
+    """Merges focus observations into app sessions as they arrive.
+
+    Consecutive observations of the same (app, title) extend the open
+    session; a different window or `observe_idle()` closes it. Only closed
+    sessions are handed to `on_close`, plus the open one to
+    `on_checkpoint` at most every `checkpoint_interval` seconds, so a
+    crash loses no more than that, while the number of rows written is
+    roughly the number of context switches rather than one per poll.
+    Closed sessions are also returned by `observe()` and `close()`.
+    Sessions shorter than `min_duration` (alt-tab flicker) are dropped.
+
+    A new title in the same app only starts a session once it has been
+    focused for `min_title_dwell` seconds; the new session then starts
+    when the title first appeared. Titles that flip back and forth
+    (tab hovering, transient dialogs) stay part of the open session.
+
+    With `classify(app, title)` every session is tagged with a category
+    when it opens, once per session rather than once per observation.
+    """
+
+    def __init__(self,
+                 on_close: Optional[Callable[[Dict], None]] = None,
+                 on_checkpoint: Optional[Callable[[Dict], None]] = None,
+                 checkpoint_interval: float = 300,
+                 min_duration: float = 0,
+                 min_title_dwell: float = 0,
+                 classify: Optional[Callable[[Optional[str], Optional[str]], str]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.on_close = on_close
+        self.on_checkpoint = on_checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.min_duration = min_duration
+        self.min_title_dwell = min_title_dwell
+        self.classify = classify
+        self.clock = clock
+        self.current: Optional[Dict] = None
+        self._checkpointed_at = None
+        self._pending = None  # (title, first seen) of a title change still within its dwell
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _iso(ts: float) -> str:
+        return datetime.fromtimestamp(ts).isoformat()
+
+    def observe(self, app_name: Optional[str], window_title: Optional[str],
+                now: Optional[float] = None) -> Optional[Dict]:
+        """Record that (app, title) is focused now; returns the session closed by a change, if any."""
+        now = self.clock() if now is None else now
+        closed = None
+        with self._lock:
+            session = self.current
+            start = now
+            if session is not None and not self._title_switch(session, app_name, window_title, now):
+                session["last_seen"] = now
+                session["observations"] += 1
+                checkpoint = (self.on_checkpoint is not None
+                              and now - self._checkpointed_at >= self.checkpoint_interval)
+                if checkpoint:
+                    self._checkpointed_at = now
+                    snapshot = self._render(session, now)
+            else:
+                checkpoint = False
+                if (self._pending is not None and self._pending[0] == window_title
+                        and session["app_name"] == app_name):
+                    start = self._pending[1]
+                self._pending = None
+                closed = self._close_locked(start)
+                if app_name or window_title:
+                    self.current = {"id": str(uuid.uuid4()), "app_name": app_name,
+                                    "window_title": window_title, "start": start,
+                                    "last_seen": now, "observations": 1,
+                                    "category": self._category(app_name, window_title)}
+                    self._checkpointed_at = now
+        if checkpoint:
+            self._emit(self.on_checkpoint, snapshot)
+        if closed:
+            self._emit(self.on_close, closed)
+        return closed
+
+    def _title_switch(self, session: Dict, app_name: Optional[str], window_title: Optional[str],
+                      now: float) -> bool:
+        """Whether this observation ends `session`, holding back title changes until they dwell."""
+        if session["app_name"] != app_name:
+            return True
+        if session["window_title"] == window_title:
+            self._pending = None
+            return False
+        if self.min_title_dwell <= 0:
+            return True
+        if self._pending is None or self._pending[0] != window_title:
+            self._pending = (window_title, now)
+        return now - self._pending[1] >= self.min_title_dwell
+
+    def _category(self, app_name: Optional[str], window_title: Optional[str]) -> Optional[str]:
+        if self.classify is None:
+            return None
+        try:
+            return self.classify(app_name, window_title)
+        except Exception as e:
+            logger.error(f"Error classifying {app_name}: {e}")
+            return None
+
+    def observe_idle(self, idle_since: Optional[float] = None) -> Optional[Dict]:
+        """Close the open session at `idle_since` (when input stopped), or now."""
+        return self.close(idle_since)
+
+    def close(self, end: Optional[float] = None) -> Optional[Dict]:
+        with self._lock:
+            closed = self._close_locked(self.clock() if end is None else end)
+        if closed:
+            self._emit(self.on_close, closed)
+        return closed
+
+    def _close_locked(self, end: float) -> Optional[Dict]:
+        session, self.current = self.current, None
+        self._pending = None
+        if session is None:
+            return None
+        end = max(session["start"], end)
+        if end - session["start"] < self.min_duration:
+            return None
+        return self._render(session, end)
+
+    def _render(self, session: Dict, end: float) -> Dict:
+        return {
+            "id": session["id"],
+            "app_name": session["app_name"],
+            "window_title": session["window_title"],
+            "category": session["category"],
+            "start_time": self._iso(session["start"]),
+            "end_time": self._iso(end),
+            "duration": int(round(end - session["start"])),
+            "observations": session["observations"]
+        }
+
+    @staticmethod
+    def _emit(callback: Optional[Callable[[Dict], None]], session: Dict):
+        if callback is None:
+            return
+        try:
+            callback(session)
+        except Exception as e:
+            logger.error(f"Error persisting app session {session['id']}: {e}")
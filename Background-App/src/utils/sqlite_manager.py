@@ -1,13 +1,62 @@
 import sqlite3
 import os
+import json
 from datetime import datetime
 import logging
+from .string_dictionary import StringDictionary, SCHEMA as STRINGS_SCHEMA
 
 logger = logging.getLogger(__name__)
 
+# Tables whose app_name / window_title are stored as ids into local_strings
+ACTIVITY_LOGS_TABLE = """
+    CREATE TABLE IF NOT EXISTS local_activity_logs (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        time_entry_id TEXT,
+        app_id INTEGER REFERENCES local_strings(id),
+        title_id INTEGER REFERENCES local_strings(id),
+        activity_type TEXT NOT NULL,
+        keystroke_count INTEGER DEFAULT 0,
+        mouse_events INTEGER DEFAULT 0,
+        idle_time INTEGER DEFAULT 0,
+        is_synced INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+# Columns sent to Supabase, in the layout the rows had before app and title
+# were moved into local_strings; app_id/title_id are local-only and never leave
+ACTIVITY_LOG_SYNC_COLUMNS = (
+    "id", "user_id", "time_entry_id", "app_name", "window_title", "activity_type",
+    "keystroke_count", "mouse_events", "idle_time", "is_synced", "created_at",
+)
+
+APP_SESSIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS local_app_sessions (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        time_entry_id TEXT,
+        app_id INTEGER REFERENCES local_strings(id),
+        title_id INTEGER REFERENCES local_strings(id),
+        start_time TEXT NOT NULL,
+        end_time TEXT NOT NULL,
+        duration INTEGER DEFAULT 0,
+        category TEXT,
+        is_open INTEGER DEFAULT 0,
+        is_synced INTEGER DEFAULT 0,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+APP_SESSION_SYNC_COLUMNS = (
+    "id", "user_id", "time_entry_id", "app_name", "window_title", "start_time", "end_time",
+    "duration", "category", "is_open", "is_synced", "created_at",
+)
+
 class SQLiteManager:
     def __init__(self, db_path="workmatrix.db"):
         self.db_path = db_path
+        self.strings = StringDictionary()
         self.initialize_db()
 
     def get_connection(self):
@@ -34,20 +83,15 @@ class SQLiteManager:
                         created_at TEXT DEFAULT CURRENT_TIMESTAMP
                     );
 
+                    -- Interned app names and window titles
+                    """ + STRINGS_SCHEMA + """
+
                     -- Local Activity Logs
-                    CREATE TABLE IF NOT EXISTS local_activity_logs (
-                        id TEXT PRIMARY KEY,
-                        user_id TEXT NOT NULL,
-                        time_entry_id TEXT,
-                        app_name TEXT NOT NULL,
-                        window_title TEXT,
-                        activity_type TEXT NOT NULL,
-                        keystroke_count INTEGER DEFAULT 0,
-                        mouse_events INTEGER DEFAULT 0,
-                        idle_time INTEGER DEFAULT 0,
-                        is_synced INTEGER DEFAULT 0,
-                        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                    );
+                    """ + ACTIVITY_LOGS_TABLE + """
+
+                    -- App sessions: one row per focused (app, title) stretch;
+                    -- is_open rows are checkpoints of the session still in progress
+                    """ + APP_SESSIONS_TABLE + """
 
                     -- Local Screenshots
                     CREATE TABLE IF NOT EXISTS local_screenshots (
@@ -56,10 +100,32 @@ class SQLiteManager:
                         time_entry_id TEXT,
                         local_file_path TEXT NOT NULL,
                         storage_path TEXT,
+                        thumbnail_paths TEXT,
+                        thumbnail_storage_paths TEXT,
+                        content_hash TEXT,
                         is_synced INTEGER DEFAULT 0,
                         created_at TEXT DEFAULT CURRENT_TIMESTAMP
                     );
 
+                    -- Recording segments waiting for (resumable) upload
+                    CREATE TABLE IF NOT EXISTS local_upload_queue (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id TEXT NOT NULL,
+                        recording_id TEXT,
+                        local_file_path TEXT NOT NULL,
+                        object_path TEXT NOT NULL,
+                        content_type TEXT DEFAULT 'video/mp4',
+                        total_bytes INTEGER NOT NULL,
+                        uploaded_bytes INTEGER DEFAULT 0,
+                        upload_url TEXT,
+                        duration REAL,
+                        captured_at TEXT,
+                        status TEXT DEFAULT 'pending',
+                        attempts INTEGER DEFAULT 0,
+                        last_error TEXT,
+                        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    );
+
                     -- Local Settings
                     CREATE TABLE IF NOT EXISTS local_settings (
                         key TEXT PRIMARY KEY,
@@ -67,20 +133,87 @@ class SQLiteManager:
                         updated_at TEXT DEFAULT CURRENT_TIMESTAMP
                     );
 
+                """)
+                migrated = self._migrate_tables(cursor)
+                cursor.executescript("""
+                    -- Rows with app/title expanded back to text, for sync and reports
+                    CREATE VIEW IF NOT EXISTS local_activity_logs_expanded AS
+                        SELECT l.*, a.value AS app_name, t.value AS window_title
+                        FROM local_activity_logs l
+                        LEFT JOIN local_strings a ON a.id = l.app_id
+                        LEFT JOIN local_strings t ON t.id = l.title_id;
+                    CREATE VIEW IF NOT EXISTS local_app_sessions_expanded AS
+                        SELECT s.*, a.value AS app_name, t.value AS window_title
+                        FROM local_app_sessions s
+                        LEFT JOIN local_strings a ON a.id = s.app_id
+                        LEFT JOIN local_strings t ON t.id = s.title_id;
+
                     -- Create indexes for better performance
                     CREATE INDEX IF NOT EXISTS idx_time_entries_user_id ON local_time_entries(user_id);
                     CREATE INDEX IF NOT EXISTS idx_time_entries_sync ON local_time_entries(is_synced);
                     CREATE INDEX IF NOT EXISTS idx_activity_logs_user_id ON local_activity_logs(user_id);
                     CREATE INDEX IF NOT EXISTS idx_activity_logs_sync ON local_activity_logs(is_synced);
+                    CREATE INDEX IF NOT EXISTS idx_app_sessions_user_start ON local_app_sessions(user_id, start_time);
+                    CREATE INDEX IF NOT EXISTS idx_app_sessions_sync ON local_app_sessions(is_synced);
+                    CREATE INDEX IF NOT EXISTS idx_app_sessions_app ON local_app_sessions(app_id);
                     CREATE INDEX IF NOT EXISTS idx_screenshots_user_id ON local_screenshots(user_id);
                     CREATE INDEX IF NOT EXISTS idx_screenshots_sync ON local_screenshots(is_synced);
+                    CREATE INDEX IF NOT EXISTS idx_screenshots_path ON local_screenshots(local_file_path);
+                    CREATE INDEX IF NOT EXISTS idx_upload_queue_status ON local_upload_queue(status, id);
                 """)
+                if migrated:
+                    # Give back the space the text columns used
+                    conn.commit()
+                    conn.execute("VACUUM")
                 
                 logger.info("Database initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
             raise
 
+    def _migrate_tables(self, cursor):
+        """Add columns introduced after a database was first created."""
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(local_screenshots)").fetchall()]
+        for col, sql in [
+            ("thumbnail_paths", "ALTER TABLE local_screenshots ADD COLUMN thumbnail_paths TEXT"),
+            ("thumbnail_storage_paths", "ALTER TABLE local_screenshots ADD COLUMN thumbnail_storage_paths TEXT"),
+            ("content_hash", "ALTER TABLE local_screenshots ADD COLUMN content_hash TEXT"),
+        ]:
+            if col not in columns:
+                cursor.execute(sql)
+
+        migrated = False
+        for table, ddl in [("local_activity_logs", ACTIVITY_LOGS_TABLE),
+                           ("local_app_sessions", APP_SESSIONS_TABLE)]:
+            migrated |= self._migrate_string_columns(cursor, table, ddl)
+
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(local_app_sessions)").fetchall()]
+        if "category" not in columns:
+            cursor.execute("ALTER TABLE local_app_sessions ADD COLUMN category TEXT")
+        return migrated
+
+    def _migrate_string_columns(self, cursor, table, ddl):
+        """Rebuild a table that still stores app_name/window_title as text."""
+        columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()]
+        if "app_name" not in columns:
+            return False
+        logger.info(f"Migrating {table} to interned app/title ids")
+        kept = [c for c in columns if c not in ("app_name", "window_title")]
+        cursor.executescript(f"""
+            INSERT OR IGNORE INTO local_strings (value)
+                SELECT app_name FROM {table} WHERE app_name IS NOT NULL
+                UNION SELECT window_title FROM {table} WHERE window_title IS NOT NULL;
+            ALTER TABLE {table} RENAME TO {table}_old;
+            {ddl}
+            INSERT INTO {table} ({", ".join(kept)}, app_id, title_id)
+                SELECT {", ".join("o." + c for c in kept)},
+                       (SELECT id FROM local_strings WHERE value = o.app_name),
+                       (SELECT id FROM local_strings WHERE value = o.window_title)
+                FROM {table}_old o;
+            DROP TABLE {table}_old;
+        """)
+        return True
+
     def insert_time_entry(self, user_id, task_id=None):
         """Insert a new time entry."""
         try:
@@ -120,32 +253,254 @@ class SQLiteManager:
                 log_id = f"al_{datetime.now().timestamp()}"
                 cursor.execute("""
                     INSERT INTO local_activity_logs 
-                    (id, user_id, time_entry_id, app_name, window_title, 
+                    (id, user_id, time_entry_id, app_id, title_id, 
                      activity_type, keystroke_count, mouse_events, idle_time)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (log_id, user_id, time_entry_id, app_name, window_title, 
+                """, (log_id, user_id, time_entry_id, self.strings.intern(conn, app_name),
+                      self.strings.intern(conn, window_title),
                       activity_type, keystroke_count, mouse_events, idle_time))
                 return log_id
         except Exception as e:
             logger.error(f"Error inserting activity log: {e}")
             raise
 
-    def insert_screenshot(self, user_id, time_entry_id, local_file_path):
-        """Insert a new screenshot record."""
+    def upsert_app_session(self, user_id, time_entry_id, session, is_open=False):
+        """Write a closed app session, or checkpoint (overwrite) the open one."""
+        try:
+            with self.get_connection() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO local_app_sessions
+                    (id, user_id, time_entry_id, app_id, title_id,
+                     start_time, end_time, duration, category, is_open)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (session['id'], user_id, time_entry_id,
+                      self.strings.intern(conn, session['app_name']),
+                      self.strings.intern(conn, session['window_title']),
+                      session['start_time'], session['end_time'],
+                      session['duration'], session.get('category'), 1 if is_open else 0))
+                return session['id']
+        except Exception as e:
+            logger.error(f"Error writing app session: {e}")
+            raise
+
+    def close_open_app_sessions(self, user_id):
+        """Close sessions left open by a crash at their last checkpoint."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE local_app_sessions SET is_open = 0
+                    WHERE user_id = ? AND is_open = 1
+                """, (user_id,))
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Error closing open app sessions: {e}")
+            raise
+
+    def get_app_usage_totals(self, user_id, start_time=None, end_time=None):
+        """Seconds per app from closed sessions, largest first."""
+        try:
+            with self.get_connection() as conn:
+                # Group on the integer id and only expand the (few) result rows
+                rows = conn.execute("""
+                    SELECT app_id, SUM(duration) AS total
+                    FROM local_app_sessions
+                    WHERE user_id = ? AND is_open = 0
+                      AND start_time >= COALESCE(?, start_time)
+                      AND start_time < COALESCE(?, '9999')
+                    GROUP BY app_id
+                    ORDER BY total DESC
+                """, (user_id, start_time, end_time)).fetchall()
+                return [(self.strings.lookup(conn, app_id), total) for app_id, total in rows]
+        except Exception as e:
+            logger.error(f"Error getting app usage totals: {e}")
+            raise
+
+    def get_category_totals(self, user_id, start_time=None, end_time=None):
+        """Seconds per category from closed sessions, largest first."""
+        try:
+            with self.get_connection() as conn:
+                return conn.execute("""
+                    SELECT COALESCE(category, 'uncategorized') AS category, SUM(duration) AS total
+                    FROM local_app_sessions
+                    WHERE user_id = ? AND is_open = 0
+                      AND start_time >= COALESCE(?, start_time)
+                      AND start_time < COALESCE(?, '9999')
+                    GROUP BY 1
+                    ORDER BY total DESC
+                """, (user_id, start_time, end_time)).fetchall()
+        except Exception as e:
+            logger.error(f"Error getting category totals: {e}")
+            raise
+
+    def insert_screenshot(self, user_id, time_entry_id, local_file_path, thumbnails=None,
+                          content_hash=None):
+        """Insert a new screenshot record.
+
+        `thumbnails` maps thumbnail size (px) to the local thumbnail path;
+        `content_hash` is the SHA-256 the file is stored under.
+        """
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 screenshot_id = f"ss_{datetime.now().timestamp()}"
+                thumbnail_paths = json.dumps({str(k): v for k, v in thumbnails.items()}) if thumbnails else None
                 cursor.execute("""
                     INSERT INTO local_screenshots 
-                    (id, user_id, time_entry_id, local_file_path)
-                    VALUES (?, ?, ?, ?)
-                """, (screenshot_id, user_id, time_entry_id, local_file_path))
+                    (id, user_id, time_entry_id, local_file_path, thumbnail_paths, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (screenshot_id, user_id, time_entry_id, local_file_path, thumbnail_paths,
+                      content_hash))
                 return screenshot_id
         except Exception as e:
             logger.error(f"Error inserting screenshot: {e}")
             raise
 
+    def get_unsynced_screenshots_for_user(self, user_id):
+        """Get unsynced screenshot records for a user, thumbnails decoded."""
+        try:
+            with self.get_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT * FROM local_screenshots
+                    WHERE user_id = ? AND is_synced = 0
+                    ORDER BY created_at
+                """, (user_id,))
+                records = []
+                for row in cursor.fetchall():
+                    record = dict(row)
+                    record['thumbnail_paths'] = {
+                        int(size): path
+                        for size, path in json.loads(record.get('thumbnail_paths') or '{}').items()
+                    }
+                    records.append(record)
+                return records
+        except Exception as e:
+            logger.error(f"Error getting unsynced screenshots: {e}")
+            raise
+
+    def count_unsynced_screenshot_refs(self, local_file_path):
+        """Number of unsynced screenshot rows backed by one stored object.
+
+        Identical frames are stored once, so several rows can share a file;
+        it may only be released locally once this reaches zero.
+        """
+        try:
+            with self.get_connection() as conn:
+                return conn.execute("""
+                    SELECT COUNT(*) FROM local_screenshots
+                    WHERE local_file_path = ? AND is_synced = 0
+                """, (local_file_path,)).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error counting screenshot references: {e}")
+            raise
+
+    def update_screenshot_sync_details(self, screenshot_id, storage_path, thumbnail_storage_paths=None):
+        """Record the remote storage paths of an uploaded screenshot and mark it synced."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                thumbnail_json = (json.dumps({str(k): v for k, v in thumbnail_storage_paths.items()})
+                                  if thumbnail_storage_paths else None)
+                cursor.execute("""
+                    UPDATE local_screenshots
+                    SET storage_path = ?, thumbnail_storage_paths = ?, is_synced = 1
+                    WHERE id = ?
+                """, (storage_path, thumbnail_json, screenshot_id))
+        except Exception as e:
+            logger.error(f"Error updating screenshot sync details: {e}")
+            raise
+
+    def delete_screenshot_record_and_file(self, screenshot_id, local_file_path):
+        """Delete a screenshot record along with its local file and thumbnails."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT thumbnail_paths FROM local_screenshots WHERE id = ?", (screenshot_id,))
+                row = cursor.fetchone()
+                paths = list(json.loads(row[0]).values()) if row and row[0] else []
+                if local_file_path:
+                    paths.append(local_file_path)
+                for path in paths:
+                    if os.path.exists(path):
+                        os.remove(path)
+                cursor.execute("DELETE FROM local_screenshots WHERE id = ?", (screenshot_id,))
+        except Exception as e:
+            logger.error(f"Error deleting screenshot record: {e}")
+            raise
+
+    def enqueue_upload(self, user_id, local_file_path, object_path, total_bytes,
+                       recording_id=None, duration=None, captured_at=None, content_type='video/mp4'):
+        """Queue a closed recording segment for upload."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO local_upload_queue
+                        (user_id, recording_id, local_file_path, object_path, content_type,
+                         total_bytes, duration, captured_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (user_id, recording_id, local_file_path, object_path, content_type,
+                      total_bytes, duration, captured_at))
+                return cursor.lastrowid
+        except Exception as e:
+            logger.error(f"Error queueing upload: {e}")
+            raise
+
+    def get_pending_uploads(self, user_id, max_attempts=10, limit=50):
+        """Uploads not yet acknowledged, oldest first."""
+        try:
+            with self.get_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT * FROM local_upload_queue
+                    WHERE user_id = ? AND status IN ('pending', 'uploading') AND attempts < ?
+                    ORDER BY id LIMIT ?
+                """, (user_id, max_attempts, limit))
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error getting pending uploads: {e}")
+            raise
+
+    def update_upload_progress(self, upload_id, upload_url, uploaded_bytes):
+        """Persist the resumable upload URL and acknowledged offset."""
+        try:
+            with self.get_connection() as conn:
+                conn.execute("""
+                    UPDATE local_upload_queue
+                    SET upload_url = ?, uploaded_bytes = ?, status = 'uploading'
+                    WHERE id = ?
+                """, (upload_url, uploaded_bytes, upload_id))
+        except Exception as e:
+            logger.error(f"Error updating upload progress: {e}")
+            raise
+
+    def complete_upload(self, upload_id):
+        try:
+            with self.get_connection() as conn:
+                conn.execute("""
+                    UPDATE local_upload_queue
+                    SET status = 'done', uploaded_bytes = total_bytes, last_error = NULL
+                    WHERE id = ?
+                """, (upload_id,))
+        except Exception as e:
+            logger.error(f"Error completing upload: {e}")
+            raise
+
+    def fail_upload_attempt(self, upload_id, error, final=False):
+        try:
+            with self.get_connection() as conn:
+                conn.execute("""
+                    UPDATE local_upload_queue
+                    SET attempts = attempts + 1, last_error = ?,
+                        status = CASE WHEN ? THEN 'failed' ELSE status END
+                    WHERE id = ?
+                """, (str(error)[:500], 1 if final else 0, upload_id))
+        except Exception as e:
+            logger.error(f"Error recording upload failure: {e}")
+            raise
+
     def get_unsynced_data(self):
         """Get all unsynced data for synchronization."""
         try:
@@ -157,17 +512,28 @@ class SQLiteManager:
                 time_entries = cursor.fetchall()
                 
                 # Get unsynced activity logs
-                cursor.execute("SELECT * FROM local_activity_logs WHERE is_synced = 0")
+                cursor.execute(f"""
+                    SELECT {', '.join(ACTIVITY_LOG_SYNC_COLUMNS)}
+                    FROM local_activity_logs_expanded WHERE is_synced = 0
+                """)
                 activity_logs = cursor.fetchall()
                 
                 # Get unsynced screenshots
                 cursor.execute("SELECT * FROM local_screenshots WHERE is_synced = 0")
                 screenshots = cursor.fetchall()
+
+                # Get unsynced closed app sessions (open ones are still changing)
+                cursor.execute(f"""
+                    SELECT {', '.join(APP_SESSION_SYNC_COLUMNS)}
+                    FROM local_app_sessions_expanded WHERE is_synced = 0 AND is_open = 0
+                """)
+                app_sessions = cursor.fetchall()
                 
                 return {
                     'time_entries': time_entries,
                     'activity_logs': activity_logs,
-                    'screenshots': screenshots
+                    'screenshots': screenshots,
+                    'app_sessions': app_sessions
                 }
         except Exception as e:
             logger.error(f"Error getting unsynced data: {e}")
@@ -0,0 +1,467 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class StorageCatalog:
+    """Indexed record of every stored screenshot file.
+
+    Files are registered as they are written and dropped as they are deleted,
+    so size checks, listings and eviction queries hit SQLite indexes instead of
+    walking the screenshot directory. Running totals are kept in a one-row
+    table maintained by triggers. Thumbnails are catalogued with
+    `parent_path` pointing at their full-size screenshot and are removed with it.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # One connection is shared by the event loop and worker threads
+        # (reconcile runs in asyncio.to_thread), so every use is serialized
+        self._lock = threading.RLock()
+        self.conn = None
+        self.initialize()
+
+    def initialize(self):
+        """Open the catalog database and create its schema."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS storage_catalog (
+                    path TEXT PRIMARY KEY,
+                    bytes INTEGER NOT NULL,
+                    captured_at REAL NOT NULL,
+                    synced INTEGER DEFAULT 0,
+                    hash TEXT,
+                    parent_path TEXT,
+                    downscaled INTEGER DEFAULT 0,
+                    thumb_bytes INTEGER DEFAULT 0,
+                    owner TEXT
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_catalog_captured_at ON storage_catalog(captured_at);
+                CREATE INDEX IF NOT EXISTS idx_catalog_sync ON storage_catalog(synced, captured_at);
+                CREATE INDEX IF NOT EXISTS idx_catalog_hash ON storage_catalog(hash);
+                CREATE INDEX IF NOT EXISTS idx_catalog_parent ON storage_catalog(parent_path);
+
+                CREATE TABLE IF NOT EXISTS storage_totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total_bytes INTEGER NOT NULL DEFAULT 0,
+                    file_count INTEGER NOT NULL DEFAULT 0
+                );
+                INSERT OR IGNORE INTO storage_totals (id, total_bytes, file_count) VALUES (1, 0, 0);
+
+                CREATE TRIGGER IF NOT EXISTS trg_catalog_insert AFTER INSERT ON storage_catalog
+                BEGIN
+                    UPDATE storage_totals
+                    SET total_bytes = total_bytes + NEW.bytes, file_count = file_count + 1
+                    WHERE id = 1;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_catalog_delete AFTER DELETE ON storage_catalog
+                BEGIN
+                    UPDATE storage_totals
+                    SET total_bytes = total_bytes - OLD.bytes, file_count = file_count - 1
+                    WHERE id = 1;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_catalog_resize AFTER UPDATE OF bytes ON storage_catalog
+                BEGIN
+                    UPDATE storage_totals
+                    SET total_bytes = total_bytes - OLD.bytes + NEW.bytes
+                    WHERE id = 1;
+                END;
+            """)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(storage_catalog)").fetchall()]
+            for col, sql in [
+                ("downscaled", "ALTER TABLE storage_catalog ADD COLUMN downscaled INTEGER DEFAULT 0"),
+                ("thumb_bytes", "ALTER TABLE storage_catalog ADD COLUMN thumb_bytes INTEGER DEFAULT 0"),
+                ("owner", "ALTER TABLE storage_catalog ADD COLUMN owner TEXT"),
+            ]:
+                if col not in columns:
+                    self.conn.execute(sql)
+            # Per-user listing and cleanup filter on the owner, which works for
+            # file paths and pack:// locators alike
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_catalog_owner ON storage_catalog(owner, captured_at)"
+            )
+            # Each screenshot row carries the size of its thumbnails so eviction
+            # planning never has to join parent and child rows
+            self.conn.executescript("""
+                CREATE TRIGGER IF NOT EXISTS trg_catalog_thumb_insert AFTER INSERT ON storage_catalog
+                WHEN NEW.parent_path IS NOT NULL
+                BEGIN
+                    UPDATE storage_catalog SET thumb_bytes = thumb_bytes + NEW.bytes
+                    WHERE path = NEW.parent_path;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_catalog_thumb_delete AFTER DELETE ON storage_catalog
+                WHEN OLD.parent_path IS NOT NULL
+                BEGIN
+                    UPDATE storage_catalog SET thumb_bytes = thumb_bytes - OLD.bytes
+                    WHERE path = OLD.parent_path;
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS trg_catalog_thumb_resize AFTER UPDATE OF bytes ON storage_catalog
+                WHEN NEW.parent_path IS NOT NULL
+                BEGIN
+                    UPDATE storage_catalog SET thumb_bytes = thumb_bytes - OLD.bytes + NEW.bytes
+                    WHERE path = NEW.parent_path;
+                END;
+            """)
+            self.conn.commit()
+        except Exception as e:
+            logger.error(f"Error initializing storage catalog: {e}")
+            raise
+
+    @staticmethod
+    def _norm(path: str) -> str:
+        path = str(path)
+        # Backend locators such as pack://<key> are already canonical
+        if '://' in path:
+            return path
+        return os.path.abspath(path)
+
+    def add(self,
+            path: str,
+            size: int,
+            captured_at: Optional[float] = None,
+            file_hash: Optional[str] = None,
+            synced: bool = False,
+            parent_path: Optional[str] = None,
+            owner: Optional[str] = None):
+        """Register (or update) a stored file."""
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO storage_catalog (path, bytes, captured_at, synced, hash, parent_path, owner)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    bytes = excluded.bytes,
+                    captured_at = excluded.captured_at,
+                    synced = excluded.synced,
+                    hash = excluded.hash,
+                    parent_path = excluded.parent_path,
+                    owner = COALESCE(excluded.owner, owner)
+            """, (
+                self._norm(path),
+                int(size),
+                captured_at if captured_at is not None else time.time(),
+                1 if synced else 0,
+                file_hash,
+                self._norm(parent_path) if parent_path else None,
+                owner
+            ))
+            self.conn.commit()
+
+    def remove(self, path: str) -> List[str]:
+        """Drop a file and its thumbnails from the catalog, returning every removed path."""
+        with self._lock:
+            path = self._norm(path)
+            rows = self.conn.execute(
+                "SELECT path FROM storage_catalog WHERE path = ? OR parent_path = ?",
+                (path, path)
+            ).fetchall()
+            self.conn.execute(
+                "DELETE FROM storage_catalog WHERE path = ? OR parent_path = ?",
+                (path, path)
+            )
+            self.conn.commit()
+            return [row['path'] for row in rows]
+
+    def resize(self, path: str, size: int):
+        """Record a new size for a file rewritten in place."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE storage_catalog SET bytes = ? WHERE path = ?",
+                (int(size), self._norm(path))
+            )
+            self.conn.commit()
+
+    def mark_downscaled(self, path: str, size: int):
+        """Record that a file was re-encoded smaller in place.
+
+        Its bytes no longer match the digest in its name, so the hash is
+        cleared and the object is not reused for identical frames.
+        """
+        with self._lock:
+            self.conn.execute(
+                "UPDATE storage_catalog SET bytes = ?, downscaled = 1, hash = NULL WHERE path = ?",
+                (int(size), self._norm(path))
+            )
+            self.conn.commit()
+
+    def restore(self, path: str, size: int, file_hash: str, captured_at: Optional[float] = None):
+        """Record that a downscaled file was rewritten with the original bytes of its digest."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE storage_catalog SET bytes = ?, downscaled = 0, hash = ? WHERE path = ?",
+                (int(size), file_hash, self._norm(path))
+            )
+            self.touch(path, captured_at)
+
+    def mark_synced(self, path: str, synced: bool = True):
+        """Flag a file (and its thumbnails) as uploaded."""
+        with self._lock:
+            path = self._norm(path)
+            self.conn.execute(
+                "UPDATE storage_catalog SET synced = ? WHERE path = ? OR parent_path = ?",
+                (1 if synced else 0, path, path)
+            )
+            self.conn.commit()
+
+    def touch(self, path: str, captured_at: Optional[float] = None):
+        """Record a new capture of an already stored file (and its thumbnails).
+
+        A duplicate frame is a fresh, not yet uploaded reference to the same
+        object, so it restarts the age clock and clears the synced flag.
+        """
+        with self._lock:
+            path = self._norm(path)
+            self.conn.execute(
+                "UPDATE storage_catalog SET captured_at = ?, synced = 0 WHERE path = ? OR parent_path = ?",
+                (captured_at if captured_at is not None else time.time(), path, path)
+            )
+            self.conn.commit()
+
+    def get(self, path: str) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM storage_catalog WHERE path = ?", (self._norm(path),)
+            ).fetchone()
+            return dict(row) if row else None
+
+    def find_by_hash(self, file_hash: str) -> Optional[Dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM storage_catalog WHERE hash = ? LIMIT 1", (file_hash,)
+            ).fetchone()
+            return dict(row) if row else None
+
+    def totals(self) -> Tuple[int, int]:
+        """Return (total_bytes, file_count) without touching the filesystem."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT total_bytes, file_count FROM storage_totals WHERE id = 1"
+            ).fetchone()
+            return row['total_bytes'], row['file_count']
+
+    def total_bytes(self) -> int:
+        return self.totals()[0]
+
+    def original_count(self) -> int:
+        """Number of full-size screenshots, thumbnails excluded."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM storage_catalog WHERE parent_path IS NULL"
+            ).fetchone()[0]
+
+    def candidates(self) -> List[Tuple[str, int, float, int, int, int]]:
+        """Every full-size screenshot as a plain tuple, for bulk eviction planning.
+
+        Rows are (path, bytes, captured_at, synced, downscaled, thumbnail_bytes).
+        """
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute("""
+                SELECT path, bytes, captured_at, synced, downscaled, thumb_bytes FROM storage_catalog
+                WHERE parent_path IS NULL
+            """).fetchall()
+
+    def recent(self, limit: int = 10, prefix: Optional[str] = None,
+               owner: Optional[str] = None) -> List[Dict]:
+        """Newest full-size screenshots first, optionally limited to a directory or an owner."""
+        with self._lock:
+            if owner is not None:
+                rows = self.conn.execute("""
+                    SELECT * FROM storage_catalog
+                    WHERE parent_path IS NULL AND owner = ?
+                    ORDER BY captured_at DESC LIMIT ?
+                """, (owner, limit)).fetchall()
+            elif prefix:
+                rows = self.conn.execute("""
+                    SELECT * FROM storage_catalog
+                    WHERE parent_path IS NULL AND path LIKE ? ESCAPE '\\'
+                    ORDER BY captured_at DESC LIMIT ?
+                """, (self._like_prefix(prefix), limit)).fetchall()
+            else:
+                rows = self.conn.execute("""
+                    SELECT * FROM storage_catalog
+                    WHERE parent_path IS NULL
+                    ORDER BY captured_at DESC LIMIT ?
+                """, (limit,)).fetchall()
+            return [dict(row) for row in rows]
+
+    def oldest(self, limit: int = 100, synced: Optional[bool] = None) -> List[Dict]:
+        """Oldest full-size screenshots first, optionally filtered by sync state."""
+        with self._lock:
+            if synced is None:
+                rows = self.conn.execute("""
+                    SELECT * FROM storage_catalog
+                    WHERE parent_path IS NULL
+                    ORDER BY captured_at LIMIT ?
+                """, (limit,)).fetchall()
+            else:
+                rows = self.conn.execute("""
+                    SELECT * FROM storage_catalog
+                    WHERE parent_path IS NULL AND synced = ?
+                    ORDER BY captured_at LIMIT ?
+                """, (1 if synced else 0, limit)).fetchall()
+            return [dict(row) for row in rows]
+
+    def older_than(self, cutoff: float, prefix: Optional[str] = None,
+                   owner: Optional[str] = None) -> List[Dict]:
+        """Full-size screenshots captured before `cutoff` (epoch seconds)."""
+        with self._lock:
+            if owner is not None:
+                rows = self.conn.execute("""
+                    SELECT * FROM storage_catalog
+                    WHERE parent_path IS NULL AND captured_at < ? AND owner = ?
+                    ORDER BY captured_at
+                """, (cutoff, owner)).fetchall()
+            elif prefix:
+                rows = self.conn.execute("""
+                    SELECT * FROM storage_catalog
+                    WHERE parent_path IS NULL AND captured_at < ? AND path LIKE ? ESCAPE '\\'
+                    ORDER BY captured_at
+                """, (cutoff, self._like_prefix(prefix))).fetchall()
+            else:
+                rows = self.conn.execute("""
+                    SELECT * FROM storage_catalog
+                    WHERE parent_path IS NULL AND captured_at < ?
+                    ORDER BY captured_at
+                """, (cutoff,)).fetchall()
+            return [dict(row) for row in rows]
+
+    def larger_than(self, size: int) -> List[Dict]:
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT * FROM storage_catalog
+                WHERE parent_path IS NULL AND bytes > ?
+            """, (int(size),)).fetchall()
+            return [dict(row) for row in rows]
+
+    def _like_prefix(self, prefix: str) -> str:
+        prefix = self._norm(prefix)
+        if '://' not in prefix:
+            prefix = prefix.rstrip(os.sep) + os.sep
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return escaped + '%'
+
+    def reconcile(self, root: str, thumbnail_marker: str = '_t',
+                  owner: Optional[str] = None) -> Dict[str, int]:
+        """Bring the catalog back in line with what is actually on disk.
+
+        Files missing from the catalog are added, rows whose file is gone are
+        dropped, changed sizes are corrected and the running totals are
+        recomputed from scratch. This is the only O(files) operation and is
+        meant to run rarely (startup, daily) to repair drift.
+        """
+        root = self._norm(root)
+        db_file = self._norm(self.db_path)
+        on_disk = {}
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            path = self._norm(entry.path)
+                            if path.startswith(db_file):
+                                continue
+                            st = entry.stat()
+                            on_disk[path] = (st.st_size, st.st_mtime)
+            except FileNotFoundError:
+                continue
+        return self.reconcile_entries(on_disk, root, thumbnail_marker, owner=owner)
+
+    def reconcile_entries(self,
+                          on_disk: Dict[str, Tuple[int, float]],
+                          prefix: str,
+                          thumbnail_marker: str = '_t',
+                          owner: Optional[str] = None,
+                          nested: bool = True) -> Dict[str, int]:
+        """Reconcile catalog rows under `prefix` against {path: (bytes, mtime)}.
+
+        Used directly by storage backends that keep their own index instead
+        of one file per object; those pass `nested=False` so rows of another
+        root below `prefix` are left alone. With `owner`, listed entries
+        without an owner are attributed to it.
+        """
+        with self._lock:
+            stats = {'added': 0, 'removed': 0, 'resized': 0}
+
+            known = {
+                row['path']: row['bytes']
+                for row in self.conn.execute(
+                    "SELECT path, bytes FROM storage_catalog WHERE path LIKE ? ESCAPE '\\'",
+                    (self._like_prefix(prefix),)
+                )
+                if nested or '/' not in row['path'][len(prefix):]
+            }
+
+            with self.conn:
+                for path in known.keys() - on_disk.keys():
+                    self.conn.execute("DELETE FROM storage_catalog WHERE path = ?", (path,))
+                    stats['removed'] += 1
+                for path, (size, mtime) in on_disk.items():
+                    if path not in known:
+                        stem, _ = os.path.splitext(path)
+                        parent = None
+                        if thumbnail_marker in os.path.basename(stem):
+                            base = stem.rsplit(thumbnail_marker, 1)[0]
+                            parent = next((p for p in (base + '.jpg', base + '.png', base + '.webp')
+                                           if p in on_disk), None)
+                        self.conn.execute("""
+                            INSERT INTO storage_catalog (path, bytes, captured_at, parent_path, owner)
+                            VALUES (?, ?, ?, ?, ?)
+                        """, (path, size, mtime, parent, owner))
+                        stats['added'] += 1
+                    elif known[path] != size:
+                        self.conn.execute(
+                            "UPDATE storage_catalog SET bytes = ? WHERE path = ?", (size, path)
+                        )
+                        stats['resized'] += 1
+                if owner is not None:
+                    self.conn.executemany(
+                        "UPDATE storage_catalog SET owner = ? WHERE path = ? AND owner IS NULL",
+                        [(owner, path) for path in on_disk]
+                    )
+                self.conn.execute("""
+                    UPDATE storage_catalog SET thumb_bytes = (
+                        SELECT COALESCE(SUM(t.bytes), 0) FROM storage_catalog t
+                        WHERE t.parent_path = storage_catalog.path
+                    ) WHERE parent_path IS NULL
+                """)
+                self.conn.execute("""
+                    UPDATE storage_totals SET
+                        total_bytes = (SELECT COALESCE(SUM(bytes), 0) FROM storage_catalog),
+                        file_count = (SELECT COUNT(*) FROM storage_catalog)
+                    WHERE id = 1
+                """)
+
+            if any(stats.values()):
+                logger.info(f"Storage catalog reconciled: {stats}")
+            return stats
+
+    def clear(self):
+        """Forget every catalogued file."""
+        with self._lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM storage_catalog")
+                self.conn.execute("UPDATE storage_totals SET total_bytes = 0, file_count = 0 WHERE id = 1")
+
+    def close(self):
+        """Close the catalog database connection."""
+        with self._lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
@@ -0,0 +1,74 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS local_strings (
+        id INTEGER PRIMARY KEY,
+        value TEXT NOT NULL UNIQUE
+    );
+"""
+
+class StringDictionary:
+    """Interns repeated strings (app names, window titles) as integer ids.
+
+    The same few hundred strings make up almost every activity row, so
+    rows store ids into `local_strings` instead of the text. A small LRU
+    in front of the table means interning a string that was seen recently
+    costs no query at all. Ids are stable: a string keeps its id for the
+    life of the database, so cached ids never go stale.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._ids: "OrderedDict[str, int]" = OrderedDict()
+        self._values: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _remember(self, value: str, string_id: int):
+        with self._lock:
+            self._ids[value] = string_id
+            self._ids.move_to_end(value)
+            self._values[string_id] = value
+            while len(self._ids) > self.capacity:
+                old_value, old_id = self._ids.popitem(last=False)
+                self._values.pop(old_id, None)
+
+    def intern(self, conn, value: Optional[str]) -> Optional[int]:
+        """Id for `value`, inserting it if new. Commits the insert on `conn`."""
+        if value is None:
+            return None
+        with self._lock:
+            string_id = self._ids.get(value)
+            if string_id is not None:
+                self._ids.move_to_end(value)
+                return string_id
+        conn.execute("INSERT OR IGNORE INTO local_strings (value) VALUES (?)", (value,))
+        string_id = conn.execute("SELECT id FROM local_strings WHERE value = ?", (value,)).fetchone()[0]
+        # Committed before any row refers to it, so a rolled-back row insert
+        # can never leave a cached id that doesn't exist
+        conn.commit()
+        self._remember(value, string_id)
+        return string_id
+
+    def intern_many(self, conn, values: Iterable[Optional[str]]) -> Dict[str, int]:
+        return {value: self.intern(conn, value) for value in set(values) if value is not None}
+
+    def lookup(self, conn, string_id: Optional[int]) -> Optional[str]:
+        if string_id is None:
+            return None
+        with self._lock:
+            value = self._values.get(string_id)
+        if value is not None:
+            return value
+        row = conn.execute("SELECT value FROM local_strings WHERE id = ?", (string_id,)).fetchone()
+        if row is None:
+            return None
+        self._remember(row[0], string_id)
+        return row[0]
+
+    def __len__(self) -> int:
+        return len(self._ids)
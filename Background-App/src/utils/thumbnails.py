@@ -0,0 +1,60 @@
+import io
+import os
+import logging
+from typing import Dict, Iterable
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+def thumbnail_path(filepath: str, size: int) -> str:
+    """Return the path of the thumbnail of `filepath` at the given size."""
+    stem, _ = os.path.splitext(filepath)
+    return f"{stem}_t{size}.jpg"
+
+def build_thumbnails(image: Image.Image, sizes: Iterable[int]) -> Dict[int, Image.Image]:
+    """Build a thumbnail pyramid from an already-decoded frame.
+
+    The largest size is reduced from the frame itself; every smaller size is
+    reduced from the previous level, so the full-size frame is only walked once.
+    """
+    thumbnails = {}
+    source = image
+    for size in sorted(set(sizes), reverse=True):
+        if max(source.size) <= size:
+            thumb = source.copy()
+        else:
+            thumb = source.copy()
+            thumb.thumbnail((size, size), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        thumbnails[size] = thumb
+        source = thumb
+    return thumbnails
+
+def save_thumbnails(image: Image.Image,
+                    filepath: str,
+                    sizes: Iterable[int],
+                    quality: int = 50) -> Dict[int, str]:
+    """Write thumbnails of `image` next to `filepath`, returning {size: path}."""
+    saved = {}
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    for size, thumb in build_thumbnails(image, sizes).items():
+        path = thumbnail_path(filepath, size)
+        try:
+            thumb.save(path, 'JPEG', quality=quality, optimize=True)
+            saved[size] = path
+        except Exception as e:
+            logger.error(f"Error saving {size}px thumbnail for {filepath}: {e}")
+    return saved
+
+def encode_thumbnails(image: Image.Image,
+                      sizes: Iterable[int],
+                      quality: int = 50) -> Dict[int, bytes]:
+    """Encode thumbnails of `image` as JPEG bytes, returning {size: data}."""
+    encoded = {}
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    for size, thumb in build_thumbnails(image, sizes).items():
+        buffer = io.BytesIO()
+        thumb.save(buffer, 'JPEG', quality=quality, optimize=True)
+        encoded[size] = buffer.getvalue()
+    return encoded
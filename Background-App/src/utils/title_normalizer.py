@@ -0,0 +1,96 @@
+import re
+import json
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (app or None for every app, pattern, replacement), applied in order
+DEFAULT_RULES = [
+    (None, r"^\(\d+\+?\)\s*", ""),                       # "(3) Inbox" unread counts
+    (None, r"^[●•*]\s*", ""),                            # unsaved/activity markers
+    (None, r"\s*[\[(]?\d{1,3}(?:\.\d+)?\s?%[\])]?", ""),  # progress percentages
+    (None, r"\s*[\[(]?\d{1,2}:\d{2}(?::\d{2})?[\])]?", ""),  # clocks, timers, elapsed time
+    # Music players put the current track in the title
+    ("spotify", r"^.*$", "Spotify"),
+    ("music", r"^.*$", "Music"),
+    ("vlc", r"^.*\s[-—]\s(VLC media player)$", r"\1"),
+]
+
+def app_key(app_name: Optional[str]) -> str:
+    """Lower-case app name without extension: 'Spotify.exe' -> 'spotify'."""
+    if not app_name:
+        return ""
+    name = app_name.lower()
+    return name[:-4] if name.endswith((".exe", ".app")) else name
+
+def load_rules(path: str) -> List[Tuple[Optional[str], str, str]]:
+    """Extra rules from a JSON file of [app or null, pattern, replacement] entries."""
+    if not path:
+        return []
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [(app, pattern, replacement) for app, pattern, replacement in json.load(f)]
+    except (OSError, ValueError) as e:
+        logger.error(f"Error loading title rules from {path}: {e}")
+        return []
+
+class TitleNormalizer:
+    """Strips the parts of window titles that change without a context switch.
+
+    Rules are compiled once; app-specific rules only run for that app.
+    Remaining digit runs are masked to '#' (so "Build 1841" and "Build
+    1842" are the same title). Results are cached per (app, raw title),
+    so the regexes run once per distinct title rather than once per poll.
+    """
+
+    def __init__(self,
+                 rules: Iterable[Tuple[Optional[str], str, str]] = DEFAULT_RULES,
+                 mask_digits: bool = True,
+                 cache_size: int = 4096):
+        self.mask_digits = mask_digits
+        self.cache_size = cache_size
+        self._global: List[Tuple[Pattern, str]] = []
+        self._per_app: Dict[str, List[Tuple[Pattern, str]]] = {}
+        for app, pattern, replacement in rules:
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                logger.error(f"Ignoring invalid title rule {pattern!r}: {e}")
+                continue
+            if app:
+                self._per_app.setdefault(app_key(app), []).append((compiled, replacement))
+            else:
+                self._global.append((compiled, replacement))
+        self._digits = re.compile(r"\d+")
+        self._spaces = re.compile(r"\s{2,}")
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def normalize(self, app_name: Optional[str], title: Optional[str]) -> Optional[str]:
+        if not title:
+            return title
+        key = (app_name or "", title)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        normalized = self._normalize(app_name, title)
+        self._cache[key] = normalized
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return normalized
+
+    def _normalize(self, app_name: Optional[str], title: str) -> str:
+        normalized = title
+        for pattern, replacement in self._per_app.get(app_key(app_name), []) + self._global:
+            normalized = pattern.sub(replacement, normalized)
+        if self.mask_digits:
+            normalized = self._digits.sub("#", normalized)
+        normalized = self._spaces.sub(" ", normalized).strip(" -—|")
+        # Never normalize a title away entirely
+        return normalized or title
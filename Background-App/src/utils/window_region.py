@@ -0,0 +1,101 @@
+import sys
+import logging
+import subprocess
+from typing import Dict, Optional, Tuple
+
+# Platform window APIs are optional; whatever is missing is skipped
+if sys.platform == "win32":
+    try:
+        import win32gui
+    except ImportError:
+        win32gui = None
+else:
+    win32gui = None
+
+try:
+    import pygetwindow as gw
+except Exception:  # also raises NotImplementedError on unsupported platforms
+    gw = None
+
+logger = logging.getLogger(__name__)
+
+Rect = Tuple[int, int, int, int]  # left, top, width, height
+
+MIN_REGION = 64  # Smaller rectangles (minimised, tool windows) fall back to full screen
+
+def _rect_win32() -> Optional[Rect]:
+    if win32gui is None:
+        return None
+    hwnd = win32gui.GetForegroundWindow()
+    if not hwnd or win32gui.IsIconic(hwnd):
+        return None
+    left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+    return left, top, right - left, bottom - top
+
+def _rect_pygetwindow() -> Optional[Rect]:
+    if gw is None:
+        return None
+    window = gw.getActiveWindow()
+    if window is None or getattr(window, 'isMinimized', False):
+        return None
+    return window.left, window.top, window.width, window.height
+
+def _rect_x11() -> Optional[Rect]:
+    if not sys.platform.startswith('linux'):
+        return None
+    win_id = subprocess.check_output(
+        ['xprop', '-root', '_NET_ACTIVE_WINDOW'], timeout=1
+    ).decode().strip().split()[-1]
+    if win_id in ('0x0', '0'):
+        return None
+    info = subprocess.check_output(['xwininfo', '-id', win_id], timeout=1).decode()
+    fields = {}
+    for line in info.splitlines():
+        key, _, value = line.strip().partition(':')
+        fields[key] = value.strip()
+    if fields.get('Map State') not in (None, 'IsViewable'):
+        return None
+    return (int(fields['Absolute upper-left X']), int(fields['Absolute upper-left Y']),
+            int(fields['Width']), int(fields['Height']))
+
+_PROVIDERS = (_rect_win32, _rect_pygetwindow, _rect_x11)
+
+def get_active_window_rect() -> Optional[Rect]:
+    """Screen rectangle of the focused window, or None when it can't be determined."""
+    for provider in _PROVIDERS:
+        try:
+            rect = provider()
+        except Exception as e:
+            logger.debug(f"{provider.__name__} failed: {e}")
+            continue
+        if rect is not None:
+            return rect
+    return None
+
+def clip_region(rect: Optional[Rect], bounds: Optional[Dict] = None) -> Optional[Dict]:
+    """Clip a window rectangle to the screen bounds as an mss-style region dict.
+
+    Returns None (meaning: capture the full screen) when there is no
+    rectangle or what is left after clipping is too small to be useful.
+    """
+    if rect is None:
+        return None
+    left, top, width, height = rect
+    right, bottom = left + width, top + height
+    if bounds is not None:
+        left = max(left, bounds['left'])
+        top = max(top, bounds['top'])
+        right = min(right, bounds['left'] + bounds['width'])
+        bottom = min(bottom, bounds['top'] + bounds['height'])
+    if right - left < MIN_REGION or bottom - top < MIN_REGION:
+        return None
+    return {'left': left, 'top': top, 'width': right - left, 'height': bottom - top}
+
+def capture_region(mode: str, bounds: Optional[Dict] = None) -> Optional[Dict]:
+    """Region to grab for the given capture mode; None means full screen."""
+    if mode != 'window':
+        return None
+    region = clip_region(get_active_window_rect(), bounds)
+    if region is None:
+        logger.debug("Active window rectangle unavailable, capturing full screen")
+    return region
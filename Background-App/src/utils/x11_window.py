@@ -0,0 +1,167 @@
+import os
+import select
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+# python-xlib is optional; without it (or without a display) callers fall back to xprop
+try:
+    from Xlib import X, Xatom, display as xdisplay, error as xerror
+except ImportError:
+    X = None
+
+logger = logging.getLogger(__name__)
+
+class X11ActiveWindow:
+    """Tracks the focused X11 window over one persistent X connection.
+
+    Instead of forking `xprop` three times per poll, this subscribes to
+    PropertyNotify on the root window (for `_NET_ACTIVE_WINDOW`) and on the
+    focused window itself (for its title), so focus and title changes are
+    pushed by the server. `snapshot()` only returns cached state; events
+    are drained either by the background thread (`start()`) or, without
+    it, synchronously at the start of every `snapshot()`.
+    """
+
+    def __init__(self, display_name: Optional[str] = None):
+        if X is None:
+            raise RuntimeError("python-xlib is not installed")
+        self.display = xdisplay.Display(display_name)
+        self.root = self.display.screen().root
+        self.atoms = {name: self.display.intern_atom(name) for name in
+                      ('_NET_ACTIVE_WINDOW', '_NET_WM_NAME', '_NET_WM_PID', 'UTF8_STRING')}
+        self._title_atoms = (self.atoms['_NET_WM_NAME'], Xatom.WM_NAME)
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._lock = threading.RLock()  # listeners may call snapshot()
+        self._stop = threading.Event()
+        self._thread = None
+        self._window = None
+        self._state = {"window_id": None, "window_title": None, "pid": None}
+
+        self.root.change_attributes(event_mask=X.PropertyChangeMask)
+        self._refresh_active()
+        self.display.flush()
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """Call `callback(snapshot)` whenever the focused window or its title changes."""
+        self._listeners.append(callback)
+
+    def snapshot(self) -> Dict:
+        if self._thread is None:
+            self.poll()
+        with self._lock:
+            return dict(self._state)
+
+    def poll(self):
+        """Handle whatever events are already queued, without blocking."""
+        with self._lock:
+            while self.display.pending_events():
+                self._handle(self.display.next_event())
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="x11-active-window", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        self.display.close()
+
+    def _run(self):
+        fd = self.display.fileno()
+        while not self._stop.is_set():
+            try:
+                # Wake up at least twice a second to notice stop()
+                if not self.display.pending_events():
+                    select.select([fd], [], [], 0.5)
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error handling X11 events: {e}")
+                self._stop.wait(1)
+
+    def _handle(self, event):
+        if event.type != X.PropertyNotify:
+            return
+        if event.window == self.root and event.atom == self.atoms['_NET_ACTIVE_WINDOW']:
+            self._refresh_active()
+        elif self._window is not None and event.window == self._window and event.atom in self._title_atoms:
+            self._update({"window_title": self._title(self._window)})
+
+    def _refresh_active(self):
+        window = self._active_window()
+        if window is not None:
+            # Watch the new window for title changes; errors for windows that
+            # have already gone away are swallowed rather than printed
+            window.change_attributes(event_mask=X.PropertyChangeMask,
+                                     onerror=xerror.CatchError(xerror.BadWindow))
+        self._window = window
+        self.display.flush()
+        self._update({
+            "window_id": window.id if window is not None else None,
+            "window_title": self._title(window) if window is not None else None,
+            "pid": self._pid(window) if window is not None else None
+        })
+
+    def _update(self, values: Dict):
+        changed = any(self._state.get(k) != v for k, v in values.items())
+        self._state.update(values)
+        if not changed:
+            return
+        state = dict(self._state)
+        for callback in self._listeners:
+            try:
+                callback(state)
+            except Exception as e:
+                logger.error(f"Error in active window listener: {e}")
+
+    def _active_window(self):
+        prop = self.root.get_full_property(self.atoms['_NET_ACTIVE_WINDOW'], X.AnyPropertyType)
+        if not prop or not prop.value or not prop.value[0]:
+            return None
+        return self.display.create_resource_object('window', prop.value[0])
+
+    def _title(self, window) -> Optional[str]:
+        try:
+            for atom in self._title_atoms:
+                prop = window.get_full_property(atom, X.AnyPropertyType)
+                if prop and prop.value:
+                    value = prop.value
+                    return value.decode('utf-8', 'replace') if isinstance(value, bytes) else str(value)
+        except xerror.XError:
+            pass
+        return None
+
+    def _pid(self, window) -> Optional[int]:
+        try:
+            prop = window.get_full_property(self.atoms['_NET_WM_PID'], Xatom.CARDINAL)
+            if prop and len(prop.value):
+                return int(prop.value[0])
+        except xerror.XError:
+            pass
+        return None
+
+_shared_tracker = None
+_unavailable = False
+
+def get_x11_tracker() -> Optional[X11ActiveWindow]:
+    """The shared, started X11 tracker, or None when there is no usable X display."""
+    global _shared_tracker, _unavailable
+    if _shared_tracker is None and not _unavailable:
+        if X is None or not os.environ.get('DISPLAY'):
+            _unavailable = True
+            return None
+        try:
+            _shared_tracker = X11ActiveWindow()
+            _shared_tracker.start()
+        except Exception as e:
+            logger.info(f"X11 connection unavailable, using xprop: {e}")
+            _unavailable = True
+    return _shared_tracker
@@ -7,6 +7,7 @@ from ..src.utils.event_manager import EventManager
 from ..src.utils.resource_manager import ResourceManager
 from ..src.utils.sync_manager import SyncManager
 from ..src.utils.sqlite_manager import SQLiteManager
+from ..src.utils.storage_catalog import StorageCatalog
 
 @pytest.fixture
 def temp_dir():
@@ -38,6 +39,13 @@ def sqlite_manager(temp_dir):
     manager = SQLiteManager(db_path)
     yield manager
 
+@pytest.fixture
+def storage_catalog(temp_dir):
+    """Create a StorageCatalog instance for testing."""
+    catalog = StorageCatalog(os.path.join(temp_dir, 'catalog.db'))
+    yield catalog
+    catalog.close()
+
 @pytest.fixture
 def sync_manager(sqlite_manager):
     """Create a SyncManager instance for testing."""
@@ -0,0 +1,66 @@
+import threading
+from ..src.utils.active_window import ActiveWindowService, FakeProvider
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_polls_once_per_interval_and_versions_changes():
+    """Many consumers asking within the poll interval share one provider read."""
+    clock = _Clock()
+    provider = FakeProvider("code", "main.py", pid=10)
+    service = ActiveWindowService(provider, poll_interval=1.0, clock=clock)
+    changes = []
+    service.subscribe(changes.append)
+
+    for _ in range(5):
+        snapshot = service.get()
+    assert provider.reads == 1
+    assert snapshot["version"] == 1 and snapshot["app_name"] == "code"
+
+    clock.now = 2.0
+    assert service.get()["version"] == 1  # re-read, nothing changed
+    provider.set("firefox", "docs", pid=11)
+    clock.now = 4.0
+    snapshot = service.get()
+    assert snapshot["version"] == 2 and snapshot["window_title"] == "docs"
+    assert provider.reads == 3
+    assert [c["app_name"] for c in changes] == ["code", "firefox"]
+
+def test_pushing_provider_is_never_polled():
+    clock = _Clock()
+    provider = FakeProvider("code", "main.py", pushes=True)
+    service = ActiveWindowService(provider, poll_interval=1.0, clock=clock)
+    changes = []
+    service.subscribe(changes.append)
+    service.get()
+
+    provider.set("slack", "general")
+    provider.set("slack", "general")  # duplicate push, no new version
+    clock.now = 100.0
+    snapshot = service.get()
+    assert snapshot["app_name"] == "slack" and snapshot["version"] == 2
+    assert provider.reads == 1
+    assert len(changes) == 2
+
+def test_slow_subscriber_does_not_block_readers():
+    """Subscribers run after the service lock is released, so get() returns while one is busy."""
+    provider = FakeProvider("code", "main.py", pid=10)
+    service = ActiveWindowService(provider, poll_interval=1.0, clock=_Clock())
+    entered, release = threading.Event(), threading.Event()
+    service.subscribe(lambda snapshot: entered.set() or release.wait(5))
+
+    notifier = threading.Thread(target=service.get)  # first read changes the window
+    notifier.start()
+    assert entered.wait(5)
+    reader = threading.Thread(target=service.get)
+    reader.start()
+    reader.join(1)
+    blocked = reader.is_alive()
+    release.set()
+    notifier.join()
+    reader.join()
+    assert not blocked and provider.reads == 1
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone, timedelta
+import numpy as np
+from ..src.utils.analytics import ActivityAnalytics, coverage, parse_local_iso
+
+def test_coverage_clips_intervals_across_bins():
+    # 30 min across the first edge, a 2 h interval spanning three bins, one outside
+    starts = np.array([-1800.0, 3600.0, 20000.0])
+    ends = np.array([1800.0, 10800.0, 21000.0])
+    edges = np.array([0.0, 3600.0, 7200.0, 10800.0, 14400.0])
+    assert coverage(starts, ends, edges).tolist() == [1800.0, 3600.0, 3600.0, 0.0]
+
+def test_summary_buckets_by_zone_and_counts_short_gaps_as_idle(sqlite_manager):
+    monday = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    local = lambda t: datetime.fromtimestamp(t).isoformat()
+    sessions = [("code", monday + 23 * 3600, monday + 25 * 3600, "development"),  # crosses midnight
+                ("slack", monday + 25 * 3600 + 600, monday + 26 * 3600, "communication"),
+                ("code", monday + 30 * 3600, monday + 31 * 3600, "development")]   # after a 4 h break
+    for i, (app, start, end, category) in enumerate(sessions):
+        sqlite_manager.upsert_app_session("u1", None, {
+            "id": f"s{i}", "app_name": app, "window_title": None, "start_time": local(start),
+            "end_time": local(end), "duration": int(end - start), "category": category})
+
+    assert parse_local_iso([local(monday)]).tolist() == [monday]
+    analytics = ActivityAnalytics(sqlite_manager, "u1", tz=timezone(timedelta(hours=2)))
+    summary = analytics.summary(monday, monday + 2 * 86400)
+
+    assert summary["apps"] == [("code", 3 * 3600.0), ("slack", 3000.0)]
+    assert summary["categories"] == {"development": 3 * 3600.0, "communication": 3000.0}
+    # In UTC+2 the first session runs 01:00-03:00 Tuesday; the 4 h break is not idle
+    assert [(d["date"], d["active"], d["idle"]) for d in summary["daily"]] == [
+        ("2024-01-01", 0.0, 0.0), ("2024-01-02", 3 * 3600.0 + 3000.0, 600.0), ("2024-01-03", 0.0, 0.0)]
+    heatmap = np.array(summary["heatmap"])
+    assert heatmap[1, 1] == heatmap[1, 2] == 3600 and heatmap[1, 8] == 3600
+    assert heatmap.sum() == 3 * 3600 + 3000
+
+def test_fall_back_never_produces_negative_time(sqlite_manager):
+    """Across the DST fall-back hour an interval's local end can precede its start; it counts as zero."""
+    from zoneinfo import ZoneInfo
+    fall_back = datetime(2024, 11, 3, 6, tzinfo=timezone.utc).timestamp()  # 02:00 EDT -> 01:00 EST
+    sessions = ActivityAnalytics.from_columns(
+        [1, 1], [fall_back - 2 * 3600, fall_back + 300], [fall_back - 600, fall_back + 3600],
+        ["development", "development"])
+    analytics = ActivityAnalytics(sqlite_manager, "u1", tz=ZoneInfo("America/New_York"))
+    window = (fall_back - 86400, fall_back + 86400)
+
+    daily = analytics.daily(sessions, *window)
+    heatmap = analytics.heatmap(sessions, *window)
+
+    assert all(day["active"] >= 0 and day["idle"] >= 0 for day in daily)
+    assert heatmap.min() >= 0
+    # The 15 min gap maps to 01:50 EDT -> 01:05 EST, so it adds no idle time
+    assert sum(day["idle"] for day in daily) == 0
@@ -0,0 +1,26 @@
+from ..src.collectors.app_usage_collector import AppUsageCollector
+from ..src.utils.idle_time import FakeIdleProvider
+
+class FakeWindowService:
+    def __init__(self, app_name, window_title):
+        self.window = {"app_name": app_name, "window_title": window_title}
+
+    def get(self):
+        return self.window
+
+def test_idle_closes_and_persists_session(sqlite_manager):
+    """Going idle ends the open session when input stopped, and the session is written locally."""
+    idle = FakeIdleProvider()
+    collector = AppUsageCollector("u1", idle_threshold=300, sqlite_db=sqlite_manager, idle=idle)
+    collector.window_service = FakeWindowService("code", "main.py")
+
+    assert collector.collect(1000.0) is None
+    assert collector.collect(1600.0) is None  # still the same window
+
+    idle.set(400)  # no input since t=1600
+    usage = collector.collect(2000.0)
+
+    assert usage["app_name"] == "code" and usage["duration"] == 600
+    assert sqlite_manager.get_app_usage_totals("u1") == [("code", 600)]
+    # Nothing is open while idle, so polling on neither reopens nor re-closes it
+    assert collector.collect(2100.0) is None and collector.flush() is None
@@ -0,0 +1,41 @@
+import random
+from ..src.utils.capture_scheduler import AdaptiveCaptureScheduler, simulate
+
+def _scheduler(**kwargs):
+    return AdaptiveCaptureScheduler(rng=random.Random(1), **kwargs)
+
+def test_focus_change_and_idle():
+    """A window switch makes a capture due after the minimum spacing; idle suspends captures."""
+    scheduler = _scheduler(base_interval=300, min_interval=30, jitter=0.0)
+    scheduler.record_capture(0)
+    assert not scheduler.should_capture(60)
+
+    scheduler.observe_focus_change()
+    assert not scheduler.should_capture(20)
+    assert scheduler.should_capture(30)
+
+    scheduler.record_capture(30)
+    scheduler.observe_idle(True)
+    assert not scheduler.should_capture(10_000)
+
+def test_static_screen_stretches_interval():
+    scheduler = _scheduler(base_interval=300, max_interval=900, jitter=0.0)
+    scheduler.record_capture(0)
+    for _ in range(3):
+        scheduler.observe_frame_change(0.0)
+    assert scheduler.current_interval() == 900
+
+    scheduler.observe_frame_change(0.5)
+    assert scheduler.current_interval() == 150
+
+def test_simulation_respects_budget_and_spacing():
+    """Constant bursts of input and window switches never exceed the hourly budget."""
+    trace = []
+    for t in range(0, 4 * 3600, 20):
+        trace.append({'t': t, 'type': 'input', 'value': 50})
+        trace.append({'t': t, 'type': 'focus', 'value': True})
+    report = simulate(trace, _scheduler(hourly_budget=12, min_interval=30), duration=4 * 3600)
+
+    assert report['max_in_any_hour'] <= 12
+    assert report['min_spacing'] >= 30
+    assert report['captures'] >= 4 * 12 - 1
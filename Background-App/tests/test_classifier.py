@@ -0,0 +1,29 @@
+import json
+from ..src.utils.classifier import Classifier
+from ..src.utils.sessionizer import SessionBuilder
+
+def test_title_beats_app_and_results_are_cached():
+    classifier = Classifier()
+    assert classifier.classify("chrome.exe", "Lo-fi beats - YouTube - Google Chrome") == "entertainment"
+    assert classifier.classify("firefox", "Pull request #12 · m.github.com") == "development"
+    assert classifier.classify("Code.exe", "main.py - project") == "development"
+    assert classifier.classify("chrome.exe", "Some page - Google Chrome") == "uncategorized"
+    assert classifier.productivity("entertainment") == "unproductive"
+
+    classifier.classify("chrome.exe", "Lo-fi beats - YouTube - Google Chrome")
+    assert classifier.hits == 1 and classifier.misses == 4
+
+def test_rules_from_settings_tag_sessions(sqlite_manager):
+    sqlite_manager.set_setting("classifier_rules", json.dumps({
+        "rules": [{"category": "client-work", "patterns": [r"ACME-\d+"], "apps": ["code"]}],
+        "categories": {"client-work": "productive"}
+    }))
+    classifier = Classifier.from_settings(sqlite_manager, "classifier_rules")
+    builder = SessionBuilder(on_close=lambda s: sqlite_manager.upsert_app_session("u1", None, s),
+                             classify=classifier.classify)
+    builder.observe("chrome", "ACME-42 ticket", now=1_000_000)
+    builder.observe("code", "main.py", now=1_000_060)
+    builder.observe("slack", "general", now=1_000_090)
+    builder.close(1_000_100)
+
+    assert sqlite_manager.get_category_totals("u1") == [("client-work", 90), ("uncategorized", 10)]
@@ -0,0 +1,27 @@
+import numpy as np
+from ..src.utils.clip_buffer import FrameRing, InputRateAnomaly
+
+def test_ring_is_bounded_and_ordered():
+    """The ring never grows and always yields the newest frames oldest-first."""
+    ring = FrameRing(4, (8, 6))
+    nbytes = ring.nbytes
+    for i in range(10):
+        ring.push(np.full((6, 8, 3), i, dtype=np.uint8), float(i))
+
+    assert len(ring) == 4
+    assert ring.nbytes == nbytes
+    order = ring.order()
+    assert [int(ring.frames[j, 0, 0, 0]) for j in order] == [6, 7, 8, 9]
+    assert list(ring.timestamps[order]) == [6.0, 7.0, 8.0, 9.0]
+
+def test_input_anomaly_fires_on_burst_only():
+    detector = InputRateAnomaly(warmup=10, min_rate=15)
+    total = 0
+    fired = []
+    for t in range(1, 60):
+        total += 3  # steady typing
+        fired.append(detector.observe(float(t), total))
+    assert not any(fired)
+
+    total += 200  # scripted input burst
+    assert detector.observe(60.0, total)
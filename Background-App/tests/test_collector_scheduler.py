@@ -0,0 +1,75 @@
+import asyncio
+from ..src.utils.collector_scheduler import (
+    CollectorScheduler, FunctionCollector, CATCH_UP_SKIP, CATCH_UP_ALL, CATCH_UP_DELAY
+)
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _recorder(name, log):
+    return FunctionCollector(name, lambda now: log.append((name, now)))
+
+def test_coalesces_nearby_due_times():
+    """Collectors due within the coalesce window share one wakeup and one `now`."""
+    clock, log = _Clock(), []
+    scheduler = CollectorScheduler(clock=clock, coalesce_window=1.0)
+    scheduler.add(_recorder("a", log), 10)
+    scheduler.add(_recorder("b", log), 10, delay=0.5)
+    scheduler.add(_recorder("c", log), 30, delay=5)
+
+    async def drive():
+        for t in range(0, 61):
+            clock.now = float(t)
+            await scheduler.run_pending()
+
+    asyncio.run(drive())
+    # a and b share all 7 wakeups (t = 0, 10, ..., 60); c wakes alone at 5 and 35
+    assert scheduler.wakeups == 9
+    assert [n for n, t in log if t == 0] == ["a", "b"]
+    assert len({t for n, t in log if n in "ab"}) == 7
+
+def test_catch_up_policies():
+    clock, log = _Clock(), []
+    scheduler = CollectorScheduler(clock=clock, coalesce_window=0)
+    skip, every, delay = _recorder("skip", log), _recorder("all", log), _recorder("delay", log)
+    scheduler.add(skip, 10, policy=CATCH_UP_SKIP)
+    scheduler.add(every, 10, policy=CATCH_UP_ALL)
+    scheduler.add(delay, 10, policy=CATCH_UP_DELAY)
+
+    async def drive():
+        await scheduler.run_pending()
+        clock.now = 35.0  # suspended through the ticks at 10, 20 and 30
+        await scheduler.run_pending()
+
+    asyncio.run(drive())
+    counts = {name: sum(1 for n, _ in log if n == name) for name in ("skip", "all", "delay")}
+    assert counts == {"skip": 2, "all": 4, "delay": 2}
+    jobs = scheduler._jobs
+    assert jobs[id(skip)]["due"] == 40.0      # back on the 10 s grid
+    assert jobs[id(every)]["due"] == 40.0
+    assert jobs[id(delay)]["due"] == 45.0     # one interval after the late run
+
+def test_backs_off_while_idle_and_wakes_on_input():
+    from ..src.utils.idle_time import IdleBackoff, FakeIdleProvider
+    clock, log, idle = _Clock(), [], FakeIdleProvider(idle=0)
+    scheduler = CollectorScheduler(clock=clock, coalesce_window=0)
+    scheduler.add(_recorder("poll", log), 5, backoff=IdleBackoff(idle, 5, 60, idle_after=30))
+
+    async def drive():
+        idle.set(600)  # user away
+        while clock.now < 300:
+            clock.now = scheduler.next_due()
+            await scheduler.run_pending()
+        idle.touch()
+        scheduler.wake()
+        clock.now += 0.1
+        await scheduler.run_pending()
+
+    asyncio.run(drive())
+    gaps = [b - a for (_, a), (_, b) in zip(log, log[1:])]
+    assert gaps[:5] == [10, 20, 40, 60, 60]  # doubling up to the ceiling
+    assert round(gaps[-1], 1) == 0.1 and scheduler.next_due() == clock.now + 5
@@ -0,0 +1,44 @@
+import os
+import asyncio
+from PIL import Image
+from ..src.utils.content_store import ContentAddressedStore
+
+def test_put_dedups_and_delete_prunes_shards(temp_dir):
+    """Objects land in two-level shards by hash; a repeat is not rewritten; empty shards go."""
+    store = ContentAddressedStore(os.path.join(temp_dir, 'shots'))
+    path, digest, duplicate = store.put(b'frame', '.png')
+
+    assert not duplicate
+    assert path == os.path.join(temp_dir, 'shots', digest[:2], digest[2:4], f'{digest}.png')
+    assert store.put(b'frame', '.png') == (path, digest, True)
+
+    thumb = path.replace('.png', '_t160.jpg')
+    assert store.put_at(thumb, b'thumb') == 5
+    assert store.read(thumb) == b'thumb' and store.size(path) == 5
+    assert not [name for name in os.listdir(os.path.dirname(path)) if name.endswith('.tmp')]
+
+    store.delete(path)
+    assert os.path.isdir(os.path.dirname(path))  # the thumbnail still lives in the shard
+    store.delete(thumb)
+    assert os.listdir(os.path.join(temp_dir, 'shots')) == []
+
+def test_duplicate_frame_refreshes_catalog_and_keeps_shared_file(resource_manager, sqlite_manager):
+    """A repeat capture restarts the age clock, and the object stays while any row is unsynced."""
+    frame = Image.new('RGB', (64, 48), (30, 90, 150))
+    first = asyncio.run(resource_manager.save_screenshot_with_thumbnails(frame, 'u1'))
+    catalog = resource_manager.catalog
+    catalog.mark_synced(first['path'])
+    captured = catalog.get(first['path'])['captured_at']
+
+    second = asyncio.run(resource_manager.save_screenshot_with_thumbnails(frame, 'u1'))
+
+    assert second['duplicate'] and second['path'] == first['path']
+    entry = catalog.get(first['path'])
+    assert entry['captured_at'] >= captured and entry['synced'] == 0
+    assert all(catalog.get(p)['synced'] == 0 for p in second['thumbnails'].values())
+
+    ids = [sqlite_manager.insert_screenshot('u1', None, saved['path'], saved['thumbnails'],
+                                            content_hash=saved['content_hash']) for saved in (first, second)]
+    assert sqlite_manager.count_unsynced_screenshot_refs(first['path']) == 2
+    sqlite_manager.update_screenshot_sync_details(ids[0], 'u1/remote.jpg')
+    assert sqlite_manager.count_unsynced_screenshot_refs(first['path']) == 1
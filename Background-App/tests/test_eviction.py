@@ -0,0 +1,116 @@
+import os
+import time
+import asyncio
+import hashlib
+import pytest
+from PIL import Image
+from ..src.utils.eviction import (
+    EvictionEngine,
+    NeverEvictUnsyncedUnlessCritical,
+    OldestSyncedFirst,
+    DownscaleBeforeDelete
+)
+
+def _fill(catalog, temp_dir, count, synced_every=2, size=1000):
+    for i in range(count):
+        catalog.add(os.path.join(temp_dir, f'{i}.jpg'), size, float(i), synced=(i % synced_every == 0))
+
+def test_synced_evicted_before_unsynced(storage_catalog, temp_dir):
+    """Oldest-synced-first never picks an unsynced file while synced ones remain."""
+    _fill(storage_catalog, temp_dir, 10)
+    engine = EvictionEngine(storage_catalog, [OldestSyncedFirst()])
+
+    report = engine.enforce(max_bytes=10_000, target_bytes=7_000, dry_run=True)
+
+    assert [os.path.basename(a['path']) for a in report['actions']] == ['0.jpg', '2.jpg', '4.jpg']
+    assert report['unsynced_deletes'] == 0
+    assert storage_catalog.totals() == (10_000, 10)  # dry run leaves everything in place
+
+def test_unsynced_protected_until_critical(storage_catalog, temp_dir):
+    """Unsynced screenshots are only evicted once usage crosses the critical ratio."""
+    _fill(storage_catalog, temp_dir, 10)
+    engine = EvictionEngine(storage_catalog,
+                            [NeverEvictUnsyncedUnlessCritical(), OldestSyncedFirst()],
+                            critical_ratio=0.98)
+
+    relaxed = engine.enforce(max_bytes=20_000, target_bytes=2_000, dry_run=True)
+    assert relaxed['deletes'] == 5
+    assert relaxed['blocked_unsynced'] == 5
+
+    critical = engine.enforce(max_bytes=10_000, target_bytes=2_000, dry_run=True)
+    assert critical['deletes'] == 8
+    assert critical['unsynced_deletes'] == 3
+
+def test_downscale_before_delete(storage_catalog, temp_dir):
+    """A large file is shrunk first and only deleted if that isn't enough."""
+    _fill(storage_catalog, temp_dir, 4, synced_every=1, size=100_000)
+    engine = EvictionEngine(storage_catalog, [OldestSyncedFirst(), DownscaleBeforeDelete(scale=0.5)])
+
+    report = engine.enforce(max_bytes=400_000, target_bytes=300_000, dry_run=True)
+
+    assert [a['action'] for a in report['actions']] == ['downscale', 'downscale']
+    assert report['deletes'] == 0
+
+def test_execute_removes_files_and_catalog_rows(storage_catalog, temp_dir):
+    """Executing a plan deletes files together with their thumbnails."""
+    removed = []
+    for i in range(3):
+        path = os.path.join(temp_dir, f'{i}.jpg')
+        storage_catalog.add(path, 100, float(i), synced=True)
+        storage_catalog.add(os.path.join(temp_dir, f'{i}_t160.jpg'), 10, float(i), parent_path=path)
+    engine = EvictionEngine(storage_catalog, remover=removed.append)
+
+    report = engine.enforce(max_bytes=330, target_bytes=200)
+
+    assert report['deleted'] == 2
+    assert len(removed) == 4
+    assert storage_catalog.totals() == (110, 2)
+
+def test_plan_scales_to_100k_files(storage_catalog, temp_dir):
+    """Planning over 100k catalogued files stays well under a second."""
+    with storage_catalog.conn:
+        storage_catalog.conn.executemany(
+            "INSERT INTO storage_catalog (path, bytes, captured_at, synced) VALUES (?, ?, ?, ?)",
+            ((f'/shots/{i}.jpg', 100_000, float(i), i % 3 != 0) for i in range(100_000))
+        )
+    engine = EvictionEngine(storage_catalog)
+
+    start = time.perf_counter()
+    report = engine.enforce(max_bytes=8_000_000_000, target_bytes=5_000_000_000, dry_run=True)
+    elapsed = time.perf_counter() - start
+
+    assert report['deletes'] == 50_000
+    assert elapsed < 1.0
+
+def test_capture_path_keeps_unsynced_below_critical(resource_manager):
+    """Past the high-water mark capture-time eviction frees synced files only."""
+    catalog = resource_manager.catalog
+    mb = 1024 * 1024
+    for i in range(9):
+        catalog.add(os.path.join(resource_manager.screenshots_dir, f'{i}.jpg'), mb, float(i), synced=i < 3)
+    catalog.add(os.path.join(resource_manager.screenshots_dir, 'new.jpg'), int(0.6 * mb), 9.0)
+    # 9.6MB of the 10MB limit: over the 95% high-water mark, under the 98% critical ratio
+
+    asyncio.run(resource_manager._cleanup_if_needed())
+
+    remaining = {os.path.basename(row[0]): row[3] for row in catalog.candidates()}
+    assert '0.jpg' not in remaining  # oldest synced goes first, down to the 90% target
+    assert all(name in remaining for name in ['3.jpg', '4.jpg', '5.jpg', '6.jpg', '7.jpg', '8.jpg', 'new.jpg'])
+    assert catalog.total_bytes() <= 9 * mb
+
+def test_downscaled_object_is_not_reused_for_identical_frame(resource_manager):
+    """A re-encoded object no longer matches its digest; the next identical frame restores it."""
+    frame = Image.effect_noise((128, 96), 64).convert('RGB')
+    first = asyncio.run(resource_manager.save_screenshot_with_thumbnails(frame, 'u1'))
+    path, digest = first['path'], first['content_hash']
+    catalog, store = resource_manager.catalog, resource_manager.store
+    catalog.mark_downscaled(path, resource_manager._downscale(path, 0.5))
+    assert hashlib.sha256(store.read(path)).hexdigest() != digest
+    assert catalog.get(path)['hash'] is None
+
+    second = asyncio.run(resource_manager.save_screenshot_with_thumbnails(frame, 'u1'))
+
+    assert second['path'] == path and not second['duplicate']
+    assert hashlib.sha256(store.read(path)).hexdigest() == digest
+    entry = catalog.get(path)
+    assert entry['hash'] == digest and entry['downscaled'] == 0 and entry['bytes'] == store.size(path)
@@ -0,0 +1,30 @@
+from ..src.utils import idle_time
+from ..src.utils.idle_time import InputEventIdleProvider, FakeIdleProvider, IdleBackoff
+
+def test_input_event_fallback():
+    now = [1000.0]
+    provider = InputEventIdleProvider(clock=lambda: now[0])
+    now[0] += 42
+    assert provider.seconds() == 42
+    provider.touch()
+    now[0] += 1
+    assert provider.seconds() == 1
+
+def test_default_without_os_counter(monkeypatch):
+    """No display and no Win32/Quartz: idle comes from input events instead of failing."""
+    monkeypatch.delenv("DISPLAY", raising=False)
+    monkeypatch.setattr(idle_time.sys, "platform", "linux")
+    monkeypatch.setattr(idle_time.platform, "system", lambda: "Linux")
+    assert isinstance(idle_time.default_idle_provider(), InputEventIdleProvider)
+
+def test_backoff_doubles_while_idle_and_snaps_back_on_input():
+    idle = FakeIdleProvider(idle=10)
+    backoff = IdleBackoff(idle, min_interval=5, max_interval=60, factor=2, idle_after=30)
+    assert backoff.next_interval() == 5 and not backoff.backed_off
+
+    idle.set(45)  # no input for longer than idle_after
+    assert [backoff.next_interval() for _ in range(5)] == [10, 20, 40, 60, 60]
+    assert backoff.backed_off
+
+    idle.touch()
+    assert backoff.next_interval() == 5 and not backoff.backed_off
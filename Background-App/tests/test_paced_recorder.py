@@ -0,0 +1,85 @@
+import os
+import threading
+import numpy as np
+from ..src.collectors import recording_collector
+from ..src.collectors.recording_collector import PacedRecorder
+
+SIZE = (64, 48)
+
+class FakeClock:
+    """Pacing clock that only moves when the recorder sleeps or a grab takes time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def wait(self, seconds):
+        self.now += seconds
+        return False  # never stopped
+
+def _frame(value):
+    return np.full((SIZE[1], SIZE[0], 4), value, dtype=np.uint8)
+
+def test_slow_grab_repeats_frames_to_keep_cfr_timing(temp_dir):
+    """A grab that takes 2.5 slots misses slots; the encoder fills them so 2.5 s is still 50 frames."""
+    clock = FakeClock()
+    period = 1 / 20
+
+    def grab():
+        clock.now += 2.5 * period
+        return _frame(128)
+
+    recorder = PacedRecorder(os.path.join(temp_dir, 'cfr.mp4'), fps=20, grab=grab, size=SIZE,
+                             queue_size=64, clock=clock, wait=clock.wait)
+    stats = recorder.record(2.5)
+
+    # Grabs start at slots 0, 2, 5, 7, 10, ... (every 2.5 slots, rounded down)
+    assert stats['slots'] == stats['written'] == 50
+    assert stats['captured'] == 20
+    assert stats['dropped'] == 0
+    assert stats['duplicated'] == 30
+    assert os.path.getsize(stats['segments'][0]['path']) > 0
+
+def test_slow_encoder_drops_frames_but_keeps_slot_count(temp_dir, monkeypatch):
+    """With the encoder stalled and a tiny queue, frames are dropped and repeated, never lost as time."""
+    clock = FakeClock()
+    grabbed = []
+    release = threading.Event()
+    convert = recording_collector.FrameConverter.convert
+
+    def grab():
+        grabbed.append(clock.now)
+        if len(grabbed) == 50:
+            release.set()
+        return _frame(len(grabbed))
+
+    def stalled_convert(self, frame, dst=None):
+        release.wait(5)  # the encoder can't keep up until the last frame is grabbed
+        return convert(self, frame, dst)
+
+    monkeypatch.setattr(recording_collector.FrameConverter, 'convert', stalled_convert)
+    recorder = PacedRecorder(os.path.join(temp_dir, 'cfr.mp4'), fps=20, grab=grab, size=SIZE,
+                             queue_size=2, clock=clock, wait=clock.wait)
+    stats = recorder.record(2.5)
+
+    assert stats['captured'] == 50
+    # At most one frame in the encoder plus two queued get through before the release
+    assert stats['dropped'] >= 50 - 4
+    assert stats['written'] == 50
+    assert stats['duplicated'] == 50 - (stats['captured'] - stats['dropped'])
+
+def test_vfr_skips_static_screen_and_logs_timestamps(temp_dir):
+    """A static screen is written once; a change 1.25 s in is the only other frame in the sidecar."""
+    clock = FakeClock()
+    recorder = PacedRecorder(os.path.join(temp_dir, 'vfr.mp4'), fps=20, mode='vfr', max_gap=10.0,
+                             grab=lambda: _frame(200 if clock.now >= 1.25 else 10), size=SIZE,
+                             queue_size=64, clock=clock, wait=clock.wait)
+    stats = recorder.record(2.5)
+
+    assert stats['written'] == 2
+    assert stats['skipped'] == 48
+    assert stats['duplicated'] == stats['dropped'] == 0
+    with open(recorder.timestamps_path) as f:
+        assert f.read().splitlines() == ['# timestamp format v2', '0.000', '1250.000']
@@ -0,0 +1,67 @@
+import os
+from ..src.utils.pack_store import PackStore, get_pack_store, root_id
+from ..src.utils.content_store import open_screenshot_store
+
+def test_put_read_and_dedup(temp_dir):
+    """Objects round-trip through mmap reads and identical bytes are stored once."""
+    store = PackStore(os.path.join(temp_dir, 'pack'))
+    try:
+        locator, digest, duplicate = store.put(b'frame-1', '.jpg')
+        assert locator == f"pack://{root_id(store.root)}/{digest}.jpg" and not duplicate
+        assert store.read(locator) == b'frame-1'
+
+        again, _, duplicate = store.put(b'frame-1', '.jpg')
+        assert again == locator and duplicate
+
+        thumb = locator.replace('.jpg', '_t160.jpg')
+        store.put_at(thumb, b'thumb')
+        assert store.read(thumb) == b'thumb'
+        assert set(store.entries()) == {locator, thumb}
+
+        store.delete(locator)
+        assert not store.exists(locator)
+    finally:
+        store.close()
+
+def test_segments_roll_and_compact(temp_dir):
+    """Deleted objects are reclaimed by rewriting sparse sealed segments."""
+    root = os.path.join(temp_dir, 'pack')
+    store = PackStore(root, segment_bytes=4096)
+    try:
+        locators = [store.put(bytes([i]) * 1000, '.jpg')[0] for i in range(12)]
+        segments = [name for name in os.listdir(root) if name.endswith('.pack')]
+        assert len(segments) > 1
+
+        for locator in locators[1:8]:
+            store.delete(locator)
+        before = store.disk_usage()
+        stats = store.compact()
+        assert stats['segments'] >= 1
+        assert store.disk_usage() < before
+
+        for i in (0, 8, 11):
+            assert store.read(locators[i]) == bytes([i]) * 1000
+    finally:
+        store.close()
+
+def test_one_store_per_root_and_rooted_locators(temp_dir, storage_catalog):
+    """Every opener of a root shares one writer; locators name their root, so any store can resolve them."""
+    shared, user = os.path.join(temp_dir, 'shots'), os.path.join(temp_dir, 'shots', 'u1')
+    store = open_screenshot_store(shared, 'pack')
+    other = get_pack_store(user)
+    try:
+        assert open_screenshot_store(shared, 'pack', segment_bytes=1024) is store
+
+        locator, _, _ = other.put(b'user frame', '.png')
+        assert store.read(locator) == b'user frame' and store.exists(locator)
+        same, _, duplicate = store.put(b'user frame', '.png')
+        assert same != locator and not duplicate  # identical content in two roots stays apart
+
+        storage_catalog.add(locator, 10)
+        storage_catalog.add(same, 10)
+        assert store.reconcile(storage_catalog)['removed'] == 0  # leaves the other root's rows alone
+        store.delete(locator)
+        assert not other.exists(locator)
+    finally:
+        store.close()
+        other.close()
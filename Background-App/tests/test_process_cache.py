@@ -0,0 +1,24 @@
+import os
+import sys
+import subprocess
+from ..src.utils.process_cache import ProcessCache
+
+def test_process_objects_are_reused():
+    """Repeated lookups share one Process object, so cpu_percent has a baseline."""
+    cache = ProcessCache()
+    pid = os.getpid()
+    process = cache.get(pid)
+    assert process is cache.get(pid)
+    assert cache.key(pid) == (pid, process.create_time())
+    assert cache.name(pid) == process.name()
+    assert cache.get(0) is None
+
+def test_refresh_drops_exited_processes():
+    cache = ProcessCache()
+    child = subprocess.Popen([sys.executable, "-c", "pass"])
+    assert cache.get(child.pid) is not None
+    child.wait()
+
+    cache.refresh()
+    assert child.pid not in cache._entries
+    assert cache.get(child.pid) is None
@@ -0,0 +1,149 @@
+import os
+from datetime import datetime
+import pytest
+import requests
+from ..src.collectors.recording_collector import RecordingCollector
+from ..src.services.recording_uploader import RecordingUploader, TusClient
+
+BASE = 'https://project.supabase.co'
+UPLOAD_URL = f'{BASE}/storage/v1/upload/resumable/abc123'
+
+class FakeResponse:
+    def __init__(self, status_code=204, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code}')
+
+class FakeTusServer:
+    """Stands in for requests.Session against the Storage TUS endpoint."""
+
+    def __init__(self, fail_patch=None):
+        self.received = b''
+        self.calls = []
+        self.fail_patch = fail_patch  # 1-based PATCH number that loses the connection
+
+    def post(self, url, headers=None, timeout=None):
+        self.calls.append(('POST', url, headers))
+        return FakeResponse(201, {'Location': 'abc123'})
+
+    def head(self, url, headers=None, timeout=None):
+        self.calls.append(('HEAD', url, headers))
+        return FakeResponse(200, {'Upload-Offset': str(len(self.received))})
+
+    def patch(self, url, data=None, headers=None, timeout=None):
+        self.calls.append(('PATCH', url, headers))
+        if self.methods().count('PATCH') == self.fail_patch:
+            self.fail_patch = None
+            raise requests.ConnectionError('connection reset')
+        assert int(headers['Upload-Offset']) == len(self.received)
+        self.received += data
+        return FakeResponse(204, {'Upload-Offset': str(len(self.received))})
+
+    def methods(self):
+        return [call[0] for call in self.calls]
+
+class FakeSupabase:
+    def __init__(self):
+        self.inserted = []
+
+    def table(self, name):
+        supabase = self
+
+        class Query:
+            def insert(self, row):
+                supabase.inserted.append((name, row))
+                return self
+
+            def execute(self):
+                return None
+
+        return Query()
+
+def _segment(temp_dir, data=bytes(range(25))):
+    path = os.path.join(temp_dir, 'rec.mp4')
+    with open(path, 'wb') as f:
+        f.write(data)
+    with open(f'{path}.timestamps.txt', 'w') as f:
+        f.write('# timestamp format v2\n0.000\n')
+    return {'index': 0, 'path': path, 'start_offset': 0.0, 'duration': 2.4}
+
+def _uploader(sqlite_manager, server, supabase):
+    tus = TusClient(BASE, 'key', chunk_size=10, session=server)
+    return RecordingUploader('u1', sqlite_manager, supabase=supabase, tus=tus, retry_delay=0)
+
+def test_upload_creates_inserts_video_and_deletes_local_file(temp_dir, sqlite_manager):
+    """One POST creates the upload, PATCHes send the chunks, then the row is written and the file goes."""
+    server, supabase = FakeTusServer(), FakeSupabase()
+    uploader = _uploader(sqlite_manager, server, supabase)
+    segment = _segment(temp_dir)
+    uploader.enqueue_segment(segment, 'rec-1', '2026-01-01T09:00:00')
+
+    assert uploader.process_queue() == {'uploaded': 1, 'failed': 0}
+
+    assert server.methods() == ['POST', 'PATCH', 'PATCH', 'PATCH']
+    post_headers = server.calls[0][2]
+    assert post_headers['Upload-Length'] == '25' and post_headers['Tus-Resumable'] == '1.0.0'
+    assert all(call[1] == UPLOAD_URL for call in server.calls[1:])
+    assert server.received == bytes(range(25))
+    assert supabase.inserted == [('videos', {'user_id': 'u1', 'data': 'u1/rec-1/0000.mp4',
+                                             'duration': 2, 'captured_at': '2026-01-01T09:00:00'})]
+    assert not os.path.exists(segment['path'])
+    assert not os.path.exists(f"{segment['path']}.timestamps.txt")
+    assert sqlite_manager.get_pending_uploads('u1') == []
+
+def test_interrupted_upload_resumes_from_acknowledged_offset(temp_dir, sqlite_manager):
+    """A PATCH lost mid-file keeps the upload URL; the retry HEADs the offset and sends only the tail."""
+    server, supabase = FakeTusServer(fail_patch=2), FakeSupabase()
+    uploader = _uploader(sqlite_manager, server, supabase)
+    segment = _segment(temp_dir)
+    uploader.enqueue_segment(segment, 'rec-1')
+
+    assert uploader.process_queue() == {'uploaded': 0, 'failed': 1}
+    pending, = sqlite_manager.get_pending_uploads('u1')
+    assert pending['upload_url'] == UPLOAD_URL and pending['uploaded_bytes'] == 10
+    assert pending['attempts'] == 1
+    assert os.path.exists(segment['path']) and supabase.inserted == []
+
+    server.calls.clear()
+    assert uploader.process_queue() == {'uploaded': 1, 'failed': 0}
+
+    assert server.methods() == ['HEAD', 'PATCH', 'PATCH']
+    assert [call[2]['Upload-Offset'] for call in server.calls[1:]] == ['10', '20']
+    assert server.received == bytes(range(25))
+    assert len(supabase.inserted) == 1
+    assert not os.path.exists(segment['path'])
+    assert sqlite_manager.get_pending_uploads('u1') == []
+
+def test_collector_queues_clips_through_uploader(temp_dir, sqlite_manager):
+    """Clips closed by the collector land in the shared upload queue and are sent by the uploader."""
+    server, supabase = FakeTusServer(), FakeSupabase()
+    uploader = _uploader(sqlite_manager, server, supabase)
+    collector = RecordingCollector('u1', output_dir=temp_dir, uploader=uploader, sqlite_db=sqlite_manager)
+    segment = _segment(temp_dir)
+
+    collector._record_clip({'id': 'clip-1', 'started_at': datetime(2026, 1, 1, 9).isoformat(),
+                            'file_path': segment['path'], 'duration': 30.0})
+
+    pending, = sqlite_manager.get_pending_uploads('u1')
+    assert pending['object_path'] == 'u1/clip-1/0000.mp4'
+    assert uploader.process_queue()['uploaded'] == 1
+    assert supabase.inserted[0][1]['captured_at'] == '2026-01-01T09:00:00'
+
+def test_sync_wakes_the_shared_uploader_instead_of_draining(temp_dir, sqlite_manager, monkeypatch):
+    """SupabaseSync uses the running uploader and leaves the queue to its worker."""
+    pytest.importorskip('supabase')
+    from ..src.services import supabase_sync
+    server, supabase = FakeTusServer(), FakeSupabase()
+    uploader = _uploader(sqlite_manager, server, supabase)
+    monkeypatch.setattr(supabase_sync, 'create_client', lambda url, key: supabase)
+    sync = supabase_sync.SupabaseSync('u1', uploader, sqlite_db=sqlite_manager, store=object())
+    uploader.enqueue_segment(_segment(temp_dir), 'rec-1')
+    uploader._wake.clear()
+
+    sync._sync_recordings()
+
+    assert sync.recording_uploader is uploader and uploader._wake.is_set()
+    assert server.calls == []  # nothing uploaded outside the worker
@@ -0,0 +1,22 @@
+import numpy as np
+from ..src.utils.resource_sampler import ResourceSampler
+
+def test_ring_is_fixed_and_windows_aggregate():
+    sampler = ResourceSampler(capacity=8, top_n=3, top_every=2)
+    nbytes = sampler.cpu.nbytes + sampler.timestamps.nbytes
+    for i in range(20):
+        sampler.sample(100.0 + i)
+    assert sampler.cpu.nbytes + sampler.timestamps.nbytes == nbytes
+    assert sorted(sampler.timestamps) == [112.0 + i for i in range(8)]  # only the newest 8 kept
+
+    # Deterministic values for the aggregates
+    sampler.cpu[:] = np.arange(8)
+    sampler.memory[:] = 50
+    order = np.argsort(sampler.timestamps)
+    window = sampler.window(sampler.timestamps[order[2]], sampler.timestamps[order[5]])
+    assert window["samples"] == 4
+    assert window["cpu_percent"] == round(float(sampler.cpu[order[2:6]].mean()), 1)
+    assert window["memory_max"] == 50.0
+    assert len(window["top_processes"]) <= 3
+    assert sampler.window(0, 50)["samples"] == 0
+    sampler.close()
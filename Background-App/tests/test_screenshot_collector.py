@@ -0,0 +1,35 @@
+import time
+import pytest
+from PIL import Image
+
+pytest.importorskip('supabase')
+from ..src.collectors import screenshot_collector
+from ..src.collectors.screenshot_collector import ScreenshotCollector
+
+@pytest.fixture
+def pack_collector(temp_dir, monkeypatch):
+    monkeypatch.chdir(temp_dir)
+    monkeypatch.setattr(screenshot_collector, 'SCREENSHOT_BACKEND', 'pack')
+    monkeypatch.setattr(screenshot_collector, 'STORAGE_CATALOG_DB', f'{temp_dir}/catalog.db')
+    collector = ScreenshotCollector('u1')
+    yield collector
+    collector.store.close()
+    collector.close()
+
+def test_pack_backend_lists_and_cleans_up_by_owner(pack_collector):
+    """pack:// locators are found by owner, not by a filesystem prefix."""
+    now = time.time()
+    old_path, _, _, old_thumbs = pack_collector.save_frame(Image.new('RGB', (64, 48), (10, 20, 30)),
+                                                           now - 10 * 86400)
+    new_path, _, _, _ = pack_collector.save_frame(Image.new('RGB', (64, 48), (200, 20, 30)), now)
+    pack_collector.catalog.add('/elsewhere/u2.png', 5, now, owner='u2')
+
+    assert old_path.startswith('pack://')
+    assert [s['filepath'] for s in pack_collector.get_recent_screenshots()] == [new_path, old_path]
+
+    pack_collector.cleanup_old_screenshots(days=7)
+
+    assert [s['filepath'] for s in pack_collector.get_recent_screenshots()] == [new_path]
+    assert not pack_collector.store.exists(old_path)
+    assert not any(pack_collector.store.exists(p) for p in old_thumbs.values())
+    assert pack_collector.catalog.get('/elsewhere/u2.png') is not None
@@ -0,0 +1,37 @@
+from ..src.utils.sessionizer import SessionBuilder
+
+def test_rows_track_context_switches(sqlite_manager):
+    """An hour of 5 s polls over 12 windows writes 12 session rows, not 720."""
+    builder = SessionBuilder(
+        on_close=lambda s: sqlite_manager.upsert_app_session("u1", None, s),
+        on_checkpoint=lambda s: sqlite_manager.upsert_app_session("u1", None, s, is_open=True),
+        checkpoint_interval=60
+    )
+    for t in range(0, 3600, 5):
+        window = t // 300
+        builder.observe(f"app{window % 3}", f"doc {window}", now=1_000_000 + t)
+    builder.close(1_000_000 + 3600)
+
+    with sqlite_manager.get_connection() as conn:
+        rows = conn.execute("SELECT duration, is_open FROM local_app_sessions ORDER BY start_time").fetchall()
+    assert len(rows) == 12
+    assert all(duration == 300 and not is_open for duration, is_open in rows)
+
+def test_checkpoint_idle_and_flicker():
+    closed, checkpoints = [], []
+    builder = SessionBuilder(on_close=closed.append, on_checkpoint=checkpoints.append,
+                             checkpoint_interval=100, min_duration=2)
+    builder.observe("code", "main.py", now=0)
+    builder.observe("code", "main.py", now=50)
+    builder.observe("code", "main.py", now=120)
+    assert len(checkpoints) == 1 and checkpoints[0]["duration"] == 120
+    assert closed == []
+
+    builder.observe_idle(130)
+    assert closed[-1]["duration"] == 130
+    assert closed[-1]["id"] == checkpoints[0]["id"]  # the checkpoint row is overwritten
+
+    builder.observe("slack", "general", now=500)
+    builder.observe("code", "main.py", now=501)  # one-second flicker is dropped
+    builder.close(600)
+    assert [s["app_name"] for s in closed] == ["code", "code"]
@@ -0,0 +1,73 @@
+import os
+import time
+
+def _write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+
+def test_running_totals(storage_catalog, temp_dir):
+    """Totals follow adds, resizes and removals without a directory scan."""
+    shots = os.path.join(temp_dir, 'screenshots')
+    storage_catalog.add(os.path.join(shots, 'a.jpg'), 100, 1.0)
+    storage_catalog.add(os.path.join(shots, 'a_t160.jpg'), 10, 1.0,
+                        parent_path=os.path.join(shots, 'a.jpg'))
+    storage_catalog.add(os.path.join(shots, 'b.jpg'), 200, 2.0)
+    assert storage_catalog.totals() == (310, 3)
+
+    storage_catalog.resize(os.path.join(shots, 'b.jpg'), 50)
+    assert storage_catalog.totals() == (160, 3)
+
+    removed = storage_catalog.remove(os.path.join(shots, 'a.jpg'))
+    assert len(removed) == 2
+    assert storage_catalog.totals() == (50, 1)
+
+def test_recent_and_oldest_ordering(storage_catalog, temp_dir):
+    """Listings come back in capture order and skip thumbnails."""
+    shots = os.path.join(temp_dir, 'screenshots')
+    for i in range(5):
+        path = os.path.join(shots, f'{i}.jpg')
+        storage_catalog.add(path, 1, float(i), synced=(i % 2 == 0))
+        storage_catalog.add(os.path.join(shots, f'{i}_t160.jpg'), 1, float(i), parent_path=path)
+
+    recent = storage_catalog.recent(limit=2, prefix=shots)
+    assert [os.path.basename(e['path']) for e in recent] == ['4.jpg', '3.jpg']
+
+    oldest_unsynced = storage_catalog.oldest(limit=1, synced=False)
+    assert os.path.basename(oldest_unsynced[0]['path']) == '1.jpg'
+
+    expired = storage_catalog.older_than(2.0)
+    assert [os.path.basename(e['path']) for e in expired] == ['0.jpg', '1.jpg']
+
+def test_reconcile_repairs_drift(storage_catalog, temp_dir):
+    """Reconciliation adds untracked files, drops vanished ones and fixes totals."""
+    shots = os.path.join(temp_dir, 'screenshots')
+    _write(os.path.join(shots, 'kept.jpg'), 30)
+    _write(os.path.join(shots, 'kept_t160.jpg'), 5)
+    storage_catalog.add(os.path.join(shots, 'gone.jpg'), 999, time.time())
+
+    stats = storage_catalog.reconcile(shots)
+
+    assert stats == {'added': 2, 'removed': 1, 'resized': 0}
+    assert storage_catalog.totals() == (35, 2)
+    thumb = storage_catalog.get(os.path.join(shots, 'kept_t160.jpg'))
+    assert thumb['parent_path'] == os.path.abspath(os.path.join(shots, 'kept.jpg'))
+
+def test_shared_connection_across_threads(storage_catalog, temp_dir):
+    """Writers on worker threads (as with asyncio.to_thread) don't interleave transactions."""
+    import threading
+    shots = os.path.join(temp_dir, 'screenshots')
+
+    def writer(n):
+        for i in range(200):
+            path = os.path.join(shots, f'{n}-{i}.jpg')
+            storage_catalog.add(path, 10, float(i))
+            if i % 2:
+                storage_catalog.remove(path)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert storage_catalog.totals() == (4 * 100 * 10, 4 * 100)
@@ -0,0 +1,59 @@
+import sqlite3
+from ..src.utils.sqlite_manager import SQLiteManager, ACTIVITY_LOG_SYNC_COLUMNS, APP_SESSION_SYNC_COLUMNS
+
+def test_rows_store_ids_and_expand_for_sync(sqlite_manager):
+    for i in range(50):
+        sqlite_manager.insert_activity_log("u1", None, "code", f"file{i % 3}.py", "window_focus")
+    sqlite_manager.upsert_app_session("u1", None, {
+        "id": "s1", "app_name": "code", "window_title": "file0.py",
+        "start_time": "2026-01-01T09:00:00", "end_time": "2026-01-01T09:05:00", "duration": 300
+    })
+
+    with sqlite_manager.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM local_strings").fetchone()[0] == 4
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(local_activity_logs)")]
+    assert "app_name" not in columns and "app_id" in columns
+
+    data = sqlite_manager.get_unsynced_data()
+    assert {row[3] for row in data["activity_logs"]} == {"code"}
+    assert data["app_sessions"][0][4] == "file0.py"
+    assert sqlite_manager.get_app_usage_totals("u1") == [("code", 300)]
+
+def test_text_columns_are_migrated(temp_dir):
+    """A database from before interning is rebuilt with ids and keeps its rows."""
+    path = f"{temp_dir}/old.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE local_activity_logs (
+            id TEXT PRIMARY KEY, user_id TEXT NOT NULL, time_entry_id TEXT,
+            app_name TEXT NOT NULL, window_title TEXT, activity_type TEXT NOT NULL,
+            keystroke_count INTEGER DEFAULT 0, mouse_events INTEGER DEFAULT 0,
+            idle_time INTEGER DEFAULT 0, is_synced INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO local_activity_logs (id, user_id, app_name, window_title, activity_type)
+            VALUES ('a1', 'u1', 'slack', 'general', 'window_focus'),
+                   ('a2', 'u1', 'slack', NULL, 'window_focus');
+    """)
+    conn.commit()
+    conn.close()
+
+    manager = SQLiteManager(path)
+    with manager.get_connection() as conn:
+        rows = conn.execute("""
+            SELECT id, app_name, window_title FROM local_activity_logs_expanded ORDER BY id
+        """).fetchall()
+    assert rows == [("a1", "slack", "general"), ("a2", "slack", None)]
+
+def test_sync_payload_keeps_the_remote_columns(sqlite_manager):
+    """The dictionary ids stay local: unsynced rows have the same keys as before the migration."""
+    sqlite_manager.insert_activity_log("u1", "t1", "code", "main.py", "window_focus")
+    row, = sqlite_manager.get_unsynced_data()["activity_logs"]
+    assert ACTIVITY_LOG_SYNC_COLUMNS == ("id", "user_id", "time_entry_id", "app_name", "window_title",
+                                         "activity_type", "keystroke_count", "mouse_events",
+                                         "idle_time", "is_synced", "created_at")
+    assert len(row) == len(ACTIVITY_LOG_SYNC_COLUMNS)
+    payload = dict(zip(ACTIVITY_LOG_SYNC_COLUMNS, row))
+    assert payload["app_name"] == "code" and payload["window_title"] == "main.py"
+    assert payload["time_entry_id"] == "t1" and payload["activity_type"] == "window_focus"
+    assert "app_id" not in APP_SESSION_SYNC_COLUMNS and "title_id" not in APP_SESSION_SYNC_COLUMNS
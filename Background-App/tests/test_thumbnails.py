@@ -0,0 +1,58 @@
+import os
+import asyncio
+import pytest
+from PIL import Image
+from ..src.utils.thumbnails import build_thumbnails, thumbnail_path
+
+def _frame(width=800, height=600):
+    return Image.linear_gradient('L').resize((width, height)).convert('RGB')
+
+def test_pyramid_sizes_and_paths():
+    """Every level fits its box, keeps the aspect ratio and never upscales."""
+    thumbs = build_thumbnails(_frame(), (160, 480, 1024))
+    assert {size: t.size for size, t in thumbs.items()} == {1024: (800, 600), 480: (480, 360), 160: (160, 120)}
+    assert thumbnail_path('/shots/ab/cd/abcd.jpg', 160) == '/shots/ab/cd/abcd_t160.jpg'
+
+def test_thumbnails_stored_beside_parent_and_removed_with_it(resource_manager):
+    saved = asyncio.run(resource_manager.save_screenshot_with_thumbnails(_frame(), 'u1'))
+    path = saved['path']
+
+    assert saved['thumbnails'] == {480: thumbnail_path(path, 480), 160: thumbnail_path(path, 160)}
+    with Image.open(saved['thumbnails'][160]) as thumb:
+        assert thumb.size == (160, 120)
+    for thumb_path in saved['thumbnails'].values():
+        assert resource_manager.catalog.get(thumb_path)['parent_path'] == path
+    assert resource_manager.catalog.get(path)['thumb_bytes'] == sum(
+        os.path.getsize(p) for p in saved['thumbnails'].values())
+
+    asyncio.run(resource_manager.remove_file(path))
+    assert not any(os.path.exists(p) for p in [path, *saved['thumbnails'].values()])
+    assert resource_manager.catalog.totals() == (0, 0)
+
+def test_sync_uploads_thumbnails_as_own_objects(temp_dir, monkeypatch):
+    pytest.importorskip('supabase')
+    from ..src.services import supabase_sync
+    from ..src.utils.content_store import ContentAddressedStore
+
+    class Bucket:
+        def __init__(self):
+            self.objects = {}
+
+        def upload(self, path, file, file_options):
+            self.objects[path] = file
+
+    bucket = Bucket()
+    store = ContentAddressedStore(os.path.join(temp_dir, 'screenshots'))
+    thumb = thumbnail_path(store.path_for('ab' * 32), 160)
+    store.put_at(thumb, b'thumb')
+
+    monkeypatch.chdir(temp_dir)  # api call counter is written to the working directory
+    sync = supabase_sync.SupabaseSync.__new__(supabase_sync.SupabaseSync)
+    sync.user_id, sync.store, sync.api_calls_today = 'u1', store, 0
+    sync.supabase = type('Client', (), {'storage': type('Storage', (), {'from_': lambda self, name: bucket})()})()
+
+    uploaded = sync._upload_thumbnails('user-captures', 'ab' * 32, {160: thumb}, set())
+
+    assert uploaded == {160: f"u1/{'ab' * 32}_t160.jpg"}
+    assert bucket.objects == {f"u1/{'ab' * 32}_t160.jpg": b'thumb'}
+    assert not os.path.exists(thumb)
@@ -0,0 +1,32 @@
+from ..src.utils.title_normalizer import TitleNormalizer
+from ..src.utils.sessionizer import SessionBuilder
+
+def test_churning_titles_normalize_to_one():
+    normalizer = TitleNormalizer()
+    inbox = {normalizer.normalize("chrome.exe", f"({n}) Inbox - Gmail - Google Chrome") for n in range(1, 30)}
+    build = {normalizer.normalize("code", f"● Building 47% [00:{s:02d}] - project") for s in range(60)}
+    music = {normalizer.normalize("Spotify.exe", track) for track in ("Song A - Artist", "Song B - Other")}
+    assert inbox == {"Inbox - Gmail - Google Chrome"}
+    assert build == {"Building - project"}
+    assert music == {"Spotify"}
+    # Different documents stay different
+    assert normalizer.normalize("code", "main.py - project") != normalizer.normalize("code", "util.py - project")
+
+    normalizer.normalize("chrome.exe", "(1) Inbox - Gmail - Google Chrome")
+    assert normalizer.misses == 29 + 60 + 2 + 2 and normalizer.hits == 1
+
+def test_title_change_needs_dwell():
+    closed = []
+    builder = SessionBuilder(on_close=closed.append, min_title_dwell=10)
+    builder.observe("chrome", "docs", now=0)
+    builder.observe("chrome", "search", now=100)   # hovered tab for 3 s
+    builder.observe("chrome", "docs", now=103)
+    assert closed == []
+
+    builder.observe("chrome", "mail", now=200)
+    builder.observe("chrome", "mail", now=215)     # held past the dwell
+    assert closed[-1]["window_title"] == "docs" and closed[-1]["duration"] == 200
+    assert builder.current["window_title"] == "mail"
+
+    builder.observe("slack", "general", now=220)   # app switches are immediate
+    assert closed[-1]["window_title"] == "mail" and closed[-1]["duration"] == 20
@@ -0,0 +1,75 @@
+import json
+import asyncio
+import pytest
+
+pytest.importorskip('websockets')
+pytest.importorskip('supabase')
+from ..src.services.websocket_server import WebSocketServer
+
+class FakeSocket:
+    def __init__(self, *messages):
+        self.messages = [json.dumps(m) for m in messages]
+        self.sent = []
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for message in self.messages:
+            yield message
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+class FakeClipRecorder:
+    def __init__(self):
+        self.reasons = []
+
+    def trigger(self, reason):
+        self.reasons.append(reason)
+        return True
+
+TOKENS = {'boss-token': 'boss', 'emp-token': 'emp'}
+
+def _request_clip(server, auth, target):
+    socket = FakeSocket({'type': 'auth', **auth}, {'type': 'request_clip', 'target_user_id': target})
+    server.register = lambda websocket, uid: asyncio.sleep(0)  # no collectors needed
+    asyncio.run(server.handle_client(socket, '/'))
+    return socket.sent
+
+def _server(lookups):
+    roles = {'boss': 'admin', 'emp': 'employee'}
+    return WebSocketServer(role_lookup=lambda uid: lookups.append(uid) or roles.get(uid),
+                           token_verifier=TOKENS.get)
+
+def test_request_clip_for_other_user_requires_admin():
+    """Employees may only request their own clip; token-verified admins may request anyone's."""
+    lookups = []
+    server = _server(lookups)
+    recorder = FakeClipRecorder()
+    server.register_clip_recorder('victim', recorder)
+    server.register_clip_recorder('emp', FakeClipRecorder())
+
+    denied = _request_clip(server, {'access_token': 'emp-token'}, 'victim')[-1]
+    assert denied['type'] == 'error' and 'admin' in denied['error']
+    assert recorder.reasons == []
+
+    assert _request_clip(server, {'access_token': 'emp-token'}, 'emp')[-1]['type'] == 'clip_requested'
+
+    assert _request_clip(server, {'access_token': 'boss-token'}, 'victim')[-1]['accepted']
+    assert _request_clip(server, {'access_token': 'boss-token', 'user_id': 'boss'}, 'victim')[-1]['accepted']
+    assert recorder.reasons == ['admin:boss', 'admin:boss']
+    assert lookups == ['emp', 'boss']  # roles are cached once known
+
+def test_claimed_admin_id_cannot_request_other_users_clip():
+    """Without a verified token a user_id is only a claim; cross-user capture is refused outright."""
+    lookups = []
+    server = _server(lookups)
+    recorder = FakeClipRecorder()
+    server.register_clip_recorder('victim', recorder)
+
+    unverified = _request_clip(server, {'user_id': 'boss'}, 'victim')
+    assert unverified[0]['type'] == 'auth_success' and unverified[-1]['type'] == 'error'
+    forged = _request_clip(server, {'access_token': 'emp-token', 'user_id': 'boss'}, 'victim')
+    assert 'token' in forged[0]['error'] and forged[-1]['type'] == 'error'
+    assert recorder.reasons == [] and lookups == []
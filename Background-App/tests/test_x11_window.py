@@ -0,0 +1,47 @@
+import os
+import time
+import pytest
+
+Xlib = pytest.importorskip("Xlib")
+if not os.environ.get("DISPLAY"):
+    pytest.skip("needs an X display (run under xvfb-run)", allow_module_level=True)
+
+from Xlib import X, display as xdisplay  # noqa: E402
+from ..src.utils.x11_window import X11ActiveWindow  # noqa: E402
+
+def _wait_for(tracker, predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        state = tracker.snapshot()
+        if predicate(state):
+            return state
+        time.sleep(0.02)
+    return tracker.snapshot()
+
+def test_focus_and_title_changes_are_pushed():
+    """Under Xvfb there is no window manager, so the test sets _NET_ACTIVE_WINDOW itself."""
+    client = xdisplay.Display()
+    root = client.screen().root
+    active = client.intern_atom('_NET_ACTIVE_WINDOW')
+    net_wm_name = client.intern_atom('_NET_WM_NAME')
+    utf8 = client.intern_atom('UTF8_STRING')
+    window = root.create_window(0, 0, 200, 100, 0, X.CopyFromParent)
+    window.change_property(net_wm_name, utf8, 8, "editor — main.py".encode())
+    window.change_property(client.intern_atom('_NET_WM_PID'), client.intern_atom('CARDINAL'), 32, [os.getpid()])
+
+    tracker = X11ActiveWindow()
+    try:
+        root.change_property(active, client.intern_atom('WINDOW'), 32, [window.id])
+        client.flush()
+        state = _wait_for(tracker, lambda s: s["window_id"] == window.id)
+        assert state["window_title"] == "editor — main.py"
+        assert state["pid"] == os.getpid()
+
+        window.change_property(net_wm_name, utf8, 8, b"editor - test.py")
+        client.flush()
+        state = _wait_for(tracker, lambda s: s["window_title"] == "editor - test.py")
+        assert state["window_title"] == "editor - test.py"
+    finally:
+        tracker.close()
+        window.destroy()
+        client.close()